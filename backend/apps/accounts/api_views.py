@@ -3,15 +3,81 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import DatabaseError, connections
+from backend.db_routers import replica_aliases, replica_lag
+from apps.trips.services import route_breaker
+from .permissions import IsAdmin
 
 User = get_user_model()
 
+
+def database_health(alias='default'):
+    """
+    Connection usage for a database alias: pool stats when the native pool is
+    enabled, plus server-side connections against max_connections, which is
+    what workers have to be sized against.
+    """
+    connection = connections[alias]
+    pool = getattr(connection, 'pool', None)
+    health = {
+        'pooled': pool is not None,
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+    }
+    if pool is not None:
+        stats = pool.get_stats()
+        health['pool'] = {
+            'min_size': stats.get('pool_min'),
+            'max_size': stats.get('pool_max'),
+            'size': stats.get('pool_size'),
+            'available': stats.get('pool_available'),
+            'in_use': stats.get('pool_size', 0) - stats.get('pool_available', 0),
+            'requests_waiting': stats.get('requests_waiting', 0),
+        }
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*), current_setting('max_connections')::int "
+                "FROM pg_stat_activity WHERE datname = current_database()"
+            )
+            active, max_connections = cursor.fetchone()
+    except DatabaseError as e:
+        health['status'] = 'error'
+        health['error'] = str(e)
+        return health
+
+    health.update({
+        'status': 'ok',
+        'server_connections': active,
+        'max_connections': max_connections,
+        'utilization': round(active / max_connections, 3),
+    })
+    return health
+
+
+def replicas_health():
+    """
+    Replication lag per read replica; lagging or unreachable replicas are
+    skipped by the router until they catch up.
+    """
+    replicas = {}
+    for alias in replica_aliases():
+        lag = replica_lag(alias)
+        replicas[alias] = {
+            'lag_seconds': lag,
+            'serving_reads': lag is not None and lag <= settings.REPLICA_MAX_LAG,
+        }
+    return replicas
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def health_check(request):
     """
     Simple health check endpoint to verify server is running.
     Useful for testing connectivity from mobile devices.
+    Liveness only: it does not touch the database, so it is cheap to poll.
     """
     return Response({
         'status': 'ok',
@@ -25,6 +91,24 @@ def health_check(request):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def health_details(request):
+    """
+    Admin-only health detail: database connection/pool utilization, replica
+    lag and the routing provider circuit breaker (state, failures in the
+    current window, totals). Returns 503 when the primary database check fails.
+    """
+    database = database_health()
+    healthy = database['status'] == 'ok'
+    return Response({
+        'status': 'ok' if healthy else 'error',
+        'database': database,
+        'replicas': replicas_health(),
+        'routing': route_breaker.snapshot(),
+    }, status=status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def test_connection(request):
@@ -61,5 +145,6 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         """
         Return the authenticated user's profile.
+        request.user is built from the JWT claims, so load the full model here.
         """
-        return self.request.user
+        return User.objects.get(pk=self.request.user.pk)
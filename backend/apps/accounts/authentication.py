@@ -0,0 +1,184 @@
+"""
+Autenticación JWT sin SELECT de usuario por request.
+
+Los tokens llevan como claims el rol, is_staff y el id del DriverProfile, así que
+los permisos (IsDriver, IsClient, IsAdmin, IsOwnerOrAdmin) se resuelven sin tocar
+la base de datos. Si una vista necesita otro campo del usuario, el modelo se
+carga completo una sola vez desde una caché por proceso con TTL corto.
+
+Las marcas de claims obsoletos (mark_claims_stale) solo sirven si todos los
+procesos las ven: con una caché por proceso (LocMemCache) o sin caché los claims
+no se usan y cada request carga el usuario como siempre. is_active se revisa
+igual contra la caché por proceso de filas (JWT_USER_CACHE_TTL).
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import AuthenticatedUser
+
+User = get_user_model()
+
+ROLE_CLAIM = 'role'
+STAFF_CLAIM = 'is_staff'
+DRIVER_PROFILE_CLAIM = 'driver_profile_id'
+
+STALE_CLAIMS_KEY = 'auth:claims-stale:{user_id}'
+
+# user_id -> (expira_en, valores de la fila)
+_user_rows = {}
+
+
+def get_cached_user_row(user_id):
+    """
+    Devuelve los valores de la fila del usuario desde la caché por proceso,
+    cargándola con un único SELECT cuando no está o ya expiró.
+    """
+    now = time.monotonic()
+    entry = _user_rows.get(user_id)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    attnames = [field.attname for field in User._meta.concrete_fields]
+    row = User._base_manager.filter(pk=user_id).values(*attnames).first()
+    if len(_user_rows) >= settings.JWT_USER_CACHE_SIZE:
+        _user_rows.clear()
+    _user_rows[user_id] = (now + settings.JWT_USER_CACHE_TTL, row)
+    return row
+
+
+def forget_cached_user(user_id):
+    _user_rows.pop(user_id, None)
+
+
+def mark_claims_stale(user_id):
+    """
+    Marca como obsoletos los claims de los tokens emitidos hasta ahora para el usuario
+    (cambio de rol, staff, activación o perfil de conductor). Esos tokens vuelven a
+    cargar el usuario desde la base de datos hasta que el cliente refresque el token.
+    """
+    timeout = int(settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds())
+    cache.set(STALE_CLAIMS_KEY.format(user_id=user_id), int(time.time()), timeout)
+
+
+def claims_are_stale(token):
+    stale_since = cache.get(STALE_CLAIMS_KEY.format(user_id=token[api_settings.USER_ID_CLAIM]))
+    return stale_since is not None and token.get('iat', 0) <= stale_since
+
+
+def claims_auth_enabled():
+    """Los claims solo se usan con una caché compartida entre procesos (p. ej. Redis)"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def set_user_claims(token, user):
+    token[ROLE_CLAIM] = user.role
+    token[STAFF_CLAIM] = user.is_staff
+    try:
+        token[DRIVER_PROFILE_CLAIM] = user.driver_profile.pk
+    except ObjectDoesNotExist:
+        token[DRIVER_PROFILE_CLAIM] = None
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    RefreshToken que incluye los claims de rol; el access token derivado los copia.
+    """
+    @classmethod
+    def for_user(cls, user):
+        return set_user_claims(super().for_user(user), user)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresca el access token releyendo rol y perfil de conductor de la base de datos,
+    para que un cambio de rol quede reflejado en el nuevo token.
+    """
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        user = User.objects.select_related('driver_profile').filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+
+        set_user_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Construye request.user desde los claims del token en lugar de hacer un SELECT.
+    Tokens sin claims de rol (emitidos antes) o con claims obsoletos, o una caché
+    no compartida, usan la carga normal desde la base de datos.
+    """
+    def get_user(self, validated_token):
+        if (not claims_auth_enabled() or ROLE_CLAIM not in validated_token
+                or claims_are_stale(validated_token)):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken('Token contained no recognizable user identification') from e
+
+        # Una desactivación marca los claims como obsoletos (ver mark_claims_stale),
+        # pero is_active se confirma igual con la fila en caché (a lo sumo
+        # JWT_USER_CACHE_TTL segundos de atraso)
+        row = get_cached_user_row(user_id)
+        if row is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not row['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        claims = {
+            'id': user_id,
+            'role': validated_token[ROLE_CLAIM],
+            'is_staff': validated_token.get(STAFF_CLAIM, False),
+            'is_active': True,
+        }
+        # from_db espera los valores en el orden de los campos del modelo
+        names = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+        user = AuthenticatedUser.from_db('default', names, [claims[name] for name in names])
+
+        # Precargar user.driver_profile: un perfil liviano (id, user_id) o "no existe",
+        # así hasattr(user, 'driver_profile') tampoco consulta la base de datos
+        driver_profile_id = validated_token.get(DRIVER_PROFILE_CLAIM)
+        related = User.driver_profile.related
+        if driver_profile_id is None:
+            related.set_cached_value(user, None)
+        else:
+            profile = related.related_model.from_db('default', ['id', 'user_id'], [driver_profile_id, user_id])
+            related.set_cached_value(user, profile)
+            related.field.set_cached_value(profile, user)
+        return user
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:12
+
+import django.contrib.auth.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_phone_number_user_profile_picture'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthenticatedUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('accounts.user',),
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 
 class User(AbstractUser):
     class Role(models.TextChoices):
@@ -16,5 +18,36 @@ class User(AbstractUser):
     profile_picture = models.ImageField(upload_to='profile_pictures/', null=True, blank=True)
     phone_number = models.CharField(max_length=20, null=True, blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Búsquedas icontains del admin por username/email (UPPER(campo) LIKE ...)
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='user_username_trgm_idx'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_trgm_idx'),
+        ]
+
     def __str__(self):
         return self.username
+
+
+class AuthenticatedUser(User):
+    """
+    Usuario autenticado reconstruido desde los claims del JWT
+    (ver apps.accounts.authentication). Solo trae id, role, is_staff e is_active;
+    el resto de campos se carga completo la primera vez que se accede a alguno,
+    desde la caché por proceso en lugar de un SELECT por campo.
+    """
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields is None or from_queryset is not None or not deferred or not set(fields) <= deferred:
+            return super().refresh_from_db(using, fields, from_queryset)
+
+        from .authentication import get_cached_user_row
+        row = get_cached_user_row(self.pk)
+        if row is None:
+            # El usuario ya no existe: dejar que Django lance DoesNotExist
+            return super().refresh_from_db(using, fields, from_queryset)
+        for attname in deferred:
+            self.__dict__[attname] = row[attname]
@@ -1,9 +1,14 @@
+from django.contrib.auth import get_user_model
 from rest_framework import permissions
 
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and (request.user.role == 'ADMIN' or request.user.is_staff)
 
+class IsModerator(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated and request.user.role == 'MODERATOR'
+
 class IsDriver(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.role == 'DRIVER'
@@ -12,10 +17,41 @@ class IsClient(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.role == 'CLIENT'
 
+
+def has_related_user(obj, relation, user):
+    """
+    Check whether `user` belongs to the many-to-many `relation` of `obj`.
+    Uses the prefetch cache when the viewset already loaded the relation
+    (e.g. `prefetch_related('drivers')`) and only falls back to a query otherwise.
+    """
+    prefetched = getattr(obj, '_prefetched_objects_cache', {})
+    if relation in prefetched:
+        return any(related.pk == user.pk for related in prefetched[relation])
+    return getattr(obj, relation).filter(pk=user.pk).exists()
+
+
+def get_driver_user_id(obj):
+    """
+    Return the user id behind `obj.driver` without lazy loading when possible.
+    Driver might be a profile or user FK; for profiles it reads the
+    select_related driver when the queryset provides it.
+    """
+    if obj.driver_id is None:
+        return None
+    if obj._meta.get_field('driver').related_model is get_user_model():
+        return obj.driver_id
+    # Uses the select_related('driver') cache if present, otherwise costs one query
+    return obj.driver.user_id
+
+
 class IsOwnerOrAdmin(permissions.BasePermission):
     """
     Object-level permission to only allow owners of an object to edit it.
     Assumes the model instance has an `owner` attribute, or `user`, or `client`/`driver`.
+
+    Ownership is resolved from foreign-key ids (`user_id`, `client_id`, ...) and
+    prefetched relations, so the check itself does not hit the database as long
+    as the viewset's queryset provides them.
     """
     def has_object_permission(self, request, view, obj):
         # Read permissions are allowed to any request,
@@ -24,26 +60,25 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         # if request.method in permissions.SAFE_METHODS:
         #     return True
 
-        if request.user.role == 'ADMIN' or request.user.is_staff:
+        user = request.user
+        if user.role == 'ADMIN' or user.is_staff:
             return True
 
         # Check various common owner field names
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
-        if hasattr(obj, 'client'):
-            return obj.client == request.user
-        if hasattr(obj, 'driver'):
-            # Driver might be a profile or user FK
-            if hasattr(obj.driver, 'user'):
-                return obj.driver.user == request.user
-            return obj.driver == request.user
-        
+        if hasattr(obj, 'user_id'):
+            return obj.user_id == user.id
+        if hasattr(obj, 'client_id'):
+            return obj.client_id == user.id
+        if hasattr(obj, 'driver_id'):
+            # Driver is a DriverProfile FK; compare the profile's user id
+            return get_driver_user_id(obj) == user.id
+
         if hasattr(obj, 'drivers'):
             # Many-to-Many field for drivers (like in Vehicle)
             # Check if current user is in the list of drivers
-            return obj.drivers.filter(id=request.user.id).exists()
+            return has_related_user(obj, 'drivers', user)
+
+        if hasattr(obj, 'sender_id'):
+            return obj.sender_id == user.id
 
-        if hasattr(obj, 'sender'):
-             return obj.sender == request.user
-            
         return False
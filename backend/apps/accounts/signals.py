@@ -38,3 +38,27 @@ def cleanup_user_vehicles(sender, instance, **kwargs):
         for vehicle in instance.vehicles.all():
             if vehicle.drivers.count() == 1:
                 vehicle.delete()
+
+
+# Campos que viajan como claims en el JWT (ver apps.accounts.authentication)
+CLAIM_FIELDS = {'role', 'is_staff', 'is_active'}
+
+@receiver(post_save, sender=User)
+def invalidate_user_claims(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Drop the per-process cached row and, if a claim field may have changed,
+    mark the user's issued tokens as stale so they reload the user from the DB.
+    """
+    from .authentication import forget_cached_user, mark_claims_stale
+    forget_cached_user(instance.pk)
+    if not created and (update_fields is None or CLAIM_FIELDS & set(update_fields)):
+        mark_claims_stale(instance.pk)
+
+@receiver(post_save, sender='drivers.DriverProfile')
+def invalidate_driver_profile_claim(sender, instance, created, **kwargs):
+    """
+    A new DriverProfile changes the driver_profile_id claim of its user.
+    """
+    if created:
+        from .authentication import mark_claims_stale
+        mark_claims_stale(instance.user_id)
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import UserViewSet, GoogleLogin
-from .api_views import health_check, test_connection, UserProfileView
+from .api_views import health_check, health_details, test_connection, UserProfileView
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -23,6 +23,7 @@ urlpatterns = [
     
     # Testing endpoints
     path('health/', health_check, name='health_check'),
+    path('health/details/', health_details, name='health_details'),
     path('test/', test_connection, name='test_connection'),
     path('profile/', UserProfileView.as_view(), name='user_profile'),
 ]
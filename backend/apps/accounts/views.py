@@ -21,7 +21,7 @@ class UserViewSet(viewsets.ModelViewSet):
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from dj_rest_auth.registration.views import SocialLoginView
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import ClaimsRefreshToken
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import CustomSocialLoginSerializer
@@ -43,7 +43,7 @@ class GoogleLogin(SocialLoginView):
         serializer_class = self.get_response_serializer()
         
         # Get JWT tokens
-        refresh = RefreshToken.for_user(self.user)
+        refresh = ClaimsRefreshToken.for_user(self.user)
         
         data = {
             'access': str(refresh.access_token),
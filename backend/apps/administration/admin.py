@@ -1,3 +1,56 @@
 from django.contrib import admin
+from django.contrib.gis.admin import GISModelAdmin
+from .models import ServiceZone, TripMetrics
 
-# Register your models here.
+@admin.register(ServiceZone)
+class ServiceZoneAdmin(GISModelAdmin):
+    list_display = ('name', 'is_active', 'updated_at')
+    list_filter = ('is_active',)
+    search_fields = ('name',)
+
+
+@admin.register(TripMetrics)
+class TripMetricsAdmin(admin.ModelAdmin):
+    """
+    Tablero de KPIs: solo lee los rollups (python manage.py rollup_metrics),
+    nunca recorre Trip ni TripOffer.
+    """
+    list_display = (
+        'bucket', 'period', 'trips_requested', 'trips_completed', 'trips_cancelled',
+        'acceptance', 'cancellation', 'offers_per_trip_display', 'time_to_accept', 'gmv',
+    )
+    list_filter = ('period',)
+    date_hierarchy = 'bucket'
+    ordering = ('-bucket',)
+    list_per_page = 48
+
+    @staticmethod
+    def _percent(value):
+        return '-' if value is None else f"{value:.0%}"
+
+    @admin.display(description='Aceptación')
+    def acceptance(self, obj):
+        return self._percent(obj.acceptance_rate)
+
+    @admin.display(description='Cancelación')
+    def cancellation(self, obj):
+        return self._percent(obj.cancellation_rate)
+
+    @admin.display(description='Ofertas/viaje')
+    def offers_per_trip_display(self, obj):
+        return '-' if obj.offers_per_trip is None else f"{obj.offers_per_trip:.1f}"
+
+    @admin.display(description='Tiempo a aceptar')
+    def time_to_accept(self, obj):
+        seconds = obj.avg_seconds_to_accept
+        return '-' if seconds is None else f"{seconds / 60:.1f} min"
+
+    # Los rollups solo los escribe el job
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
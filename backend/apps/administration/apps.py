@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AdministrationConfig(AppConfig):
     name = 'apps.administration'
+
+    def ready(self):
+        import apps.administration.signals
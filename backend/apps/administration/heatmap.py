@@ -0,0 +1,84 @@
+"""
+Heatmap de demanda a partir de rollups por celda y hora (DemandCell).
+
+El rollup agrega con ST_SnapToGrid los orígenes de los viajes (activos y
+archivados) en una ventana de horas y reemplaza esas filas de DemandCell.
+Es idempotente: se programa cada pocos minutos sobre las últimas horas
+(python manage.py rollup_demand) y el heatmap solo lee la tabla agregada,
+sin importar cuántos viajes existan.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.gis.geos import Polygon
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import DemandCell
+
+ROLLUP_SQL = """
+    INSERT INTO administration_demandcell (cell_size, bucket, cell, trips, updated_at)
+    SELECT %(size)s, date_trunc('hour', created_at), ST_SnapToGrid(origin_location::geometry, %(size)s), count(*), now()
+    FROM (
+        SELECT created_at, origin_location FROM trips_trip
+        WHERE origin_location IS NOT NULL AND created_at >= %(start)s AND created_at < %(end)s
+        UNION ALL
+        SELECT created_at, origin_location FROM trips_archivedtrip
+        WHERE origin_location IS NOT NULL AND created_at >= %(start)s AND created_at < %(end)s
+    ) trips
+    GROUP BY 2, 3
+"""
+
+
+def cell_sizes():
+    return [Decimal(str(size)) for size in settings.HEATMAP_CELL_SIZES]
+
+
+def cell_size_for_zoom(zoom):
+    """Resolución según el zoom del mapa: más zoom, celdas más pequeñas"""
+    sizes = cell_sizes()
+    if zoom is None or zoom <= 11:
+        return sizes[0]
+    if zoom <= 14:
+        return sizes[min(1, len(sizes) - 1)]
+    return sizes[-1]
+
+
+def rollup_demand(start, end):
+    """
+    Recalcula las celdas de todas las resoluciones para las horas entre
+    `start` y `end` (se amplían a horas completas). Devuelve las filas escritas.
+    """
+    start = start.replace(minute=0, second=0, microsecond=0)
+    if end.minute or end.second or end.microsecond:
+        end = end.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+    written = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        DemandCell.objects.filter(bucket__gte=start, bucket__lt=end).delete()
+        for size in cell_sizes():
+            cursor.execute(ROLLUP_SQL, {'size': float(size), 'start': start, 'end': end})
+            written += cursor.rowcount
+    return written
+
+
+def rollup_recent(hours):
+    """Re-agrega las últimas `hours` horas (incluida la hora en curso)"""
+    end = timezone.now()
+    return rollup_demand(end - timedelta(hours=hours), end)
+
+
+def heatmap(start, end, cell_size, bbox=None):
+    """
+    Puntos [lat, lng, viajes] de las celdas con demanda entre `start` y `end`,
+    opcionalmente dentro de `bbox` (min_lng, min_lat, max_lng, max_lat).
+    """
+    queryset = DemandCell.objects.filter(cell_size=cell_size, bucket__gte=start, bucket__lt=end)
+    if bbox is not None:
+        area = Polygon.from_bbox(bbox)
+        area.srid = 4326
+        queryset = queryset.filter(cell__bboverlaps=area)
+    cells = queryset.values('cell').annotate(weight=Sum('trips')).order_by()
+    return [[round(row['cell'].y, 6), round(row['cell'].x, 6), row['weight']] for row in cells]
@@ -0,0 +1,36 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.administration.heatmap import rollup_demand
+
+
+class Command(BaseCommand):
+    help = 'Agrega los orígenes de los viajes por celda y hora para el heatmap de demanda'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=settings.HEATMAP_ROLLUP_HOURS,
+                            help='Re-agregar las últimas N horas (programar cada pocos minutos)')
+        parser.add_argument('--days', type=int, default=None,
+                            help='Backfill de los últimos N días (ignora --hours)')
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        end = timezone.now()
+        window = timedelta(days=options['days']) if options['days'] else timedelta(hours=options['hours'])
+
+        # El backfill va día por día para no tener una transacción enorme
+        written = 0
+        chunk_start = end - window
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=1), end)
+            written += rollup_demand(chunk_start, chunk_end)
+            chunk_start = chunk_end
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{written} celdas escritas en {elapsed:.1f}s"
+        ))
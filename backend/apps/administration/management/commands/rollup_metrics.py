@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.administration.metrics import rebuild, rollup_changes
+
+
+class Command(BaseCommand):
+    help = 'Actualiza los KPIs por hora y por día (TripMetrics) con los viajes que cambiaron'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild-days', type=int, default=None,
+                            help='Recalcular todas las horas de los últimos N días (backfill)')
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        if options['rebuild_days']:
+            hours = rebuild(options['rebuild_days'])
+        else:
+            hours = rollup_changes()
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{hours} horas recalculadas en {elapsed:.1f}s"
+        ))
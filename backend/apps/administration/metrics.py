@@ -0,0 +1,129 @@
+"""
+Rollup incremental de KPIs de viajes (TripMetrics por hora y por día).
+
+Los eventos de un viaje (creación, ofertas, aceptación, fin o cancelación)
+quedan en el updated_at de Trip y TripOffer. Cada corrida busca, desde el
+último checkpoint, las horas de solicitud de los viajes que cambiaron y
+recalcula solo esos buckets (y sus días) a partir de las tablas activas y
+archivadas. Recalcular el bucket completo, en lugar de sumar deltas, hace que
+repetir una corrida o solaparla con la anterior no cambie los números.
+
+python manage.py rollup_metrics (programar cada minuto)
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import RollupCheckpoint, TripMetrics
+
+CHECKPOINT = 'trip_metrics'
+
+# Horas (inicio) de solicitud de los viajes con cambios desde `since`
+CHANGED_HOURS_SQL = """
+    SELECT date_trunc('hour', created_at) FROM trips_trip WHERE updated_at >= %(since)s
+    UNION
+    SELECT date_trunc('hour', t.created_at)
+    FROM trips_tripoffer o JOIN trips_trip t ON t.id = o.trip_id
+    WHERE o.updated_at >= %(since)s
+"""
+
+# KPIs de los viajes solicitados en [start, end), activos y archivados
+HOUR_SQL = """
+    WITH t AS (
+        SELECT id, status, created_at FROM trips_trip
+        WHERE created_at >= %(start)s AND created_at < %(end)s
+        UNION ALL
+        SELECT id, status, created_at FROM trips_archivedtrip
+        WHERE created_at >= %(start)s AND created_at < %(end)s
+    ), o AS (
+        SELECT trip_id, status, updated_at FROM trips_tripoffer WHERE trip_id IN (SELECT id FROM t)
+        UNION ALL
+        SELECT trip_id, status, updated_at FROM trips_archivedtripoffer WHERE trip_id IN (SELECT id FROM t)
+    ), f AS (
+        SELECT trip_id, amount FROM fares_fare WHERE trip_id IN (SELECT id FROM t WHERE status = 'COMPLETED')
+        UNION ALL
+        SELECT trip_id, amount FROM fares_archivedfare WHERE trip_id IN (SELECT id FROM t WHERE status = 'COMPLETED')
+    )
+    SELECT
+        (SELECT count(*) FROM t),
+        (SELECT count(*) FROM o WHERE status = 'ACCEPTED'),
+        (SELECT count(*) FROM t WHERE status = 'COMPLETED'),
+        (SELECT count(*) FROM t WHERE status = 'CANCELLED'),
+        (SELECT count(*) FROM o),
+        (SELECT coalesce(sum(extract(epoch FROM o.updated_at - t.created_at)), 0)
+         FROM o JOIN t ON t.id = o.trip_id WHERE o.status = 'ACCEPTED'),
+        (SELECT coalesce(sum(amount), 0) FROM f)
+"""
+
+COUNTERS = (
+    'trips_requested', 'trips_accepted', 'trips_completed', 'trips_cancelled',
+    'offers', 'accept_seconds_total', 'gmv',
+)
+
+
+def day_start(moment):
+    """Inicio del día (zona horaria del proyecto) que contiene `moment`"""
+    return timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_hour(start):
+    """Recalcula el bucket horario que empieza en `start`"""
+    with connection.cursor() as cursor:
+        cursor.execute(HOUR_SQL, {'start': start, 'end': start + timedelta(hours=1)})
+        values = dict(zip(COUNTERS, cursor.fetchone()))
+    values['accept_seconds_total'] = float(values['accept_seconds_total'])
+    TripMetrics.objects.update_or_create(period=TripMetrics.Period.HOUR, bucket=start, defaults=values)
+
+
+def rollup_day(start):
+    """Recalcula el bucket diario sumando sus 24 buckets horarios"""
+    totals = TripMetrics.objects.filter(
+        period=TripMetrics.Period.HOUR, bucket__gte=start, bucket__lt=start + timedelta(days=1)
+    ).aggregate(**{name: Sum(name) for name in COUNTERS})
+    values = {name: total or 0 for name, total in totals.items()}
+    values['gmv'] = values['gmv'] or Decimal('0')
+    TripMetrics.objects.update_or_create(period=TripMetrics.Period.DAY, bucket=start, defaults=values)
+
+
+def rollup_hours(hours):
+    """Recalcula las horas dadas y los días que las contienen"""
+    hours = sorted(set(hours))
+    with transaction.atomic():
+        for hour in hours:
+            rollup_hour(hour)
+        for day in sorted({day_start(hour) for hour in hours}):
+            rollup_day(day)
+    return len(hours)
+
+
+def rollup_changes(now=None):
+    """
+    Procesa los cambios desde el último checkpoint. Devuelve las horas recalculadas.
+    El checkpoint retrocede METRICS_ROLLUP_OVERLAP segundos: updated_at se fija
+    al guardar, pero la fila puede hacerse visible (commit) un poco después.
+    """
+    now = now or timezone.now()
+    checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT).first()
+    if checkpoint is None:
+        since = now - timedelta(days=settings.METRICS_INITIAL_DAYS)
+    else:
+        since = checkpoint.processed_until - timedelta(seconds=settings.METRICS_ROLLUP_OVERLAP)
+
+    with connection.cursor() as cursor:
+        cursor.execute(CHANGED_HOURS_SQL, {'since': since})
+        hours = [row[0] for row in cursor.fetchall()]
+
+    processed = rollup_hours(hours) if hours else 0
+    RollupCheckpoint.objects.update_or_create(name=CHECKPOINT, defaults={'processed_until': now})
+    return processed
+
+
+def rebuild(days):
+    """Recalcula todas las horas de los últimos `days` días (backfill)"""
+    end = timezone.now().replace(minute=0, second=0, microsecond=0)
+    hours = [end - timedelta(hours=offset) for offset in range(days * 24 + 1)]
+    return rollup_hours(hours)
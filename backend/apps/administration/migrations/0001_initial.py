@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:28
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemandCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell_size', models.DecimalField(decimal_places=4, help_text='Tamaño de celda en grados', max_digits=7)),
+                ('bucket', models.DateTimeField(help_text='Inicio de la hora')),
+                ('cell', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('trips', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cell_size', 'bucket'], name='demandcell_size_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cell_size', 'bucket', 'cell'), name='demandcell_unique_cell')],
+            },
+        ),
+    ]
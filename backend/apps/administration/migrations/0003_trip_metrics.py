@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0002_service_zone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('processed_until', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TripMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('HOUR', 'Hora'), ('DAY', 'Día')], max_length=4)),
+                ('bucket', models.DateTimeField(help_text='Inicio de la hora o del día')),
+                ('trips_requested', models.PositiveIntegerField(default=0)),
+                ('trips_accepted', models.PositiveIntegerField(default=0)),
+                ('trips_completed', models.PositiveIntegerField(default=0)),
+                ('trips_cancelled', models.PositiveIntegerField(default=0)),
+                ('offers', models.PositiveIntegerField(default=0)),
+                ('accept_seconds_total', models.FloatField(default=0)),
+                ('gmv', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'trip metrics',
+                'constraints': [models.UniqueConstraint(fields=('period', 'bucket'), name='tripmetrics_unique_bucket')],
+            },
+        ),
+    ]
@@ -1,3 +1,101 @@
+from django.contrib.gis.db import models as gis_models
 from django.db import models
 
-# Create your models here.
+
+class DemandCell(models.Model):
+    """
+    Viajes solicitados por celda de grilla y hora (rollup para el heatmap).
+    `cell` es el origen ajustado a la grilla con ST_SnapToGrid(origen, cell_size):
+    el centro de la celda, que identifica la celda en su resolución.
+    """
+    cell_size = models.DecimalField(max_digits=7, decimal_places=4, help_text="Tamaño de celda en grados")
+    bucket = models.DateTimeField(help_text="Inicio de la hora")
+    cell = gis_models.PointField(srid=4326)
+    trips = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cell_size', 'bucket', 'cell'], name='demandcell_unique_cell'),
+        ]
+        indexes = [
+            models.Index(fields=['cell_size', 'bucket'], name='demandcell_size_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cell.y:.4f},{self.cell.x:.4f} @ {self.bucket:%Y-%m-%d %H}h: {self.trips}"
+
+
+class ServiceZone(models.Model):
+    """
+    Zona de servicio (cobertura, tarifas especiales...) dibujada por operaciones.
+    Se muestra como capa `zones` de los vector tiles.
+    """
+    name = models.CharField(max_length=100)
+    area = gis_models.MultiPolygonField(srid=4326)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class TripMetrics(models.Model):
+    """
+    KPIs de viajes por hora y por día (rollup de apps.administration.metrics).
+    Cada bucket agrupa los viajes *solicitados* en ese periodo (cohorte): si un
+    viaje de las 10h se completa a las 11h, cuenta en el bucket de las 10h.
+    """
+    class Period(models.TextChoices):
+        HOUR = 'HOUR', 'Hora'
+        DAY = 'DAY', 'Día'
+
+    period = models.CharField(max_length=4, choices=Period.choices)
+    bucket = models.DateTimeField(help_text="Inicio de la hora o del día")
+
+    trips_requested = models.PositiveIntegerField(default=0)
+    trips_accepted = models.PositiveIntegerField(default=0)
+    trips_completed = models.PositiveIntegerField(default=0)
+    trips_cancelled = models.PositiveIntegerField(default=0)
+    offers = models.PositiveIntegerField(default=0)
+    # Suma de (oferta aceptada - solicitud) en segundos, sobre trips_accepted
+    accept_seconds_total = models.FloatField(default=0)
+    # Suma de Fare.amount de los viajes completados
+    gmv = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'trip metrics'
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'bucket'], name='tripmetrics_unique_bucket'),
+        ]
+
+    @property
+    def acceptance_rate(self):
+        return self.trips_accepted / self.trips_requested if self.trips_requested else None
+
+    @property
+    def cancellation_rate(self):
+        return self.trips_cancelled / self.trips_requested if self.trips_requested else None
+
+    @property
+    def offers_per_trip(self):
+        return self.offers / self.trips_requested if self.trips_requested else None
+
+    @property
+    def avg_seconds_to_accept(self):
+        return self.accept_seconds_total / self.trips_accepted if self.trips_accepted else None
+
+    def __str__(self):
+        return f"{self.get_period_display()} {self.bucket:%Y-%m-%d %H}h"
+
+
+class RollupCheckpoint(models.Model):
+    """Hasta dónde procesó cambios un rollup incremental (uno por nombre)"""
+    name = models.CharField(max_length=50, unique=True)
+    processed_until = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name}: {self.processed_until}"
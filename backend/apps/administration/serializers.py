@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from .models import TripMetrics
+
+class TripMetricsSerializer(serializers.ModelSerializer):
+    acceptance_rate = serializers.FloatField(read_only=True)
+    cancellation_rate = serializers.FloatField(read_only=True)
+    offers_per_trip = serializers.FloatField(read_only=True)
+    avg_seconds_to_accept = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = TripMetrics
+        fields = (
+            'period', 'bucket', 'trips_requested', 'trips_accepted', 'trips_completed',
+            'trips_cancelled', 'offers', 'gmv', 'acceptance_rate', 'cancellation_rate',
+            'offers_per_trip', 'avg_seconds_to_accept',
+        )
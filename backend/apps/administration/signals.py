@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ServiceZone
+from .tiles import invalidate_tiles
+
+
+@receiver(post_save, sender=ServiceZone)
+@receiver(post_delete, sender=ServiceZone)
+def invalidate_zone_tiles(sender, **kwargs):
+    # La capa `zones` va en los mismos tiles cacheados que el resto
+    invalidate_tiles()
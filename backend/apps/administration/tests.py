@@ -1,3 +1,43 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .views import parse_window
+
+User = get_user_model()
+
+
+class ParseWindowTests(SimpleTestCase):
+    def test_defaults_to_last_24_hours(self):
+        start, end = parse_window({})
+        self.assertLess(abs((timezone.now() - end).total_seconds()), 5)
+        self.assertEqual(end - start, timedelta(hours=24))
+
+    def test_missing_from_counts_back_from_to(self):
+        start, end = parse_window({'to': '2026-10-19T12:00'})
+        self.assertTrue(timezone.is_aware(end))
+        self.assertEqual(end - start, timedelta(hours=24))
+
+    def test_invalid_dates(self):
+        for params in ({'to': 'ayer'}, {'from': 'ayer'}, {'to': '2026-13-40T00:00'}, {'from': '2026-02-30T10:00'}):
+            with self.assertRaises(ValueError, msg=params):
+                parse_window(params)
+
+
+class WindowValidationTests(SimpleTestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(User(pk=1, role='ADMIN'))
+
+    def test_heatmap_rejects_bad_dates(self):
+        for query in ('to=ayer', 'to=2026-13-40T00:00', 'from=2026-13-40T00:00&to=2026-10-19T00:00'):
+            response = self.api.get(f'/api/v1/administration/heatmap/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_metrics_rejects_bad_dates_and_period(self):
+        for query in ('to=ayer', 'from=2026-13-40T00:00', 'period=WEEK'):
+            response = self.api.get(f'/api/v1/administration/metrics/?{query}')
+            self.assertEqual(response.status_code, 400, query)
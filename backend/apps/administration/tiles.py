@@ -0,0 +1,147 @@
+"""
+Mapbox Vector Tiles generados directamente en PostGIS (ST_AsMVT).
+
+Capas:
+- origins / destinations: viajes del día (activos y archivados). Los puntos
+  que caen en el mismo píxel del tile se agrupan en un feature con `trips`.
+- drivers: posición de los conductores vistos en los últimos SURGE_DRIVER_TTL s.
+- zones: ServiceZone activas.
+
+Ningún modelo pasa por Python: la base devuelve el tile ya codificado y se
+guarda en la caché. La llave incluye el día y una generación (que se
+incrementa al cambiar una zona), y el TTL depende de la capa, del día y del
+zoom (ver tile_ttl).
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+LAYERS = ('origins', 'destinations', 'drivers', 'zones')
+EXTENT = 4096
+GENERATION_KEY = 'tiles:generation'
+
+# Viajes del rango [start, end) de ambas tablas, sin pasar por el ORM
+TRIPS_SQL = """
+    SELECT {column} AS location FROM trips_trip
+    WHERE created_at >= %(start)s AND created_at < %(end)s AND {column} IS NOT NULL
+    UNION ALL
+    SELECT {column} FROM trips_archivedtrip
+    WHERE created_at >= %(start)s AND created_at < %(end)s AND {column} IS NOT NULL
+"""
+
+# Puntos de viaje agrupados por píxel del tile (origins usa el origen, destinations el destino)
+TRIP_LAYER_SQL = """
+    SELECT ST_AsMVT(q, '{name}', {extent}, 'geom') FROM (
+        SELECT ST_AsMVTGeom(ST_Transform(t.location::geometry, 3857), b.envelope, {extent}, 0, true) AS geom,
+               count(*) AS trips
+        FROM ({trips}) t, bounds b
+        WHERE t.location::geometry && b.envelope_4326
+        GROUP BY 1
+    ) q WHERE geom IS NOT NULL
+"""
+TRIP_LAYER_COLUMNS = {'origins': 'origin_location', 'destinations': 'destination_location'}
+
+LAYER_SQL = {
+    'drivers': """
+        SELECT ST_AsMVT(q, 'drivers', {extent}, 'geom') FROM (
+            SELECT d.id,
+                   extract(epoch FROM d.last_seen_at)::bigint AS seen_at,
+                   ST_AsMVTGeom(ST_Transform(d.last_location::geometry, 3857), b.envelope, {extent}, 0, true) AS geom
+            FROM drivers_driverprofile d, bounds b
+            WHERE d.last_seen_at >= %(drivers_since)s
+              AND d.last_location::geometry && b.envelope_4326
+        ) q WHERE geom IS NOT NULL
+    """,
+    'zones': """
+        SELECT ST_AsMVT(q, 'zones', {extent}, 'geom') FROM (
+            SELECT z.id, z.name,
+                   ST_AsMVTGeom(ST_Transform(z.area, 3857), b.envelope, {extent}, 64, true) AS geom
+            FROM administration_servicezone z, bounds b
+            WHERE z.is_active AND z.area && b.envelope_4326
+        ) q WHERE geom IS NOT NULL
+    """,
+}
+
+TILE_SQL = """
+    WITH bounds AS (
+        SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS envelope,
+               ST_Transform(ST_TileEnvelope(%(z)s, %(x)s, %(y)s), 4326) AS envelope_4326
+    )
+    SELECT {layers}
+"""
+
+
+def parse_layers(value):
+    """Lista de capas pedidas (todas si no se indica); None si alguna no existe"""
+    if not value:
+        return list(LAYERS)
+    layers = [layer.strip() for layer in value.split(',') if layer.strip()]
+    return layers if layers and all(layer in LAYERS for layer in layers) else None
+
+
+def day_range(day):
+    """[inicio, fin) del día en la zona horaria del proyecto"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def tile_ttl(layers, day, z):
+    """
+    Segundos de caché del tile: los conductores en vivo, muy poco; los días
+    pasados ya no cambian. Para el día en curso, el cuádruple a zoom bajo
+    (<= 10), donde cada tile cubre toda la ciudad, es el más caro de
+    regenerar y un viaje nuevo casi no se nota.
+    """
+    if 'drivers' in layers:
+        return settings.TILE_CACHE_TTL_LIVE
+    if day < timezone.localdate():
+        return settings.TILE_CACHE_TTL_PAST
+    if z <= 10:
+        return settings.TILE_CACHE_TTL_TODAY * 4
+    return settings.TILE_CACHE_TTL_TODAY
+
+
+def invalidate_tiles():
+    """Invalida todos los tiles cacheados (p. ej. al editar una ServiceZone)"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def build_tile(z, x, y, layers, day):
+    """Tile MVT (bytes) con las capas pedidas, calculado por PostGIS"""
+    start, end = day_range(day)
+    selects = []
+    for layer in layers:
+        if layer in TRIP_LAYER_COLUMNS:
+            trips = TRIPS_SQL.format(column=TRIP_LAYER_COLUMNS[layer])
+            layer_sql = TRIP_LAYER_SQL.format(name=layer, extent=EXTENT, trips=trips)
+        else:
+            layer_sql = LAYER_SQL[layer].format(extent=EXTENT)
+        selects.append(f'({layer_sql})')
+
+    sql = TILE_SQL.format(layers=' || '.join(selects))
+    params = {
+        'z': z, 'x': x, 'y': y, 'start': start, 'end': end,
+        'drivers_since': timezone.now() - timedelta(seconds=settings.SURGE_DRIVER_TTL),
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        tile = cursor.fetchone()[0]
+    return bytes(tile) if tile else b''
+
+
+def get_tile(z, x, y, layers, day):
+    """Tile desde la caché o generado. Devuelve (bytes, ttl)"""
+    ttl = tile_ttl(layers, day, z)
+    generation = cache.get(GENERATION_KEY, 0)
+    key = f"tiles:{generation}:{','.join(layers)}:{day.isoformat()}:{z}:{x}:{y}"
+    tile = cache.get(key)
+    if tile is None:
+        tile = build_tile(z, x, y, layers, day)
+        cache.set(key, tile, ttl)
+    return tile, ttl
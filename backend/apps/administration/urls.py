@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import DemandHeatmapView, TripMetricsView, VectorTileView
+
+urlpatterns = [
+    path('metrics/', TripMetricsView.as_view(), name='trip-metrics'),
+    path('heatmap/', DemandHeatmapView.as_view(), name='demand-heatmap'),
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', VectorTileView.as_view(), name='vector-tile'),
+]
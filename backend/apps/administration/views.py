@@ -1,3 +1,135 @@
-from django.shortcuts import render
+from datetime import timedelta
 
-# Create your views here.
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.accounts.permissions import IsAdmin
+from backend.db_routers import ReplicaReadMixin
+from .heatmap import cell_size_for_zoom, heatmap
+from .models import TripMetrics
+from .serializers import TripMetricsSerializer
+from .tiles import get_tile, parse_layers
+
+
+def parse_window(params, hours=24):
+    """
+    Ventana (inicio, fin) de ?from=...&to=... (ISO 8601; sin zona, hora local).
+    Sin to: ahora; sin from: `hours` horas antes del fin. Lanza ValueError si
+    alguna no es una fecha válida (mal formada o imposible, p. ej. mes 13).
+    """
+    values = {}
+    for name in ('from', 'to'):
+        if params.get(name):
+            value = parse_datetime(params[name])
+            if value is None:
+                raise ValueError(f'{name} no es una fecha ISO 8601')
+            values[name] = timezone.make_aware(value) if timezone.is_naive(value) else value
+    end = values.get('to') or timezone.now()
+    start = values.get('from') or end - timedelta(hours=hours)
+    return start, end
+
+
+class DemandHeatmapView(ReplicaReadMixin, APIView):
+    """
+    Heatmap de demanda (orígenes de viajes) desde los rollups por celda y hora
+    GET /administration/heatmap/?from=2026-01-01T00:00&to=...&zoom=13&bbox=minLng,minLat,maxLng,maxLat
+    Por defecto: últimas 24 horas, sin bbox.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    replica_actions = None
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            start, end = parse_window(params)
+        except ValueError:
+            return Response({'error': 'from y to deben ser fechas ISO 8601'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            zoom = int(params['zoom']) if params.get('zoom') else None
+            bbox = tuple(float(value) for value in params['bbox'].split(',')) if params.get('bbox') else None
+        except ValueError:
+            return Response({'error': 'zoom debe ser entero y bbox minLng,minLat,maxLng,maxLat'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if bbox is not None and len(bbox) != 4:
+            return Response({'error': 'bbox debe ser minLng,minLat,maxLng,maxLat'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Los rollups son por hora: se alinea la ventana para que la caché se reutilice
+        start = start.replace(minute=0, second=0, microsecond=0)
+        cell_size = cell_size_for_zoom(zoom)
+
+        key = f"heatmap:{cell_size}:{start.isoformat()}:{end.replace(second=0, microsecond=0).isoformat()}:{bbox}"
+        data = cache.get(key)
+        if data is None:
+            data = {
+                'cell_size': float(cell_size),
+                'from': start,
+                'to': end,
+                # [lat, lng, viajes]
+                'points': heatmap(start, end, cell_size, bbox),
+            }
+            cache.set(key, data, settings.HEATMAP_CACHE_TTL)
+        return Response(data)
+
+
+class VectorTileView(ReplicaReadMixin, APIView):
+    """
+    Mapbox Vector Tile para el mapa de operaciones, generado en PostGIS
+    GET /administration/tiles/{z}/{x}/{y}.mvt?layers=origins,destinations,drivers,zones&date=2026-10-19
+    Por defecto: todas las capas, viajes del día de hoy.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    replica_actions = None
+
+    def get(self, request, z, x, y):
+        if not 0 <= z <= settings.TILE_MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return Response({'error': 'Tile fuera de rango'}, status=status.HTTP_400_BAD_REQUEST)
+
+        layers = parse_layers(request.query_params.get('layers'))
+        if layers is None:
+            return Response({'error': 'Capas válidas: origins, destinations, drivers, zones'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            day = parse_date(request.query_params['date']) if request.query_params.get('date') else timezone.localdate()
+        except ValueError:
+            day = None
+        if day is None:
+            return Response({'error': 'date debe tener formato YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        tile, ttl = get_tile(z, x, y, layers, day)
+        response = HttpResponse(tile, content_type='application/vnd.mapbox-vector-tile')
+        # El navegador también cachea: paneos de ida y vuelta no vuelven a pedir el tile
+        patch_cache_control(response, private=True, max_age=ttl)
+        return response
+
+
+class TripMetricsView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    KPIs por hora o por día desde los rollups (nunca desde Trip)
+    GET /administration/metrics/?period=HOUR|DAY&from=2026-10-01T00:00&to=...
+    Por defecto: por hora, últimas 24 horas.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    serializer_class = TripMetricsSerializer
+    replica_actions = None
+    pagination_class = None
+
+    def get_queryset(self):
+        params = self.request.query_params
+        period = params.get('period', TripMetrics.Period.HOUR).upper()
+        if period not in TripMetrics.Period.values:
+            raise ValidationError({'error': 'period debe ser HOUR o DAY'})
+        try:
+            start, end = parse_window(params)
+        except ValueError:
+            raise ValidationError({'error': 'from y to deben ser fechas ISO 8601'})
+        return TripMetrics.objects.filter(period=period, bucket__gte=start, bucket__lt=end).order_by('bucket')
@@ -1,8 +1,12 @@
 from django.contrib import admin
+from apps.support.search import FullTextSearchAdminMixin
 from .models import Message
 
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('sender', 'receiver', 'trip', 'timestamp', 'is_read')
     list_filter = ('is_read', 'timestamp')
-    search_fields = ('sender__username', 'receiver__username', 'content')
+    list_select_related = ('sender', 'receiver', 'trip')
+    # Texto completo sobre content (índice GIN de search_vector) en lugar de icontains
+    search_fields = ('content',)
+    raw_id_fields = ('sender', 'receiver', 'trip')
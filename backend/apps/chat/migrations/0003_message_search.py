@@ -0,0 +1,89 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:39
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+BACKFILL_BATCH = 10000
+
+# Mismo vector en mensajes activos y archivados; solo se recalcula si cambia content
+TRIGGER_SQL = """
+    CREATE FUNCTION chat_message_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector('es_unaccent', coalesce(NEW.content, ''));
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER chat_message_search_vector
+        BEFORE INSERT OR UPDATE OF content ON chat_message
+        FOR EACH ROW EXECUTE FUNCTION chat_message_search_vector();
+    CREATE TRIGGER chat_archivedmessage_search_vector
+        BEFORE INSERT OR UPDATE OF content ON chat_archivedmessage
+        FOR EACH ROW EXECUTE FUNCTION chat_message_search_vector();
+"""
+
+DROP_TRIGGER_SQL = """
+    DROP TRIGGER chat_archivedmessage_search_vector ON chat_archivedmessage;
+    DROP TRIGGER chat_message_search_vector ON chat_message;
+    DROP FUNCTION chat_message_search_vector();
+"""
+
+BACKFILL_SQL = """
+    UPDATE {table} SET search_vector = to_tsvector('es_unaccent', coalesce(content, ''))
+    WHERE id >= %s AND id < %s AND search_vector IS NULL
+"""
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """
+    Calcula el vector de los mensajes existentes por rangos de id: cada UPDATE
+    se confirma solo (migración no atómica) y bloquea pocas filas a la vez.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        for table in ('chat_message', 'chat_archivedmessage'):
+            cursor.execute(f"SELECT min(id), max(id) FROM {table}")
+            first, last = cursor.fetchone()
+            if first is None:
+                continue
+            for start in range(first, last + 1, BACKFILL_BATCH):
+                cursor.execute(BACKFILL_SQL.format(table=table), [start, start + BACKFILL_BATCH])
+
+
+class Migration(migrations.Migration):
+    # La columna nueva es nullable (sin reescribir la tabla), el relleno va por
+    # lotes y los índices GIN se crean sin bloquear escrituras
+    atomic = False
+
+    dependencies = [
+        ('chat', '0002_archived_message'),
+        ('support', '0001_initial'),
+        ('trips', '0013_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedmessage',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Primero el trigger: los mensajes nuevos ya llegan con vector mientras se rellena el resto
+        migrations.RunSQL(TRIGGER_SQL, DROP_TRIGGER_SQL),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='archivedmessage',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='archivedmessage_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='message',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='message_search_idx'),
+        ),
+    ]
@@ -1,17 +1,46 @@
 from django.db import models
 from django.conf import settings
-from apps.trips.models import Trip
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from apps.trips.models import Trip, ArchivedTrip
 
-class Message(models.Model):
-    trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='messages', null=True, blank=True)
-    sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sent_messages')
-    receiver = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='received_messages')
+class AbstractMessage(models.Model):
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
+    # Lo mantiene un trigger sobre content (ver apps.support.search)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
+        abstract = True
         ordering = ['timestamp']
 
     def __str__(self):
         return f"Message from {self.sender} to {self.receiver} at {self.timestamp}"
+
+
+class Message(AbstractMessage):
+    trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='messages', null=True, blank=True)
+    sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sent_messages')
+    receiver = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='received_messages')
+
+    class Meta(AbstractMessage.Meta):
+        indexes = [
+            GinIndex(fields=['search_vector'], name='message_search_idx'),
+        ]
+
+
+class ArchivedMessage(AbstractMessage):
+    """
+    Mensaje de un viaje archivado (ver apps.trips.archive).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    trip = models.ForeignKey(ArchivedTrip, on_delete=models.CASCADE, related_name='messages')
+    sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_sent_messages')
+    receiver = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_received_messages')
+    timestamp = models.DateTimeField()
+
+    class Meta(AbstractMessage.Meta):
+        indexes = [
+            GinIndex(fields=['search_vector'], name='archivedmessage_search_idx'),
+        ]
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Message
+from .models import Message, ArchivedMessage
 
 class MessageSerializer(serializers.ModelSerializer):
     sender_username = serializers.CharField(source='sender.username', read_only=True)
@@ -8,3 +8,11 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = ['id', 'trip', 'sender', 'sender_username', 'receiver', 'content', 'timestamp', 'is_read']
         read_only_fields = ['sender', 'timestamp', 'is_read']
+
+
+class ArchivedMessageSerializer(MessageSerializer):
+    """
+    Mensaje de un viaje archivado, con la misma forma que MessageSerializer.
+    """
+    class Meta(MessageSerializer.Meta):
+        model = ArchivedMessage
@@ -1,9 +1,10 @@
 from rest_framework import viewsets, permissions
 from django.db.models import Q
-from .models import Message
-from .serializers import MessageSerializer
+from .models import Message, ArchivedMessage
+from .serializers import MessageSerializer, ArchivedMessageSerializer
+from backend.db_routers import ReplicaReadMixin
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -12,5 +13,13 @@ class MessageViewSet(viewsets.ModelViewSet):
         # Users see messages they sent or received
         return Message.objects.filter(Q(sender=user) | Q(receiver=user))
 
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Los mensajes de viajes archivados son más antiguos: van primero
+        user = request.user
+        archived = ArchivedMessage.objects.filter(Q(sender=user) | Q(receiver=user)).select_related('sender')
+        response.data = ArchivedMessageSerializer(archived, many=True).data + response.data
+        return response
+
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:27
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='driverprofile',
+            name='last_location',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, geography=True, null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='driverprofile',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
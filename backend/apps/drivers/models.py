@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.gis.db import models as gis_models
 
 class DriverProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='driver_profile')
@@ -7,5 +8,10 @@ class DriverProfile(models.Model):
     is_verified = models.BooleanField(default=False)
     # Add other fields like documents later
 
+    # Última posición reportada (feed de viajes o POST /drivers/location/).
+    # Se escribe como mucho una vez cada DRIVER_LOCATION_WRITE_INTERVAL segundos
+    last_location = gis_models.PointField(geography=True, srid=4326, null=True, blank=True)
+    last_seen_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
     def __str__(self):
         return f"Driver: {self.user.username}"
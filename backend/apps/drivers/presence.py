@@ -0,0 +1,25 @@
+"""
+Presencia de conductores: última posición conocida, para contar oferta por zona
+(surge) sin que cada ping del GPS sea un UPDATE.
+"""
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import DriverProfile
+
+
+def record_driver_location(driver_profile_id, latitude, longitude):
+    """
+    Guarda la posición del conductor si la última escritura tiene más de
+    DRIVER_LOCATION_WRITE_INTERVAL segundos. Devuelve True si escribió.
+    """
+    # cache.add solo gana si la llave no existe: un UPDATE por intervalo y conductor
+    if not cache.add(f'driver:loc:{driver_profile_id}', 1, settings.DRIVER_LOCATION_WRITE_INTERVAL):
+        return False
+    DriverProfile.objects.filter(pk=driver_profile_id).update(
+        last_location=Point(longitude, latitude, srid=4326),
+        last_seen_at=timezone.now(),
+    )
+    return True
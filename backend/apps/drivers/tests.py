@@ -1,3 +1,17 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+User = get_user_model()
+
+
+class LocationValidationTests(SimpleTestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(User(pk=1, role='DRIVER'))
+
+    def test_rejects_non_finite_and_out_of_range(self):
+        for lat, lng in (('nan', '-74.08'), ('4.6', 'inf'), ('-inf', '0'), ('91', '-74.08'), ('4.6', '-180.5'), ('x', '1')):
+            response = self.api.post(reverse('driverprofile-location'), {'lat': lat, 'lng': lng}, format='json')
+            self.assertEqual(response.status_code, 400, (lat, lng))
@@ -1,20 +1,30 @@
+import math
+import time
+
 from rest_framework import viewsets
 from .models import DriverProfile
 from .serializers import DriverProfileSerializer
 
 from rest_framework import permissions
 from apps.accounts.permissions import IsOwnerOrAdmin, IsAdmin, IsDriver
+from backend.db_routers import ReplicaReadMixin
 
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from .presence import record_driver_location
+from apps.trips.breadcrumbs import record_breadcrumb
+from apps.trips.eta import active_trip, update_position
 
-class DriverProfileViewSet(viewsets.ModelViewSet):
+class DriverProfileViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = DriverProfile.objects.all()
     serializer_class = DriverProfileSerializer
     
     def get_permissions(self):
         if self.action in ['list', 'destroy']:
             return [IsAdmin()]
+        if self.action == 'location':
+            return [IsDriver()]
         if self.action in ['create', 'stats']:
             # Optionally allow any auth user to become a driver, or restrict
             return [permissions.IsAuthenticated()] 
@@ -26,3 +36,32 @@ class DriverProfileViewSet(viewsets.ModelViewSet):
             "viajes_completados": 0,
             "calificacion": 5.0
         })
+
+    @action(detail=False, methods=['post'])
+    def location(self, request):
+        """
+        Posición actual del conductor (disponibilidad para surge; recorrido y ETA del viaje en curso)
+        POST /drivers/location/
+        Body: {"lat": 11.5444, "lng": -72.9072}
+        """
+        try:
+            latitude = float(request.data.get('lat'))
+            longitude = float(request.data.get('lng'))
+        except (TypeError, ValueError):
+            return Response({'error': 'Se requieren lat y lng válidos'}, status=status.HTTP_400_BAD_REQUEST)
+        # float() también acepta "nan" e "inf"
+        if not (math.isfinite(latitude) and math.isfinite(longitude)
+                and abs(latitude) <= 90 and abs(longitude) <= 180):
+            return Response({'error': 'Se requieren lat y lng válidos'}, status=status.HTTP_400_BAD_REQUEST)
+
+        profile = getattr(request.user, 'driver_profile', None)
+        if profile is None:
+            return Response({'error': 'El usuario no tiene un perfil de conductor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        record_driver_location(profile.pk, latitude, longitude)
+        active = active_trip(profile.pk)
+        if active is not None:
+            # Recorrido del viaje en curso y ETA para el cliente
+            record_breadcrumb(active['trip_id'], active['phase'], latitude, longitude, time.time())
+            update_position(profile.pk, latitude, longitude, active)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.fares.surge import recompute_multipliers
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los multiplicadores de surge por celda y los publica en la caché'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Recalcular indefinidamente cada --interval segundos')
+        parser.add_argument('--interval', type=int, default=settings.SURGE_INTERVAL,
+                            help='Segundos entre recálculos (con --loop)')
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            published = recompute_multipliers()
+            elapsed = time.monotonic() - start
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(published['cells'])} celdas con surge ({elapsed * 1000:.0f} ms)"
+            ))
+            if not options['loop']:
+                break
+            # Respeta CONN_MAX_AGE/health checks como lo haría un request
+            close_old_connections()
+            time.sleep(max(options['interval'] - elapsed, 0))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fares', '0002_fare_base_fare_fare_distance_km_and_more'),
+        ('trips', '0009_archived_trips'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedFare',
+            fields=[
+                ('base_fare', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('distance_km', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('surcharge_per_km', models.DecimalField(decimal_places=2, default=2000, max_digits=10)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Precio final calculado', max_digits=10)),
+                ('currency', models.CharField(default='COP', max_length=3)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('trip', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fare', to='trips.archivedtrip')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -1,9 +1,10 @@
 from django.db import models
-from apps.trips.models import Trip
+from apps.trips.models import Trip, ArchivedTrip
 
-class Fare(models.Model):
-    trip = models.OneToOneField(Trip, on_delete=models.CASCADE, related_name='fare')
-    
+class AbstractFare(models.Model):
+    """
+    Campos comunes de Fare y ArchivedFare (tarifa de un viaje archivado).
+    """
     # Tarifas Base según el tipo de vehículo (en COP)
     BASE_FARES = {
         'MOTORCYCLE': 3000,
@@ -17,16 +18,33 @@ class Fare(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Precio final calculado")
     currency = models.CharField(max_length=3, default='COP')
     
-    def save(self, *args, **kwargs):
+    class Meta:
+        abstract = True
+    
+    def __str__(self):
+        return f"{self.amount} {self.currency} for Trip {self.trip.id} ({self.trip.vehicle_type})"
+
+
+class Fare(AbstractFare):
+    trip = models.OneToOneField(Trip, on_delete=models.CASCADE, related_name='fare')
+    
+    def calculate_amount(self):
         # Si no se ha definido la tarifa base, la asignamos según el tipo de vehículo del viaje
         if self.base_fare == 0:
             v_type = self.trip.vehicle_type
             self.base_fare = self.BASE_FARES.get(v_type, 7000)
-            
+
         # Cálculo del precio final: Base + (distancia * recargo)
         self.amount = self.base_fare + (self.distance_km * self.surcharge_per_km)
-        
+        return self.amount
+
+    def save(self, *args, **kwargs):
+        # bulk_create no pasa por save(): quien lo use debe llamar calculate_amount()
+        self.calculate_amount()
         super().save(*args, **kwargs)
-    
-    def __str__(self):
-        return f"{self.amount} {self.currency} for Trip {self.trip.id} ({self.trip.vehicle_type})"
+
+
+class ArchivedFare(AbstractFare):
+    # Se copia tal cual: sin recalcular el monto
+    id = models.BigIntegerField(primary_key=True)
+    trip = models.OneToOneField(ArchivedTrip, on_delete=models.CASCADE, related_name='fare')
@@ -0,0 +1,101 @@
+"""
+Multiplicadores de surge (oferta/demanda) por celda de una grilla lat/lng.
+
+Un proceso (python manage.py update_surge --loop) recalcula cada SURGE_INTERVAL
+segundos, con dos GROUP BY, la demanda (viajes REQUESTED abiertos recientes) y
+la oferta (conductores vistos hace poco y sin viaje en curso) por celda, y
+publica en la caché compartida solo las celdas con multiplicador > 1.
+
+La estimación de tarifa consulta get_multiplier(), que lee de una copia en
+memoria del proceso refrescada desde la caché como mucho una vez por
+intervalo: O(1), sin base de datos ni red por request.
+"""
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+CACHE_KEY = 'surge:multipliers'
+
+DEMAND_SQL = """
+    SELECT floor(ST_Y(origin_location::geometry) / %(size)s)::int,
+           floor(ST_X(origin_location::geometry) / %(size)s)::int,
+           count(*)
+    FROM trips_trip
+    WHERE status = 'REQUESTED' AND driver_id IS NULL
+      AND origin_location IS NOT NULL AND created_at >= %(since)s
+    GROUP BY 1, 2
+"""
+
+SUPPLY_SQL = """
+    SELECT floor(ST_Y(d.last_location::geometry) / %(size)s)::int,
+           floor(ST_X(d.last_location::geometry) / %(size)s)::int,
+           count(*)
+    FROM drivers_driverprofile d
+    WHERE d.last_seen_at >= %(since)s AND d.last_location IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM trips_trip t
+          WHERE t.driver_id = d.id AND t.status IN ('ACCEPTED', 'IN_PROGRESS')
+      )
+    GROUP BY 1, 2
+"""
+
+# Copia local de las celdas publicadas y cuándo se leyeron de la caché
+_local = {'cells': {}, 'loaded_at': -math.inf}
+
+
+def cell_for(latitude, longitude):
+    """Celda de la grilla (misma fórmula que floor(...) en SQL)"""
+    size = settings.SURGE_CELL_SIZE_DEG
+    return f"{math.floor(latitude / size)}:{math.floor(longitude / size)}"
+
+
+def multiplier_for(demand, supply):
+    """
+    1.0 mientras la oferta cubra la demanda; luego crece con la razón
+    demanda/oferta, redondeado a 0.1 y limitado a SURGE_MAX_MULTIPLIER.
+    """
+    ratio = demand / max(supply, 1)
+    if ratio <= 1:
+        return 1.0
+    multiplier = 1 + (ratio - 1) * settings.SURGE_SENSITIVITY
+    return round(min(multiplier, settings.SURGE_MAX_MULTIPLIER), 1)
+
+
+def _counts(sql, since):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'size': settings.SURGE_CELL_SIZE_DEG, 'since': since})
+        return {f"{row}:{col}": count for row, col, count in cursor.fetchall()}
+
+
+def recompute_multipliers():
+    """
+    Recalcula y publica el mapa de multiplicadores. Devuelve el mapa publicado.
+    """
+    now = timezone.now()
+    demand = _counts(DEMAND_SQL, now - timedelta(minutes=settings.SURGE_DEMAND_WINDOW_MINUTES))
+    supply = _counts(SUPPLY_SQL, now - timedelta(seconds=settings.SURGE_DRIVER_TTL))
+
+    cells = {}
+    for cell, requested in demand.items():
+        multiplier = multiplier_for(requested, supply.get(cell, 0))
+        if multiplier > 1:
+            cells[cell] = multiplier
+
+    published = {'cells': cells, 'computed_at': now.isoformat()}
+    # Si el proceso que recalcula se cae, el surge expira solo y todo vuelve a 1.0
+    cache.set(CACHE_KEY, published, settings.SURGE_INTERVAL * 3)
+    return published
+
+
+def get_multiplier(latitude, longitude):
+    """Multiplicador vigente para un punto de origen (1.0 si no hay surge)"""
+    if time.monotonic() - _local['loaded_at'] >= settings.SURGE_INTERVAL:
+        published = cache.get(CACHE_KEY) or {}
+        _local['cells'] = published.get('cells', {})
+        _local['loaded_at'] = time.monotonic()
+    return _local['cells'].get(cell_for(latitude, longitude), 1.0)
@@ -1,15 +1,22 @@
+import math
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from apps.trips.services import RouteService
+from apps.trips.services import RouteClientError, RouteService
+from backend.circuit_breaker import CircuitOpenError
+from backend.throttling import ROUTING_THROTTLES
+from .surge import get_multiplier
 from .models import Fare
 from .serializers import FareSerializer
 
 class FareViewSet(viewsets.ModelViewSet):
     queryset = Fare.objects.all()
     serializer_class = FareSerializer
+    throttle_scope = None
 
-    @action(detail=False, methods=['post'])
+    # Cada estimación consume una llamada a Mapbox: token bucket por usuario e IP
+    @action(detail=False, methods=['post'], throttle_classes=ROUTING_THROTTLES, throttle_scope='fare_estimate')
     def estimate(self, request):
         try:
             origin_lat = float(request.data.get('origin_lat'))
@@ -36,6 +43,10 @@ class FareViewSet(viewsets.ModelViewSet):
             
             estimated_price = base_fare + (distance_km * per_km_rate)
             
+            # Surge por oferta/demanda en la celda de origen (lookup en memoria)
+            surge_multiplier = get_multiplier(origin_lat, origin_lng)
+            estimated_price *= surge_multiplier
+            
             # Redondear a la centena más cercana para un precio más "comercial"
             estimated_price = round(estimated_price / 100) * 100
             
@@ -43,9 +54,23 @@ class FareViewSet(viewsets.ModelViewSet):
                 "estimated_price": int(estimated_price),
                 "distance_km": round(distance_km, 2),
                 "duration_mins": int(route_info['duration'] / 60.0),
-                "currency": "COP"
+                "surge_multiplier": surge_multiplier,
+                "currency": "COP",
+                # Distancia y duración estimadas localmente (Mapbox no disponible)
+                "route_estimated": route_info['estimated'],
             })
-            
+
+        except RouteClientError as e:
+            return Response(
+                {"error": f"Error calculando ruta: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except CircuitOpenError as e:
+            return Response(
+                {"error": f"Error calculando ruta: {str(e)}"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(math.ceil(e.retry_after))}
+            )
         except Exception as e:
             return Response(
                 {"error": f"Error calculando ruta: {str(e)}"},
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Place
+
+@admin.register(Place)
+class PlaceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind', 'source', 'hits', 'updated_at')
+    list_filter = ('kind', 'source')
+    search_fields = ('name', 'normalized_name')
+    readonly_fields = ('normalized_name', 'created_at', 'updated_at')
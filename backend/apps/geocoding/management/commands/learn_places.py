@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.geocoding.services import learn_from_trips
+
+
+class Command(BaseCommand):
+    help = 'Agrega al gazetteer las direcciones frecuentes del historial de viajes (activos y archivados)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Solo viajes de los últimos N días, sumados a los hits ya aprendidos '
+                                 '(por defecto, todo el historial y los hits se recuentan)')
+        parser.add_argument('--min-trips', type=int, default=3,
+                            help='Viajes mínimos para considerar frecuente una dirección')
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        total = learn_from_trips(days=options['days'], min_trips=options['min_trips'])
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} lugares creados o actualizados en {elapsed:.1f}s"
+        ))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:26
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        # gin_trgm_ops y el operador % necesitan pg_trgm
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='Place',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('normalized_name', models.CharField(editable=False, max_length=255)),
+                ('kind', models.CharField(choices=[('NEIGHBORHOOD', 'Barrio'), ('LANDMARK', 'Sitio de interés'), ('ADDRESS', 'Dirección frecuente')], default='ADDRESS', max_length=20)),
+                ('source', models.CharField(choices=[('MANUAL', 'Manual'), ('TRIPS', 'Historial de viajes'), ('PROVIDER', 'Proveedor externo')], default='MANUAL', max_length=20)),
+                ('location', django.contrib.gis.db.models.fields.PointField(geography=True, srid=4326)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['normalized_name'], name='place_name_prefix_idx', opclasses=['varchar_pattern_ops']), django.contrib.postgres.indexes.GinIndex(fields=['normalized_name'], name='place_name_trgm_idx', opclasses=['gin_trgm_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('normalized_name', 'kind'), name='place_unique_name_kind')],
+            },
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geocoding', '0001_initial'),
+    ]
+
+    operations = [
+        # learn_from_trips normaliza las direcciones en SQL con unaccent()
+        UnaccentExtension(),
+    ]
@@ -0,0 +1,74 @@
+import re
+import unicodedata
+
+from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+# Abreviaturas usuales en direcciones colombianas, para que "Cl 15" y "Calle 15" coincidan
+ABBREVIATIONS = {
+    'cl': 'calle', 'cll': 'calle', 'clle': 'calle',
+    'cr': 'carrera', 'cra': 'carrera', 'kr': 'carrera', 'kra': 'carrera',
+    'av': 'avenida', 'avda': 'avenida',
+    'dg': 'diagonal', 'tv': 'transversal',
+}
+
+
+def normalize_name(text):
+    """
+    Forma canónica para búsquedas: minúsculas, sin tildes ni signos,
+    espacios simples y abreviaturas expandidas ("Cra. 7 #12-30" -> "carrera 7 12 30").
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    words = re.sub(r'[^a-z0-9]+', ' ', text).split()
+    return ' '.join(ABBREVIATIONS.get(word, word) for word in words)
+
+
+class Place(models.Model):
+    """
+    Gazetteer local: barrios, sitios de interés y direcciones frecuentes.
+    Resuelve geocoding y reverse geocoding sin salir a un proveedor externo;
+    las respuestas del proveedor también se guardan aquí.
+    """
+    class Kind(models.TextChoices):
+        NEIGHBORHOOD = 'NEIGHBORHOOD', 'Barrio'
+        LANDMARK = 'LANDMARK', 'Sitio de interés'
+        ADDRESS = 'ADDRESS', 'Dirección frecuente'
+
+    class Source(models.TextChoices):
+        MANUAL = 'MANUAL', 'Manual'
+        TRIPS = 'TRIPS', 'Historial de viajes'
+        PROVIDER = 'PROVIDER', 'Proveedor externo'
+
+    name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, editable=False)
+    kind = models.CharField(max_length=20, choices=Kind.choices, default=Kind.ADDRESS)
+    source = models.CharField(max_length=20, choices=Source.choices, default=Source.MANUAL)
+
+    # Índice GiST (spatial_index por defecto) para reverse geocoding por cercanía
+    location = gis_models.PointField(geography=True, srid=4326)
+
+    # Viajes que usaron el lugar: ordena las sugerencias
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['normalized_name', 'kind'], name='place_unique_name_kind'),
+        ]
+        indexes = [
+            # Prefijo (LIKE 'texto%') independiente del collation
+            models.Index(fields=['normalized_name'], name='place_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+            # Búsqueda difusa con pg_trgm (operador %)
+            GinIndex(fields=['normalized_name'], name='place_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.name} ({self.get_kind_display()})"
@@ -0,0 +1,254 @@
+"""
+Geocoding y reverse geocoding con gazetteer local (Place) y caché.
+
+El orden de resolución es: caché -> gazetteer local (prefijo, luego búsqueda
+difusa con pg_trgm) -> proveedor externo opcional (Mapbox). Lo que responde
+el proveedor se guarda como Place, así la próxima consulta queda local.
+"""
+import hashlib
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import requests
+from django.conf import settings
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
+from django.contrib.gis.measure import D
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .models import ABBREVIATIONS, Place, normalize_name
+
+# Sentinela para cachear "sin resultado" y no repetir la búsqueda
+NOT_FOUND = 'not-found'
+
+
+class GeocodingService:
+    """
+    Servicio de geocoding. Todos los resultados tienen la forma:
+    {'id', 'name', 'kind', 'source', 'latitude', 'longitude'}
+    """
+    MAPBOX_GEOCODING_URL = 'https://api.mapbox.com/geocoding/v5/mapbox.places'
+
+    @staticmethod
+    def _cache_key(*parts) -> str:
+        raw = ':'.join(str(part) for part in parts)
+        return 'geocode:' + hashlib.md5(raw.encode()).hexdigest()
+
+    @staticmethod
+    def to_dict(place: Place) -> Dict:
+        return {
+            'id': place.id,
+            'name': place.name,
+            'kind': place.kind,
+            'source': place.source,
+            'latitude': place.location.y,
+            'longitude': place.location.x,
+        }
+
+    @classmethod
+    def search(cls, query: str, limit: int = 5) -> List[Dict]:
+        """
+        Autocompletado solo contra el gazetteer local: primero coincidencias
+        por prefijo (las más usadas primero) y, si faltan, por similitud.
+        """
+        normalized = normalize_name(query)
+        if len(normalized) < 2:
+            return []
+
+        key = cls._cache_key('search', normalized, limit)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        places = list(Place.objects.filter(normalized_name__startswith=normalized).order_by('-hits')[:limit])
+        if len(places) < limit:
+            # trigram_similar usa el índice GIN (umbral: pg_trgm.similarity_threshold, 0.3 por defecto)
+            fuzzy = Place.objects.filter(
+                normalized_name__trigram_similar=normalized
+            ).exclude(
+                pk__in=[place.pk for place in places]
+            ).annotate(
+                similarity=TrigramSimilarity('normalized_name', normalized)
+            ).order_by('-similarity', '-hits')[:limit - len(places)]
+            places.extend(fuzzy)
+
+        results = [cls.to_dict(place) for place in places]
+        cache.set(key, results, settings.GEOCODING_CACHE_TTL)
+        return results
+
+    @classmethod
+    def geocode(cls, query: str, near: Optional[Point] = None) -> Optional[Dict]:
+        """
+        Mejor coincidencia para una dirección o nombre de lugar.
+        Si el gazetteer no la conoce, consulta al proveedor (si hay uno configurado).
+        """
+        results = cls.search(query, limit=1)
+        if results:
+            return results[0]
+
+        place = cls._provider_geocode(query, near)
+        if place is None:
+            return None
+        # El "sin resultados" cacheado por search ya no es válido
+        cache.delete(cls._cache_key('search', normalize_name(query), 1))
+        return cls.to_dict(place)
+
+    @classmethod
+    def reverse(cls, latitude: float, longitude: float) -> Optional[Dict]:
+        """
+        Lugar conocido más cercano dentro de GEOCODING_REVERSE_RADIUS_M metros,
+        o el que devuelva el proveedor.
+        """
+        # ~11 m de precisión: puntos vecinos comparten la entrada de caché
+        key = cls._cache_key('reverse', round(latitude, 4), round(longitude, 4))
+        cached = cache.get(key)
+        if cached is not None:
+            return None if cached == NOT_FOUND else cached
+
+        point = Point(longitude, latitude, srid=4326)
+        place = Place.objects.filter(
+            location__dwithin=(point, D(m=settings.GEOCODING_REVERSE_RADIUS_M))
+        ).annotate(
+            distance=Distance('location', point)
+        ).order_by('distance', '-hits').first()
+
+        if place is None:
+            place = cls._provider_reverse(point)
+
+        result = cls.to_dict(place) if place else None
+        cache.set(key, result or NOT_FOUND, settings.GEOCODING_CACHE_TTL)
+        return result
+
+    # --- Proveedor externo (opcional) ---
+
+    @classmethod
+    def provider_enabled(cls) -> bool:
+        return settings.GEOCODING_PROVIDER == 'mapbox' and bool(settings.MAPBOX_API_KEY)
+
+    @classmethod
+    def _provider_request(cls, path: str, **params) -> Optional[Dict]:
+        """Primer resultado de Mapbox, o None si no hay o el proveedor falla"""
+        if not cls.provider_enabled():
+            return None
+        params.update({
+            'access_token': settings.MAPBOX_API_KEY,
+            'country': settings.GEOCODING_COUNTRY,
+            'language': 'es',
+            'limit': 1,
+        })
+        try:
+            response = requests.get(f"{cls.MAPBOX_GEOCODING_URL}/{path}.json", params=params,
+                                    timeout=settings.GEOCODING_PROVIDER_TIMEOUT)
+            response.raise_for_status()
+            features = response.json().get('features') or []
+        except (requests.RequestException, ValueError):
+            # El proveedor es un respaldo: si falla, se responde como "no encontrado"
+            return None
+        return features[0] if features else None
+
+    @classmethod
+    def _store_feature(cls, feature: Dict, name: str) -> Place:
+        longitude, latitude = feature['center']
+        place, _ = Place.objects.get_or_create(
+            normalized_name=normalize_name(name),
+            kind=Place.Kind.ADDRESS,
+            defaults={
+                'name': name,
+                'source': Place.Source.PROVIDER,
+                'location': Point(longitude, latitude, srid=4326),
+            },
+        )
+        return place
+
+    @classmethod
+    def _provider_geocode(cls, query: str, near: Optional[Point]) -> Optional[Place]:
+        params = {'proximity': f"{near.x},{near.y}"} if near else {}
+        feature = cls._provider_request(quote(query, safe=''), **params)
+        # Se guarda con el texto consultado, que es como lo volverán a escribir
+        return cls._store_feature(feature, query) if feature else None
+
+    @classmethod
+    def _provider_reverse(cls, point: Point) -> Optional[Place]:
+        feature = cls._provider_request(f"{point.x},{point.y}")
+        return cls._store_feature(feature, feature['place_name']) if feature else None
+
+
+def _normalize_sql(column: str) -> str:
+    """
+    normalize_name() en SQL: sin tildes (unaccent, ver la migración 0002),
+    minúsculas, solo [a-z0-9] separados por un espacio y abreviaturas expandidas.
+    """
+    expression = f"btrim(regexp_replace(lower(unaccent({column})), '[^a-z0-9]+', ' ', 'g'))"
+    targets = defaultdict(list)
+    for abbreviation, word in ABBREVIATIONS.items():
+        targets[word].append(abbreviation)
+    for word, abbreviations in targets.items():
+        expression = f"regexp_replace({expression}, '\\m({'|'.join(abbreviations)})\\M', '{word}', 'g')"
+    return expression
+
+
+# Agrupa por dirección normalizada en la base de datos y suma los viajes de la
+# ventana a los hits de los lugares aprendidos antes. Los lugares MANUAL y
+# PROVIDER con el mismo nombre no se tocan (WHERE del DO UPDATE).
+LEARN_SQL = """
+    WITH addresses AS (
+        SELECT pickup_address AS address, origin_location AS location FROM trips_trip
+        WHERE %(since)s::timestamptz IS NULL OR created_at >= %(since)s
+        UNION ALL
+        SELECT destination_address, destination_location FROM trips_trip
+        WHERE %(since)s::timestamptz IS NULL OR created_at >= %(since)s
+        UNION ALL
+        SELECT pickup_address, origin_location FROM trips_archivedtrip
+        WHERE %(since)s::timestamptz IS NULL OR created_at >= %(since)s
+        UNION ALL
+        SELECT destination_address, destination_location FROM trips_archivedtrip
+        WHERE %(since)s::timestamptz IS NULL OR created_at >= %(since)s
+    ), normalized AS (
+        SELECT {normalized} AS normalized_name, btrim(address) AS name, location::geometry AS point
+        FROM addresses
+        WHERE location IS NOT NULL
+    )
+    INSERT INTO geocoding_place AS place (name, normalized_name, kind, source, location, hits, created_at, updated_at)
+    SELECT
+        -- La forma más escrita por los clientes queda como nombre visible
+        mode() WITHIN GROUP (ORDER BY name),
+        normalized_name, %(kind)s, %(source)s,
+        ST_SetSRID(ST_MakePoint(avg(ST_X(point)), avg(ST_Y(point))), 4326)::geography,
+        count(*), now(), now()
+    FROM normalized
+    WHERE normalized_name <> ''
+    GROUP BY normalized_name
+    HAVING count(*) >= %(min_trips)s
+    ON CONFLICT (normalized_name, kind) DO UPDATE SET
+        name = EXCLUDED.name,
+        location = EXCLUDED.location,
+        hits = CASE WHEN %(accumulate)s THEN place.hits + EXCLUDED.hits ELSE EXCLUDED.hits END,
+        updated_at = EXCLUDED.updated_at
+    WHERE place.source = %(source)s
+""".format(normalized=_normalize_sql('address'))
+
+
+def learn_from_trips(days: Optional[int] = None, min_trips: int = 3) -> int:
+    """
+    Llena el gazetteer con las direcciones frecuentes del historial de viajes:
+    agrupa por dirección normalizada y ubica el lugar en el promedio de los
+    puntos reportados. Con `days` los viajes de la ventana se suman a los hits
+    ya aprendidos (correr con una ventana igual a la frecuencia de la tarea);
+    sin `days` se recuenta todo el historial y los hits se reemplazan.
+    Solo crea o actualiza lugares de origen TRIPS. Devuelve cuántos escribió.
+    """
+    since = timezone.now() - timedelta(days=days) if days else None
+    with connection.cursor() as cursor:
+        cursor.execute(LEARN_SQL, {
+            'since': since,
+            'min_trips': min_trips,
+            'accumulate': since is not None,
+            'kind': Place.Kind.ADDRESS,
+            'source': Place.Source.TRIPS,
+        })
+        return cursor.rowcount
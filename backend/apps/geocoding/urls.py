@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import GeocodingViewSet
+
+router = DefaultRouter()
+router.register(r'', GeocodingViewSet, basename='geocoding')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
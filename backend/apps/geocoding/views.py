@@ -0,0 +1,66 @@
+from django.contrib.gis.geos import Point
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from backend.db_routers import ReplicaReadMixin
+from .services import GeocodingService
+
+
+class GeocodingViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    """
+    Geocoding contra el gazetteer local (con proveedor externo opcional)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    replica_actions = ('search', 'geocode', 'reverse')
+
+    @staticmethod
+    def _coordinates(params, lat_key='lat', lng_key='lng'):
+        try:
+            return float(params[lat_key]), float(params[lng_key])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Autocompletado de lugares y direcciones conocidas (solo local)
+        GET /geocoding/search/?q=cra 7&limit=5
+        """
+        try:
+            limit = min(int(request.query_params.get('limit', 5)), 20)
+        except ValueError:
+            limit = 5
+        results = GeocodingService.search(request.query_params.get('q', ''), limit=limit)
+        return Response({'results': results})
+
+    @action(detail=False, methods=['get'])
+    def geocode(self, request):
+        """
+        Mejor coincidencia para una dirección
+        GET /geocoding/geocode/?q=Calle 15 #5-20[&lat=11.54&lng=-72.90]
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Se requiere el parámetro q'}, status=status.HTTP_400_BAD_REQUEST)
+
+        near = self._coordinates(request.query_params)
+        result = GeocodingService.geocode(query, near=Point(near[1], near[0], srid=4326) if near else None)
+        if result is None:
+            return Response({'error': 'Dirección no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
+
+    @action(detail=False, methods=['get'])
+    def reverse(self, request):
+        """
+        Lugar conocido más cercano a unas coordenadas
+        GET /geocoding/reverse/?lat=11.5444&lng=-72.9072
+        """
+        coordinates = self._coordinates(request.query_params)
+        if coordinates is None:
+            return Response({'error': 'Se requieren lat y lng válidos'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = GeocodingService.reverse(*coordinates)
+        if result is None:
+            return Response({'error': 'No hay lugares conocidos cerca'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
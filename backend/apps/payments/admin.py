@@ -1,3 +1,82 @@
 from django.contrib import admin
+from .ledger import balance
+from .models import (
+    Account, BalanceSnapshot, LedgerEntry, LedgerTransaction, Payout, SettlementPartition, SettlementRun,
+)
 
-# Register your models here.
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    # El libro solo lo escribe apps.payments.ledger (y la base rechaza cambios)
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Account)
+class AccountAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'kind', 'user', 'currency', 'current_balance', 'created_at')
+    list_filter = ('kind',)
+    list_select_related = ('user',)
+    search_fields = ('user__username', 'user__email')
+
+    @admin.display(description='Saldo')
+    def current_balance(self, obj):
+        return balance(obj)
+
+
+class LedgerEntryInline(admin.TabularInline):
+    model = LedgerEntry
+    fields = ('account', 'amount', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LedgerTransaction)
+class LedgerTransactionAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'kind', 'idempotency_key', 'trip_id', 'description', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('=idempotency_key', '=trip_id')
+    inlines = [LedgerEntryInline]
+
+
+@admin.register(BalanceSnapshot)
+class BalanceSnapshotAdmin(ReadOnlyAdmin):
+    list_display = ('account', 'balance', 'last_entry_id', 'created_at')
+    list_select_related = ('account__user',)
+    raw_id_fields = ('account',)
+
+
+class SettlementPartitionInline(admin.TabularInline):
+    model = SettlementPartition
+    fields = ('index', 'status', 'drivers_paid', 'total_amount', 'seconds', 'finished_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SettlementRun)
+class SettlementRunAdmin(ReadOnlyAdmin):
+    list_display = ('period_end', 'status', 'drivers_paid', 'total_amount', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    inlines = [SettlementPartitionInline]
+
+
+@admin.register(Payout)
+class PayoutAdmin(ReadOnlyAdmin):
+    list_display = ('run', 'account', 'amount', 'trips', 'created_at')
+    list_filter = ('run',)
+    list_select_related = ('run', 'account__user')
+    search_fields = ('account__user__username', 'account__user__email')
+    raw_id_fields = ('account', 'transaction')
@@ -0,0 +1,121 @@
+"""
+Libro mayor de doble entrada para pagos de viajes, ganancias de conductores y
+comisiones.
+
+Cada escritura es un LedgerTransaction con su llave de idempotencia y varios
+LedgerEntry que suman cero. Las cuentas que toca se bloquean (SELECT ... FOR
+UPDATE, en orden de id para no caer en deadlocks) mientras se insertan sus
+movimientos; así los movimientos de una cuenta se confirman en orden de id y
+una foto del saldo (BalanceSnapshot) tomada con la cuenta bloqueada nunca deja
+atrás un movimiento en vuelo.
+
+Leer un saldo cuesta lo mismo tenga la cuenta 10 o 10 millones de movimientos:
+la última foto más la suma de los movimientos posteriores, que
+python manage.py snapshot_balances (programar cada hora) mantiene en pocos.
+
+Pago de un viaje completado (monto A, comisión c = PAYMENTS_COMMISSION_RATE):
+    cliente     +A        (debe el viaje)
+    conductor   -(A - c)  (la plataforma le debe su ganancia)
+    comisiones  -c
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Sum
+
+from .models import Account, BalanceSnapshot, LedgerEntry, LedgerTransaction
+
+CENT = Decimal('0.01')
+
+
+class LedgerError(Exception):
+    pass
+
+
+def get_account(kind, user=None):
+    """Cuenta del usuario (o de la plataforma si user es None), creada si no existe"""
+    account, _ = Account.objects.get_or_create(kind=kind, user=user)
+    return account
+
+
+def post_transaction(idempotency_key, kind, lines, trip_id=None, description=''):
+    """
+    Registra un asiento con `lines` = [(account, amount), ...]. Si la llave ya
+    existe devuelve el asiento original sin escribir nada. Devuelve (asiento, creado).
+    """
+    lines = [(account, Decimal(amount).quantize(CENT)) for account, amount in lines if amount]
+    if len(lines) < 2:
+        raise LedgerError('Un asiento necesita al menos dos movimientos')
+    if sum(amount for _, amount in lines) != 0:
+        raise LedgerError('Los movimientos de un asiento deben sumar cero')
+
+    with transaction.atomic():
+        # Una escritura concurrente con la misma llave espera en el índice único y
+        # termina devolviendo el asiento que ganó
+        txn, created = LedgerTransaction.objects.get_or_create(
+            idempotency_key=idempotency_key,
+            defaults={'kind': kind, 'trip_id': trip_id, 'description': description},
+        )
+        if not created:
+            return txn, False
+
+        account_ids = sorted({account.pk for account, _ in lines})
+        list(Account.objects.select_for_update().filter(pk__in=account_ids).order_by('pk'))
+        LedgerEntry.objects.bulk_create(
+            LedgerEntry(transaction=txn, account=account, amount=amount) for account, amount in lines
+        )
+    return txn, True
+
+
+def balance(account):
+    """Saldo actual: última foto + movimientos posteriores (debe ser una cuenta guardada)"""
+    snapshot = BalanceSnapshot.objects.filter(account=account).order_by('-last_entry_id').first()
+    entries = LedgerEntry.objects.filter(account=account)
+    start = Decimal('0')
+    if snapshot is not None:
+        entries = entries.filter(id__gt=snapshot.last_entry_id)
+        start = snapshot.balance
+    return start + (entries.aggregate(total=Sum('amount'))['total'] or Decimal('0'))
+
+
+def snapshot_account(account):
+    """Toma una foto del saldo si hubo movimientos desde la anterior. Devuelve la foto nueva o None."""
+    with transaction.atomic():
+        Account.objects.select_for_update().get(pk=account.pk)
+        last = BalanceSnapshot.objects.filter(account=account).order_by('-last_entry_id').first()
+        entries = LedgerEntry.objects.filter(account=account)
+        if last is not None:
+            entries = entries.filter(id__gt=last.last_entry_id)
+        delta = entries.aggregate(total=Sum('amount'), last_id=Max('id'))
+        if delta['last_id'] is None:
+            return None
+        return BalanceSnapshot.objects.create(
+            account=account,
+            last_entry_id=delta['last_id'],
+            balance=(last.balance if last else Decimal('0')) + delta['total'],
+        )
+
+
+def record_trip_payment(trip):
+    """
+    Asienta el pago de un viaje COMPLETED (idempotente por viaje). Devuelve el
+    asiento, o None si el viaje no tiene conductor o monto.
+    """
+    fare = getattr(trip, 'fare', None)
+    amount = fare.amount if fare is not None else trip.estimated_price
+    if trip.driver_id is None or not amount:
+        return None
+
+    amount = Decimal(amount).quantize(CENT)
+    commission = (amount * Decimal(str(settings.PAYMENTS_COMMISSION_RATE))).quantize(CENT)
+    lines = [
+        (get_account(Account.Kind.CLIENT, trip.client), amount),
+        (get_account(Account.Kind.DRIVER, trip.driver.user), -(amount - commission)),
+        (get_account(Account.Kind.COMMISSION), -commission),
+    ]
+    txn, _ = post_transaction(
+        f"trip:{trip.pk}:payment", LedgerTransaction.Kind.TRIP_PAYMENT, lines,
+        trip_id=trip.pk, description=f"Viaje {trip.pk}",
+    )
+    return txn
@@ -0,0 +1,34 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.payments.ledger import record_trip_payment
+from apps.payments.models import LedgerTransaction
+from apps.trips.models import Trip
+
+
+class Command(BaseCommand):
+    help = 'Asienta en el libro mayor los viajes COMPLETED recientes que aún no tienen su pago'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24,
+                            help='Revisar los viajes actualizados en las últimas N horas')
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        since = timezone.now() - timedelta(hours=options['hours'])
+        recorded = LedgerTransaction.objects.filter(
+            kind=LedgerTransaction.Kind.TRIP_PAYMENT, trip_id__isnull=False,
+        ).values('trip_id')
+        trips = (
+            Trip.objects.filter(status=Trip.Status.COMPLETED, updated_at__gte=since)
+            .exclude(id__in=recorded)
+            .select_related('client', 'driver__user', 'fare')
+        )
+        posted = sum(1 for trip in trips.iterator() if record_trip_payment(trip) is not None)
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{posted} pagos asentados en {elapsed:.1f}s"
+        ))
@@ -0,0 +1,47 @@
+import time
+from datetime import datetime, time as day_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.payments.settlement import SettlementError, run_settlement
+
+
+class Command(BaseCommand):
+    help = 'Liquida las ganancias de los conductores hasta el corte (por defecto, el lunes de esta semana)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period-end', default=None,
+                            help='Fecha de corte YYYY-MM-DD (00:00 hora local); relanzar con la misma fecha reanuda')
+        parser.add_argument('--partitions', type=int, default=None,
+                            help='Particiones de cuentas (solo al crear la corrida; por defecto SETTLEMENT_PARTITIONS)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Procesos del pool (por defecto SETTLEMENT_WORKERS; 1 = sin pool)')
+
+    def handle(self, *args, **options):
+        period_end = None
+        if options['period_end']:
+            day = parse_date(options['period_end'])
+            if day is None:
+                raise CommandError('--period-end debe tener formato YYYY-MM-DD')
+            period_end = timezone.make_aware(datetime.combine(day, day_time.min))
+
+        start = time.monotonic()
+        # Solo lo liquidado en esta ejecución (una corrida reanudada ya traía particiones)
+        paid = []
+
+        def progress(index, drivers, amount, seconds):
+            paid.append(drivers)
+            self.stdout.write(f"Partición {index}: {drivers} conductores, {amount} en {seconds:.1f}s")
+
+        try:
+            run = run_settlement(period_end, options['partitions'], options['workers'], progress)
+        except SettlementError as e:
+            raise CommandError(str(e)) from e
+        elapsed = time.monotonic() - start
+        throughput = sum(paid) / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{run}: {run.drivers_paid} conductores, {run.total_amount} en total; "
+            f"{len(paid)} particiones en {elapsed:.1f}s ({throughput:.0f} conductores/s)"
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.payments.ledger import snapshot_account
+from apps.payments.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Toma una foto del saldo de cada cuenta con movimientos desde la anterior'
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        snapshots = 0
+        for account in Account.objects.order_by('pk').iterator():
+            if snapshot_account(account) is not None:
+                snapshots += 1
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{snapshots} saldos actualizados en {elapsed:.1f}s"
+        ))
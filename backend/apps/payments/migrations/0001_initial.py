@@ -0,0 +1,97 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Libro de solo inserción: la base rechaza UPDATE y DELETE de asientos y movimientos
+APPEND_ONLY_SQL = """
+    CREATE FUNCTION payments_reject_mutation() RETURNS trigger AS $$
+    BEGIN
+        RAISE EXCEPTION 'El libro mayor es de solo inserción (%)', TG_TABLE_NAME;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER payments_ledgertransaction_append_only
+        BEFORE UPDATE OR DELETE ON payments_ledgertransaction
+        FOR EACH ROW EXECUTE FUNCTION payments_reject_mutation();
+    CREATE TRIGGER payments_ledgerentry_append_only
+        BEFORE UPDATE OR DELETE ON payments_ledgerentry
+        FOR EACH ROW EXECUTE FUNCTION payments_reject_mutation();
+"""
+
+DROP_APPEND_ONLY_SQL = """
+    DROP TRIGGER payments_ledgerentry_append_only ON payments_ledgerentry;
+    DROP TRIGGER payments_ledgertransaction_append_only ON payments_ledgertransaction;
+    DROP FUNCTION payments_reject_mutation();
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=100, unique=True)),
+                ('kind', models.CharField(choices=[('TRIP_PAYMENT', 'Pago de viaje'), ('ADJUSTMENT', 'Ajuste')], max_length=20)),
+                ('trip_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Account',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CLIENT', 'Cliente'), ('DRIVER', 'Conductor'), ('COMMISSION', 'Comisiones de la plataforma')], max_length=20)),
+                ('currency', models.CharField(default='COP', max_length=3)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_accounts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_entry_id', models.BigIntegerField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='snapshots', to='payments.account')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Débito positivo, crédito negativo', max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='payments.account')),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='payments.ledgertransaction')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='account',
+            constraint=models.UniqueConstraint(fields=('kind', 'user'), name='account_kind_user_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='account',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('kind',), name='account_platform_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='balancesnapshot',
+            constraint=models.UniqueConstraint(fields=('account', 'last_entry_id'), name='snapshot_account_entry_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['account', 'id'], name='ledgerentry_account_idx'),
+        ),
+        migrations.RunSQL(APPEND_ONLY_SQL, DROP_APPEND_ONLY_SQL),
+    ]
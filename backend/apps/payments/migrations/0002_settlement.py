@@ -0,0 +1,69 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettlementRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_end', models.DateTimeField(unique=True)),
+                ('cutoff_entry_id', models.BigIntegerField()),
+                ('partitions', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('RUNNING', 'En curso'), ('COMPLETED', 'Completada')], default='RUNNING', max_length=20)),
+                ('drivers_paid', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='account',
+            name='kind',
+            field=models.CharField(choices=[('CLIENT', 'Cliente'), ('DRIVER', 'Conductor'), ('COMMISSION', 'Comisiones de la plataforma'), ('PAYOUTS', 'Pagos a conductores')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='ledgertransaction',
+            name='kind',
+            field=models.CharField(choices=[('TRIP_PAYMENT', 'Pago de viaje'), ('SETTLEMENT', 'Liquidación a conductor'), ('ADJUSTMENT', 'Ajuste')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='SettlementPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pendiente'), ('DONE', 'Liquidada')], default='PENDING', max_length=20)),
+                ('drivers_paid', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('seconds', models.FloatField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='partition_set', to='payments.settlementrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'index'), name='settlementpartition_run_index_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Payout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('trips', models.PositiveIntegerField(default=0, help_text='Viajes pagados desde la liquidación anterior')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='payouts', to='payments.account')),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='payout', to='payments.ledgertransaction')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='payouts', to='payments.settlementrun')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('run', 'account'), name='payout_run_account_uniq')],
+            },
+        ),
+    ]
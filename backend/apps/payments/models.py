@@ -1,3 +1,160 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
 
-# Create your models here.
+
+class Account(models.Model):
+    """
+    Cuenta del libro mayor. Una por cliente (lo que debe por sus viajes), una
+    por conductor (lo que la plataforma le debe), la de comisiones de la
+    plataforma y la de pagos hechos a conductores (liquidaciones).
+    Los saldos llevan signo: débitos positivos, créditos negativos.
+    """
+    class Kind(models.TextChoices):
+        CLIENT = 'CLIENT', 'Cliente'
+        DRIVER = 'DRIVER', 'Conductor'
+        COMMISSION = 'COMMISSION', 'Comisiones de la plataforma'
+        PAYOUTS = 'PAYOUTS', 'Pagos a conductores'
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.PROTECT, null=True, blank=True, related_name='ledger_accounts'
+    )
+    currency = models.CharField(max_length=3, default='COP')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'user'], name='account_kind_user_uniq'),
+            # Cuentas de la plataforma (sin usuario): una por tipo
+            models.UniqueConstraint(fields=['kind'], condition=Q(user__isnull=True), name='account_platform_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.user or ''}".strip()
+
+
+class LedgerTransaction(models.Model):
+    """
+    Asiento contable: un conjunto de LedgerEntry que suma cero. La llave de
+    idempotencia hace que repetir una escritura (reintento, doble click, job
+    relanzado) devuelva el asiento ya existente en lugar de duplicarlo.
+    """
+    class Kind(models.TextChoices):
+        TRIP_PAYMENT = 'TRIP_PAYMENT', 'Pago de viaje'
+        SETTLEMENT = 'SETTLEMENT', 'Liquidación a conductor'
+        ADJUSTMENT = 'ADJUSTMENT', 'Ajuste'
+
+    idempotency_key = models.CharField(max_length=100, unique=True)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    # Sin FK: los viajes se archivan (se borran de Trip) y el libro no debe perder nada
+    trip_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    description = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.idempotency_key}"
+
+
+class LedgerEntry(models.Model):
+    """
+    Movimiento de una cuenta. Solo se insertan (un trigger rechaza UPDATE y
+    DELETE); una corrección es un asiento nuevo de tipo ADJUSTMENT.
+    """
+    id = models.BigAutoField(primary_key=True)
+    transaction = models.ForeignKey(LedgerTransaction, on_delete=models.PROTECT, related_name='entries')
+    account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name='entries')
+    amount = models.DecimalField(max_digits=14, decimal_places=2, help_text="Débito positivo, crédito negativo")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Movimientos posteriores a la última foto del saldo (ver ledger.balance)
+            models.Index(fields=['account', 'id'], name='ledgerentry_account_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.account}: {self.amount}"
+
+
+class BalanceSnapshot(models.Model):
+    """
+    Foto periódica del saldo de una cuenta hasta el movimiento `last_entry_id`
+    (incluido). Saldo actual = última foto + movimientos posteriores.
+    """
+    account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name='snapshots')
+    last_entry_id = models.BigIntegerField()
+    balance = models.DecimalField(max_digits=14, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'last_entry_id'], name='snapshot_account_entry_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.account} = {self.balance} (hasta #{self.last_entry_id})"
+
+
+class SettlementRun(models.Model):
+    """
+    Liquidación de conductores hasta period_end. Paga el saldo de cada cuenta
+    de conductor con los movimientos hasta cutoff_entry_id (fijado al crear la
+    corrida). Ver apps.payments.settlement.
+    """
+    class Status(models.TextChoices):
+        RUNNING = 'RUNNING', 'En curso'
+        COMPLETED = 'COMPLETED', 'Completada'
+
+    period_end = models.DateTimeField(unique=True)
+    cutoff_entry_id = models.BigIntegerField()
+    partitions = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.RUNNING)
+    drivers_paid = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Liquidación hasta {self.period_end:%Y-%m-%d} ({self.get_status_display()})"
+
+
+class SettlementPartition(models.Model):
+    """
+    Checkpoint de una corrida: cuentas de conductor con id % partitions = index.
+    Cada partición se liquida en una sola transacción; al reanudar se saltan las DONE.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pendiente'
+        DONE = 'DONE', 'Liquidada'
+
+    run = models.ForeignKey(SettlementRun, on_delete=models.CASCADE, related_name='partition_set')
+    index = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    drivers_paid = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    seconds = models.FloatField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'index'], name='settlementpartition_run_index_uniq'),
+        ]
+
+
+class Payout(models.Model):
+    """Pago de una corrida a un conductor (con su asiento SETTLEMENT en el libro)"""
+    run = models.ForeignKey(SettlementRun, on_delete=models.PROTECT, related_name='payouts')
+    account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name='payouts')
+    transaction = models.OneToOneField(LedgerTransaction, on_delete=models.PROTECT, related_name='payout')
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    trips = models.PositiveIntegerField(default=0, help_text="Viajes pagados desde la liquidación anterior")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'account'], name='payout_run_account_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.account}: {self.amount}"
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from .models import LedgerEntry
+
+
+class LedgerEntrySerializer(serializers.ModelSerializer):
+    kind = serializers.CharField(source='transaction.kind', read_only=True)
+    trip_id = serializers.IntegerField(source='transaction.trip_id', read_only=True)
+    description = serializers.CharField(source='transaction.description', read_only=True)
+
+    class Meta:
+        model = LedgerEntry
+        fields = ['id', 'amount', 'kind', 'trip_id', 'description', 'created_at']
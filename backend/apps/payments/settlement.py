@@ -0,0 +1,224 @@
+"""
+Liquidación por lotes de las ganancias de los conductores.
+
+Una corrida (SettlementRun) paga, para cada cuenta de conductor, su saldo con
+los movimientos hasta cutoff_entry_id: el último movimiento anterior a
+period_end. Como se paga el saldo (y no "los viajes de la semana"), un
+movimiento que se confirme tarde con un id menor queda en el saldo de la
+corrida siguiente.
+
+Las cuentas se reparten en `partitions` grupos (id % partitions) que un pool
+de procesos liquida en paralelo. Cada partición hace un número fijo de
+sentencias, sin importar cuántos conductores tenga:
+- un SELECT con los saldos (última foto + movimientos hasta el corte) y los
+  viajes pagados desde la corrida anterior, todo agregado en la base;
+- un SELECT ... FOR UPDATE de las cuentas, en orden de id (ver apps.payments.ledger);
+- bulk_create de los asientos SETTLEMENT, sus movimientos y los Payout;
+- el UPDATE del checkpoint (SettlementPartition DONE) en la misma transacción.
+
+Relanzar el comando con el mismo period_end reanuda la corrida: las
+particiones DONE se saltan y la llave settlement:{corrida}:{cuenta} impide
+pagar dos veces aunque algo falle a mitad.
+
+Las corridas van en orden: no se crea una con period_end anterior a la última
+(su saldo al corte no vería lo que pagó la posterior y lo pagaría de nuevo) ni
+una nueva mientras la última siga sin terminar. Los pagos de una corrida se
+escriben al ejecutarla, no en su period_end (corrida atrasada o reanudada días
+después): el corte de la siguiente llega al menos hasta el último de ellos,
+para que su saldo descuente lo ya pagado.
+
+python manage.py settle_drivers (programar semanalmente, p. ej. lunes 02:00)
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time as day_time, timedelta
+from decimal import Decimal
+from multiprocessing import get_context
+
+import django
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .models import Account, LedgerEntry, LedgerTransaction, Payout, SettlementPartition, SettlementRun
+
+# Saldo al corte y viajes pagados en (previous, cutoff] de cada cuenta de conductor de la partición
+BALANCES_SQL = """
+    SELECT a.id,
+           coalesce(s.balance, 0) + coalesce(d.total, 0) AS balance,
+           coalesce(p.trips, 0) AS trips
+    FROM payments_account a
+    LEFT JOIN LATERAL (
+        SELECT last_entry_id, balance FROM payments_balancesnapshot
+        WHERE account_id = a.id AND last_entry_id <= %(cutoff)s
+        ORDER BY last_entry_id DESC LIMIT 1
+    ) s ON true
+    LEFT JOIN LATERAL (
+        SELECT sum(amount) AS total FROM payments_ledgerentry
+        WHERE account_id = a.id AND id > coalesce(s.last_entry_id, 0) AND id <= %(cutoff)s
+    ) d ON true
+    LEFT JOIN LATERAL (
+        SELECT count(*) AS trips
+        FROM payments_ledgerentry e JOIN payments_ledgertransaction t ON t.id = e.transaction_id
+        WHERE e.account_id = a.id AND e.id > %(previous)s AND e.id <= %(cutoff)s
+          AND t.kind = 'TRIP_PAYMENT'
+    ) p ON true
+    WHERE a.kind = 'DRIVER' AND a.id %% %(partitions)s = %(index)s
+"""
+
+
+def default_period_end():
+    """Inicio (00:00, hora local) del lunes de esta semana"""
+    today = timezone.localdate()
+    monday = today - timedelta(days=today.weekday())
+    return timezone.make_aware(datetime.combine(monday, day_time.min))
+
+
+class SettlementError(Exception):
+    pass
+
+
+def start_run(period_end, partitions):
+    """Corrida de period_end (la existente si se está reanudando) con sus particiones"""
+    with transaction.atomic():
+        run = SettlementRun.objects.select_for_update().filter(period_end=period_end).first()
+        if run is None:
+            # Bloquear la última corrida serializa la creación de corridas nuevas
+            latest = SettlementRun.objects.select_for_update().order_by('-period_end').first()
+            if latest is not None and latest.period_end > period_end:
+                raise SettlementError(
+                    f"Ya existe la corrida hasta {latest.period_end:%Y-%m-%d}; "
+                    f"no se puede liquidar un corte anterior"
+                )
+            if latest is not None and latest.status != SettlementRun.Status.COMPLETED:
+                raise SettlementError(
+                    f"La corrida hasta {latest.period_end:%Y-%m-%d} no terminó; relanzarla con ese corte primero"
+                )
+            # Recorre ids hacia atrás solo por los movimientos posteriores al corte
+            cutoff = (
+                LedgerEntry.objects.filter(created_at__lt=period_end)
+                .order_by('-id').values_list('id', flat=True).first()
+            ) or 0
+            if latest is not None:
+                paid_through = LedgerEntry.objects.filter(
+                    transaction__payout__run=latest
+                ).aggregate(last=Max('id'))['last']
+                cutoff = max(cutoff, latest.cutoff_entry_id, paid_through or 0)
+            run = SettlementRun.objects.create(
+                period_end=period_end, cutoff_entry_id=cutoff, partitions=partitions,
+            )
+            SettlementPartition.objects.bulk_create(
+                SettlementPartition(run=run, index=index) for index in range(partitions)
+            )
+    return run
+
+
+def previous_cutoff(run):
+    previous = (
+        SettlementRun.objects.filter(period_end__lt=run.period_end)
+        .order_by('-period_end').values_list('cutoff_entry_id', flat=True).first()
+    )
+    return previous or 0
+
+
+def settle_partition(run_id, index):
+    """Liquida una partición (en un proceso del pool). Devuelve (conductores, monto, segundos)."""
+    start = time.monotonic()
+    with transaction.atomic():
+        partition = SettlementPartition.objects.select_for_update().select_related('run').get(
+            run_id=run_id, index=index,
+        )
+        if partition.status == SettlementPartition.Status.DONE:
+            return 0, Decimal('0'), 0.0
+        run = partition.run
+
+        with connection.cursor() as cursor:
+            cursor.execute(BALANCES_SQL, {
+                'cutoff': run.cutoff_entry_id, 'previous': previous_cutoff(run),
+                'partitions': run.partitions, 'index': index,
+            })
+            # Saldo negativo en la cuenta de conductor: lo que la plataforma le debe
+            owed = [(account_id, -balance, trips) for account_id, balance, trips in cursor.fetchall() if balance < 0]
+
+        if owed:
+            payouts_account, _ = Account.objects.get_or_create(kind=Account.Kind.PAYOUTS, user=None)
+            account_ids = sorted({account_id for account_id, _, _ in owed} | {payouts_account.pk})
+            list(Account.objects.select_for_update().filter(pk__in=account_ids).order_by('pk'))
+
+            transactions = LedgerTransaction.objects.bulk_create(
+                LedgerTransaction(
+                    idempotency_key=f"settlement:{run.pk}:{account_id}",
+                    kind=LedgerTransaction.Kind.SETTLEMENT,
+                    description=f"Liquidación hasta {run.period_end:%Y-%m-%d}",
+                )
+                for account_id, _, _ in owed
+            )
+            entries = []
+            for txn, (account_id, amount, _) in zip(transactions, owed):
+                entries.append(LedgerEntry(transaction=txn, account_id=account_id, amount=amount))
+                entries.append(LedgerEntry(transaction=txn, account=payouts_account, amount=-amount))
+            LedgerEntry.objects.bulk_create(entries)
+            Payout.objects.bulk_create(
+                Payout(run=run, account_id=account_id, transaction=txn, amount=amount, trips=trips)
+                for txn, (account_id, amount, trips) in zip(transactions, owed)
+            )
+
+        partition.status = SettlementPartition.Status.DONE
+        partition.drivers_paid = len(owed)
+        partition.total_amount = sum((amount for _, amount, _ in owed), Decimal('0'))
+        partition.seconds = time.monotonic() - start
+        partition.finished_at = timezone.now()
+        partition.save()
+    return partition.drivers_paid, partition.total_amount, partition.seconds
+
+
+def run_settlement(period_end=None, partitions=None, workers=None, progress=None):
+    """
+    Crea (o reanuda) la corrida de period_end y liquida sus particiones
+    pendientes con `workers` procesos. `progress(index, conductores, monto, segundos)`
+    se llama al terminar cada partición. Devuelve la corrida.
+    """
+    partitions = partitions or settings.SETTLEMENT_PARTITIONS
+    workers = workers or settings.SETTLEMENT_WORKERS
+    run = start_run(period_end or default_period_end(), partitions)
+    pending = list(
+        run.partition_set.filter(status=SettlementPartition.Status.PENDING)
+        .order_by('index').values_list('index', flat=True)
+    )
+
+    if workers <= 1:
+        for index in pending:
+            result = settle_partition(run.pk, index)
+            if progress:
+                progress(index, *result)
+    elif pending:
+        # Los procesos abren sus propias conexiones; las del padre no se comparten
+        connections.close_all()
+        # spawn: cada proceso arranca limpio y configura Django antes de recibir
+        # tareas (el inicializador no puede vivir en un módulo que importe modelos)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                 initializer=django.setup) as pool:
+            futures = {pool.submit(settle_partition, run.pk, index): index for index in pending}
+            for future in as_completed(futures):
+                result = future.result()
+                if progress:
+                    progress(futures[future], *result)
+
+    return finish_run(run)
+
+
+def finish_run(run):
+    """Marca la corrida COMPLETED si todas sus particiones terminaron y suma sus totales"""
+    partitions = run.partition_set.all()
+    if run.status == SettlementRun.Status.COMPLETED or partitions.exclude(status=SettlementPartition.Status.DONE).exists():
+        return run
+    totals = partitions.aggregate(drivers=Sum('drivers_paid'), amount=Sum('total_amount'))
+    SettlementRun.objects.filter(pk=run.pk).update(
+        status=SettlementRun.Status.COMPLETED,
+        drivers_paid=totals['drivers'] or 0,
+        total_amount=totals['amount'] or Decimal('0'),
+        finished_at=timezone.now(),
+    )
+    run.refresh_from_db()
+    return run
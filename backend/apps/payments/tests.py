@@ -1,3 +1,168 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.drivers.models import DriverProfile
+from apps.trips.models import Trip
+
+from .ledger import LedgerError, balance, get_account, post_transaction, record_trip_payment, snapshot_account
+from .models import Account, LedgerEntry, LedgerTransaction, Payout, SettlementPartition, SettlementRun
+from .settlement import SettlementError, run_settlement, start_run
+
+User = get_user_model()
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(username='cliente', email='c@test.co', password='x')
+        self.driver_user = User.objects.create_user(username='conductor', email='d@test.co', password='x', role='DRIVER')
+        self.driver = DriverProfile.objects.create(user=self.driver_user, license_number='ABC123')
+
+    def completed_trip(self, price):
+        return Trip.objects.create(
+            client=self.client_user, driver=self.driver, status=Trip.Status.COMPLETED,
+            pickup_address='Calle 1', destination_address='Calle 2', estimated_price=price,
+        )
+
+    def test_trip_payment_is_idempotent_per_trip(self):
+        trip = self.completed_trip(Decimal('10000'))
+
+        first = record_trip_payment(trip)
+        second = record_trip_payment(trip)
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(LedgerTransaction.objects.filter(trip_id=trip.pk).count(), 1)
+        self.assertEqual(LedgerEntry.objects.filter(transaction=first).count(), 3)
+        driver_account = get_account(Account.Kind.DRIVER, self.driver_user)
+        commission = (Decimal('10000') * Decimal(str(settings.PAYMENTS_COMMISSION_RATE))).quantize(Decimal('0.01'))
+        self.assertEqual(balance(driver_account), -(Decimal('10000') - commission))
+
+    def test_same_key_returns_original_transaction(self):
+        client, driver = get_account(Account.Kind.CLIENT, self.client_user), get_account(Account.Kind.DRIVER, self.driver_user)
+
+        txn, created = post_transaction('manual:1', LedgerTransaction.Kind.TRIP_PAYMENT, [(client, 5), (driver, -5)])
+        again, created_again = post_transaction('manual:1', LedgerTransaction.Kind.TRIP_PAYMENT, [(client, 7), (driver, -7)])
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(txn.pk, again.pk)
+        self.assertEqual(balance(client), Decimal('5.00'))
+
+    def test_unbalanced_transaction_is_rejected(self):
+        client, driver = get_account(Account.Kind.CLIENT, self.client_user), get_account(Account.Kind.DRIVER, self.driver_user)
+
+        with self.assertRaises(LedgerError):
+            post_transaction('manual:2', LedgerTransaction.Kind.TRIP_PAYMENT, [(client, 5), (driver, -4)])
+        self.assertFalse(LedgerTransaction.objects.filter(idempotency_key='manual:2').exists())
+
+    def test_balance_after_snapshot(self):
+        client, driver = get_account(Account.Kind.CLIENT, self.client_user), get_account(Account.Kind.DRIVER, self.driver_user)
+        post_transaction('manual:3', LedgerTransaction.Kind.TRIP_PAYMENT, [(client, 5), (driver, -5)])
+        self.assertIsNotNone(snapshot_account(client))
+        post_transaction('manual:4', LedgerTransaction.Kind.TRIP_PAYMENT, [(client, 3), (driver, -3)])
+
+        self.assertEqual(balance(client), Decimal('8.00'))
+        # Sin movimientos nuevos no hay foto nueva
+        snapshot_account(client)
+        self.assertIsNone(snapshot_account(client))
+
+
+def monday(weeks_ago):
+    today = timezone.localdate()
+    day = today - timedelta(days=today.weekday(), weeks=weeks_ago)
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def at(moment):
+    """Fija el reloj: created_at (auto_now_add) se escribe en el INSERT; el libro no admite UPDATE"""
+    return mock.patch('django.utils.timezone.now', return_value=moment)
+
+
+class SettlementTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(username='cliente', email='c@test.co', password='x')
+        self.driver_user = User.objects.create_user(username='conductor', email='d@test.co', password='x', role='DRIVER')
+        self.driver_account = get_account(Account.Kind.DRIVER, self.driver_user)
+
+    def earn(self, key, amount, created_at):
+        """Ganancia de un viaje del conductor con fecha `created_at`"""
+        client_account = get_account(Account.Kind.CLIENT, self.client_user)
+        with at(created_at):
+            post_transaction(key, LedgerTransaction.Kind.TRIP_PAYMENT, [
+                (client_account, amount),
+                (self.driver_account, -amount),
+            ])
+
+    def paid(self):
+        return sum(Payout.objects.filter(account=self.driver_account).values_list('amount', flat=True), Decimal('0'))
+
+    def test_settles_balance_up_to_cutoff(self):
+        self.earn('trip:1', Decimal('100.00'), monday(2) + timedelta(days=1))
+        self.earn('trip:2', Decimal('50.00'), monday(1) + timedelta(days=1))
+
+        run = run_settlement(monday(1), partitions=2, workers=1)
+
+        self.assertEqual(run.status, SettlementRun.Status.COMPLETED)
+        self.assertEqual(self.paid(), Decimal('100.00'))
+        # Lo posterior al corte queda para la corrida siguiente
+        self.assertEqual(balance(self.driver_account), Decimal('-50.00'))
+
+    def test_rerun_same_period_does_not_pay_twice(self):
+        self.earn('trip:1', Decimal('100.00'), monday(2) + timedelta(days=1))
+
+        run_settlement(monday(1), partitions=2, workers=1)
+        run = run_settlement(monday(1), partitions=2, workers=1)
+
+        self.assertEqual(SettlementRun.objects.count(), 1)
+        self.assertEqual(run.drivers_paid, 1)
+        self.assertEqual(self.paid(), Decimal('100.00'))
+
+    def test_resume_settles_only_pending_partitions(self):
+        self.earn('trip:1', Decimal('100.00'), monday(2) + timedelta(days=1))
+        run = start_run(monday(1), partitions=1)
+        partition = run.partition_set.get()
+
+        run = run_settlement(monday(1), workers=1)
+        partition.refresh_from_db()
+
+        self.assertEqual(partition.status, SettlementPartition.Status.DONE)
+        self.assertEqual(run.status, SettlementRun.Status.COMPLETED)
+        self.assertEqual(self.paid(), Decimal('100.00'))
+
+    def test_earlier_period_after_later_run_is_refused(self):
+        self.earn('trip:1', Decimal('100.00'), monday(3) + timedelta(days=1))
+        self.earn('trip:2', Decimal('50.00'), monday(2) + timedelta(days=1))
+
+        run_settlement(monday(1), partitions=1, workers=1)  # W2
+        with self.assertRaises(SettlementError):
+            run_settlement(monday(2), partitions=1, workers=1)  # W1
+
+        self.assertEqual(SettlementRun.objects.count(), 1)
+        self.assertEqual(self.paid(), Decimal('150.00'))
+        self.assertEqual(balance(self.driver_account), Decimal('0.00'))
+
+    def test_late_run_payouts_count_in_next_run(self):
+        self.earn('trip:1', Decimal('100.00'), monday(2) + timedelta(days=1))
+        self.earn('trip:2', Decimal('50.00'), monday(1) + timedelta(days=1))
+
+        # W1 se liquida tarde: sus pagos quedan con fecha posterior al corte de W2
+        with at(monday(0) + timedelta(hours=12)):
+            run_settlement(monday(1), partitions=1, workers=1)
+        self.assertEqual(self.paid(), Decimal('100.00'))
+
+        run = run_settlement(monday(0), partitions=1, workers=1)
+
+        self.assertEqual(run.total_amount, Decimal('50.00'))
+        self.assertEqual(self.paid(), Decimal('150.00'))
+        self.assertEqual(balance(self.driver_account), Decimal('0.00'))
+
+    def test_new_run_waits_for_unfinished_run(self):
+        start_run(monday(2), partitions=1)
 
-# Create your tests here.
+        with self.assertRaises(SettlementError):
+            start_run(monday(1), partitions=1)
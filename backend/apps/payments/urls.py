@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import BalanceView
+
+urlpatterns = [
+    path('balance/', BalanceView.as_view(), name='payments-balance'),
+]
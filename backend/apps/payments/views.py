@@ -1,3 +1,30 @@
-from django.shortcuts import render
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .ledger import balance
+from .models import Account
+from .serializers import LedgerEntrySerializer
+
+RECENT_ENTRIES = 20
+
+
+class BalanceView(APIView):
+    """
+    Saldo de las cuentas del usuario (cliente y/o conductor) con sus últimos movimientos
+    GET /payments/balance/
+    Los saldos llevan signo: negativo en la cuenta de conductor es lo que se le debe.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        accounts = []
+        for account in Account.objects.filter(user=request.user).order_by('kind'):
+            entries = account.entries.select_related('transaction').order_by('-id')[:RECENT_ENTRIES]
+            accounts.append({
+                'kind': account.kind,
+                'currency': account.currency,
+                'balance': balance(account),
+                'entries': LedgerEntrySerializer(entries, many=True).data,
+            })
+        return Response({'accounts': accounts})
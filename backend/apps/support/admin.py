@@ -1,3 +1,14 @@
 from django.contrib import admin
+from .models import SupportTicket
+from .search import FullTextSearchAdminMixin
 
-# Register your models here.
+
+@admin.register(SupportTicket)
+class SupportTicketAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'subject', 'requester', 'assignee', 'trip_id', 'status', 'priority', 'created_at')
+    list_filter = ('status', 'priority')
+    list_select_related = ('requester', 'assignee')
+    # La búsqueda usa search_vector (asunto y descripción); search_fields solo activa el cuadro
+    search_fields = ('subject',)
+    raw_id_fields = ('requester', 'assignee')
+    readonly_fields = ('created_at', 'updated_at')
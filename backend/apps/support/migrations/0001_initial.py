@@ -0,0 +1,71 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:39
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations, models
+
+# Español sin tildes: "cancelacion" encuentra "cancelación" (ver apps.support.search.CONFIG)
+CONFIG_SQL = """
+    CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = pg_catalog.spanish);
+    ALTER TEXT SEARCH CONFIGURATION es_unaccent
+        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+"""
+
+# Asunto con peso A y descripción con peso B, recalculado solo si cambian
+TRIGGER_SQL = """
+    CREATE FUNCTION support_ticket_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('es_unaccent', coalesce(NEW.subject, '')), 'A') ||
+            setweight(to_tsvector('es_unaccent', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER support_supportticket_search_vector
+        BEFORE INSERT OR UPDATE OF subject, description ON support_supportticket
+        FOR EACH ROW EXECUTE FUNCTION support_ticket_search_vector();
+"""
+
+DROP_TRIGGER_SQL = """
+    DROP TRIGGER support_supportticket_search_vector ON support_supportticket;
+    DROP FUNCTION support_ticket_search_vector();
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunSQL(CONFIG_SQL, 'DROP TEXT SEARCH CONFIGURATION es_unaccent;'),
+        migrations.CreateModel(
+            name='SupportTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trip_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('subject', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('status', models.CharField(choices=[('OPEN', 'Abierto'), ('PENDING', 'Esperando respuesta'), ('RESOLVED', 'Resuelto'), ('CLOSED', 'Cerrado')], default='OPEN', max_length=20)),
+                ('priority', models.CharField(choices=[('LOW', 'Baja'), ('NORMAL', 'Normal'), ('HIGH', 'Alta'), ('URGENT', 'Urgente')], default='NORMAL', max_length=20)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('assignee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_tickets', to=settings.AUTH_USER_MODEL)),
+                ('requester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='support_tickets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='ticket_search_idx'), models.Index(fields=['status', '-created_at'], name='ticket_status_created_idx')],
+            },
+        ),
+        migrations.RunSQL(TRIGGER_SQL, DROP_TRIGGER_SQL),
+    ]
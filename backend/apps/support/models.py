@@ -1,3 +1,49 @@
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
-# Create your models here.
+
+class SupportTicket(models.Model):
+    """
+    Caso de soporte abierto por un cliente o conductor, opcionalmente sobre un viaje.
+    search_vector lo mantiene un trigger (asunto con peso A, descripción con
+    peso B; ver apps.support.search).
+    """
+    class Status(models.TextChoices):
+        OPEN = 'OPEN', 'Abierto'
+        PENDING = 'PENDING', 'Esperando respuesta'
+        RESOLVED = 'RESOLVED', 'Resuelto'
+        CLOSED = 'CLOSED', 'Cerrado'
+
+    class Priority(models.TextChoices):
+        LOW = 'LOW', 'Baja'
+        NORMAL = 'NORMAL', 'Normal'
+        HIGH = 'HIGH', 'Alta'
+        URGENT = 'URGENT', 'Urgente'
+
+    requester = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='support_tickets')
+    assignee = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_tickets'
+    )
+    # Sin FK: el viaje puede pasar a las tablas de archivo (apps.trips.archive)
+    trip_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    subject = models.CharField(max_length=200)
+    description = models.TextField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.OPEN)
+    priority = models.CharField(max_length=20, choices=Priority.choices, default=Priority.NORMAL)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='ticket_search_idx'),
+            # Bandeja de los agentes: casos abiertos, más recientes primero
+            models.Index(fields=['status', '-created_at'], name='ticket_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.subject}"
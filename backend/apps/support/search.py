@@ -0,0 +1,83 @@
+"""
+Búsqueda de texto completo (PostgreSQL) en casos de soporte y mensajes de chat.
+
+Cada tabla tiene una columna tsvector (search_vector) que mantiene un trigger
+al insertar o cambiar el texto, con su índice GIN; buscar es un
+`search_vector @@ websearch_to_tsquery(...)` que resuelve el índice, en lugar
+del icontains que recorre toda la tabla. La configuración es_unaccent es
+español con stemming y sin tildes ("cancelacion" encuentra "cancelación" y
+"cancelado").
+
+La sintaxis es la de un buscador: palabras (todas deben estar), "frase exacta",
+a or b, -excluir.
+
+Los mensajes se buscan en las tablas activa y de archivo, solo los asociados a
+un viaje y dentro de una ventana (SUPPORT_SEARCH_DAYS por defecto).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F
+from django.utils import timezone
+
+from apps.chat.models import ArchivedMessage, Message
+from .models import SupportTicket
+
+# Debe coincidir con la de los triggers (migraciones support 0001 y chat 0003)
+CONFIG = 'es_unaccent'
+
+MESSAGE_FIELDS = ('id', 'trip_id', 'sender_id', 'receiver_id', 'timestamp')
+
+
+def parse_query(text):
+    return SearchQuery(text, config=CONFIG, search_type='websearch')
+
+
+def highlight(field, query):
+    return SearchHeadline(field, query, config=CONFIG, start_sel='<mark>', stop_sel='</mark>', max_fragments=2)
+
+
+def search_tickets(text, queryset=None):
+    """Casos que coinciden con `text`, los más relevantes primero (asunto pesa más)"""
+    query = parse_query(text)
+    queryset = SupportTicket.objects.all() if queryset is None else queryset
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .order_by('-rank', '-created_at')
+    )
+
+
+def search_messages(text, trip_id=None, days=None, limit=50):
+    """
+    Mensajes de viajes (activos y archivados) que coinciden con `text`, con el
+    fragmento resaltado. Devuelve una lista de dicts ordenada por relevancia.
+    """
+    query = parse_query(text)
+    since = timezone.now() - timedelta(days=days or settings.SUPPORT_SEARCH_DAYS)
+    results = []
+    for model in (Message, ArchivedMessage):
+        queryset = model.objects.filter(search_vector=query, timestamp__gte=since, trip__isnull=False)
+        if trip_id is not None:
+            queryset = queryset.filter(trip_id=trip_id)
+        rows = (
+            queryset.annotate(rank=SearchRank(F('search_vector'), query), headline=highlight('content', query))
+            .order_by('-rank', '-timestamp')
+            .values(*MESSAGE_FIELDS, 'rank', 'headline')[:limit]
+        )
+        results.extend(dict(row, archived=model is ArchivedMessage) for row in rows)
+    results.sort(key=lambda row: (row['rank'], row['timestamp']), reverse=True)
+    return results[:limit]
+
+
+class FullTextSearchAdminMixin:
+    """
+    Mixin para ModelAdmin con search_vector: el cuadro de búsqueda usa el
+    índice de texto completo en lugar de icontains sobre el contenido.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(search_vector=parse_query(search_term)), False
@@ -0,0 +1,49 @@
+from django.db.models import Q
+from rest_framework import serializers
+
+from apps.trips.models import ArchivedTrip, Trip
+from .models import SupportTicket
+
+
+class SupportTicketSerializer(serializers.ModelSerializer):
+    """Caso visto por quien lo abre: estado, prioridad y asignación los deciden los agentes"""
+    requester_username = serializers.CharField(source='requester.username', read_only=True)
+
+    class Meta:
+        model = SupportTicket
+        fields = [
+            'id', 'requester', 'requester_username', 'assignee', 'trip_id', 'subject', 'description',
+            'status', 'priority', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['requester', 'assignee', 'status', 'priority', 'created_at', 'updated_at']
+
+    def validate_trip_id(self, value):
+        """El viaje (activo o archivado) debe ser del usuario, como cliente o conductor"""
+        if value is None:
+            return value
+        user = self.context['request'].user
+        if user.role in ('ADMIN', 'MODERATOR') or user.is_staff:
+            return value
+        mine = Q(id=value) & (Q(client=user) | Q(driver__user=user))
+        if not (Trip.objects.filter(mine).exists() or ArchivedTrip.objects.filter(mine).exists()):
+            raise serializers.ValidationError('El viaje no existe o no es tuyo')
+        return value
+
+
+class AgentTicketSerializer(SupportTicketSerializer):
+    """Caso visto por administradores y moderadores: pueden asignarlo y cambiar estado y prioridad"""
+
+    class Meta(SupportTicketSerializer.Meta):
+        read_only_fields = ['requester', 'created_at', 'updated_at']
+
+    def validate_assignee(self, value):
+        if value is not None and not (value.role in ('ADMIN', 'MODERATOR') or value.is_staff):
+            raise serializers.ValidationError('Solo se puede asignar a un administrador o moderador')
+        return value
+
+
+class TicketSearchSerializer(SupportTicketSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(SupportTicketSerializer.Meta):
+        fields = SupportTicketSerializer.Meta.fields + ['rank']
@@ -1,3 +1,155 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.chat.models import ArchivedMessage, Message
+from apps.trips.models import ArchivedTrip, Trip
+from .models import SupportTicket
+from .search import search_messages, search_tickets
+
+User = get_user_model()
+
+
+class TicketPermissionTests(TestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='cliente', email='c@test.co', password='x')
+        self.agent = User.objects.create_user(username='moderador', email='m@test.co', password='x', role='MODERATOR')
+        self.ticket = SupportTicket.objects.create(
+            requester=self.requester, subject='Cobro doble', description='Me cobraron dos veces',
+        )
+        self.api = APIClient()
+
+    def detail(self):
+        return reverse('ticket-detail', args=[self.ticket.pk])
+
+    def test_requester_cannot_set_status_or_priority_on_create(self):
+        self.api.force_authenticate(self.requester)
+
+        response = self.api.post(reverse('ticket-list'), {
+            'subject': 'Otro caso', 'description': 'Detalle', 'status': 'CLOSED', 'priority': 'URGENT',
+        })
+
+        self.assertEqual(response.status_code, 201)
+        ticket = SupportTicket.objects.get(pk=response.data['id'])
+        self.assertEqual(ticket.status, SupportTicket.Status.OPEN)
+        self.assertEqual(ticket.priority, SupportTicket.Priority.NORMAL)
+
+    def test_requester_cannot_update_or_delete(self):
+        self.api.force_authenticate(self.requester)
+
+        patch = self.api.patch(self.detail(), {'status': 'CLOSED', 'priority': 'URGENT'})
+        delete = self.api.delete(self.detail())
+
+        self.assertEqual(patch.status_code, 403)
+        self.assertEqual(delete.status_code, 403)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, SupportTicket.Status.OPEN)
+        self.assertEqual(self.ticket.priority, SupportTicket.Priority.NORMAL)
+
+    def test_agent_updates_status_priority_and_assignee(self):
+        self.api.force_authenticate(self.agent)
+
+        response = self.api.patch(self.detail(), {'status': 'PENDING', 'priority': 'HIGH', 'assignee': self.agent.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, SupportTicket.Status.PENDING)
+        self.assertEqual(self.ticket.priority, SupportTicket.Priority.HIGH)
+        self.assertEqual(self.ticket.assignee, self.agent)
+
+    def test_assignee_must_be_an_agent(self):
+        self.api.force_authenticate(self.agent)
+
+        response = self.api.patch(self.detail(), {'assignee': self.requester.pk})
+
+        self.assertEqual(response.status_code, 400)
+        self.ticket.refresh_from_db()
+        self.assertIsNone(self.ticket.assignee)
+
+
+class TicketSearchTests(TestCase):
+    def setUp(self):
+        self.requester = User.objects.create_user(username='cliente', email='c@test.co', password='x')
+
+    def ticket(self, subject, description):
+        return SupportTicket.objects.create(requester=self.requester, subject=subject, description=description)
+
+    def test_matches_without_accents_and_by_stem(self):
+        cancelled = self.ticket('Cancelación del viaje', 'El conductor canceló sin avisar')
+        self.ticket('Cobro doble', 'Me cobraron dos veces')
+
+        self.assertEqual(list(search_tickets('cancelacion')), [cancelled])
+        self.assertEqual(list(search_tickets('cancelado')), [cancelled])
+
+    def test_subject_ranks_above_description(self):
+        in_description = self.ticket('Problema con el pago', 'La tarjeta fue rechazada')
+        in_subject = self.ticket('Tarjeta rechazada', 'No pude pagar el viaje')
+
+        self.assertEqual(list(search_tickets('tarjeta')), [in_subject, in_description])
+
+    def test_websearch_phrase_and_exclusion(self):
+        double = self.ticket('Cobro doble', 'Me cobraron dos veces con tarjeta')
+        self.ticket('Doble parada', 'El cobro no incluyó la parada')
+        cash = self.ticket('Cobro doble en efectivo', 'Pagué dos veces')
+
+        self.assertEqual(set(search_tickets('"cobro doble"')), {double, cash})
+        self.assertEqual(list(search_tickets('"cobro doble" -tarjeta')), [cash])
+
+    def test_search_vector_follows_edits(self):
+        ticket = self.ticket('Objeto olvidado', 'Dejé la billetera')
+        ticket.description = 'Dejé el celular'
+        ticket.save()
+
+        self.assertEqual(list(search_tickets('celular')), [ticket])
+        self.assertEqual(list(search_tickets('billetera')), [])
+
+
+class MessageSearchTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(username='cliente', email='c@test.co', password='x')
+        self.driver_user = User.objects.create_user(username='conductor', email='d@test.co', password='x', role='DRIVER')
+        self.trip = Trip.objects.create(client=self.client_user, pickup_address='Calle 1', destination_address='Calle 2')
+        now = timezone.now()
+        self.archived_trip = ArchivedTrip.objects.create(
+            id=self.trip.pk + 1000, client=self.client_user, pickup_address='Calle 3', destination_address='Calle 4',
+            status=ArchivedTrip.Status.COMPLETED, created_at=now - timedelta(days=3), updated_at=now - timedelta(days=3),
+        )
+
+    def message(self, content):
+        return Message.objects.create(trip=self.trip, sender=self.client_user, receiver=self.driver_user, content=content)
+
+    def archived_message(self, pk, content, days_ago=2):
+        return ArchivedMessage.objects.create(
+            id=pk, trip=self.archived_trip, sender=self.client_user, receiver=self.driver_user,
+            content=content, timestamp=timezone.now() - timedelta(days=days_ago),
+        )
+
+    def test_returns_active_and_archived_messages(self):
+        active = self.message('Olvidé la billetera en el asiento')
+        archived = self.archived_message(1, 'Creo que dejé mi billetera en su carro')
+        self.message('Ya voy llegando')
+
+        results = search_messages('billetera')
+
+        self.assertEqual({(row['id'], row['archived']) for row in results}, {(active.pk, False), (archived.pk, True)})
+        self.assertTrue(all('<mark>' in row['headline'] for row in results))
+
+    def test_filters_by_trip_and_window(self):
+        self.message('La billetera es negra')
+        archived = self.archived_message(1, 'Una billetera café')
+        self.archived_message(2, 'Billetera de hace mucho', days_ago=400)
+
+        results = search_messages('billetera', trip_id=self.archived_trip.pk, days=30)
+
+        self.assertEqual([(row['id'], row['archived']) for row in results], [(archived.pk, True)])
+
+    def test_limit_applies_to_merged_results(self):
+        self.message('billetera')
+        self.archived_message(1, 'billetera')
+        self.archived_message(2, 'billetera')
 
-# Create your tests here.
+        self.assertEqual(len(search_messages('billetera', limit=2)), 2)
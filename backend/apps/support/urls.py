@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import MessageSearchView, SupportTicketViewSet
+
+router = DefaultRouter()
+router.register(r'tickets', SupportTicketViewSet, basename='ticket')
+
+urlpatterns = [
+    path('messages/search/', MessageSearchView.as_view(), name='support-message-search'),
+    path('', include(router.urls)),
+]
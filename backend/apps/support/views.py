@@ -1,3 +1,87 @@
-from django.shortcuts import render
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from apps.accounts.permissions import IsAdmin, IsModerator
+from .models import SupportTicket
+from .search import search_messages, search_tickets
+from .serializers import AgentTicketSerializer, SupportTicketSerializer, TicketSearchSerializer
+
+MAX_RESULTS = 50
+
+
+def is_agent(user):
+    return user.role in ('ADMIN', 'MODERATOR') or user.is_staff
+
+
+def result_limit(params):
+    try:
+        return max(1, min(int(params.get('limit', 20)), MAX_RESULTS))
+    except ValueError:
+        return 20
+
+
+class SupportTicketViewSet(viewsets.ModelViewSet):
+    """
+    Casos de soporte: cada usuario abre y ve los suyos; administradores y
+    moderadores ven todos y son los únicos que los editan (estado, prioridad,
+    asignación) o eliminan
+    """
+    serializer_class = SupportTicketSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    agent_actions = ('update', 'partial_update', 'destroy')
+
+    def get_permissions(self):
+        if self.action in self.agent_actions:
+            return [permissions.IsAuthenticated(), (IsAdmin | IsModerator)()]
+        return super().get_permissions()
+
+    def get_serializer_class(self):
+        if is_agent(self.request.user):
+            return AgentTicketSerializer
+        return SupportTicketSerializer
+
+    def get_queryset(self):
+        queryset = SupportTicket.objects.select_related('requester')
+        if is_agent(self.request.user):
+            return queryset
+        return queryset.filter(requester=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(requester=self.request.user)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated, (IsAdmin | IsModerator)])
+    def search(self, request):
+        """
+        Búsqueda de texto completo en asunto y descripción
+        GET /support/tickets/search/?q="no llegó" cobro&status=OPEN&limit=20
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({'error': 'q es obligatorio'}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.get_queryset()
+        if request.query_params.get('status'):
+            queryset = queryset.filter(status=request.query_params['status'].upper())
+        tickets = search_tickets(text, queryset)[:result_limit(request.query_params)]
+        return Response({'results': TicketSearchSerializer(tickets, many=True).data})
+
+
+class MessageSearchView(APIView):
+    """
+    Búsqueda de texto completo en los mensajes de chat de los viajes (activos y archivados)
+    GET /support/messages/search/?q=billetera olvidada&trip=123&days=90&limit=20
+    """
+    permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsModerator)]
+
+    def get(self, request):
+        params = request.query_params
+        text = params.get('q', '').strip()
+        if not text:
+            return Response({'error': 'q es obligatorio'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            trip_id = int(params['trip']) if params.get('trip') else None
+            days = int(params['days']) if params.get('days') else None
+        except ValueError:
+            return Response({'error': 'trip y days deben ser enteros'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': search_messages(text, trip_id, days, result_limit(params))})
@@ -1,24 +1,37 @@
 from django.contrib import admin
+from backend.admin_utils import IndexedSearchMixin
 from .models import Trip, TripOffer, Rating
 
+# Ver backend/admin_utils.py: conteo estimado, búsqueda por UNION indexada y
+# date_hierarchy por rangos sobre los índices de created_at
+
 @admin.register(Trip)
-class TripAdmin(admin.ModelAdmin):
+class TripAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'client', 'driver', 'status', 'created_at', 'updated_at')
-    list_filter = ('status', 'created_at')
-    search_fields = ('client__username', 'driver__user__username', 'pickup_address', 'destination_address')
+    list_filter = ('status',)
+    list_select_related = ('client', 'driver__user')
+    search_fields = ('=id', 'client__username', 'driver__user__username', 'pickup_address', 'destination_address')
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('client', 'driver')
 
 
 @admin.register(TripOffer)
-class TripOfferAdmin(admin.ModelAdmin):
+class TripOfferAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'trip', 'driver', 'offered_price', 'estimated_arrival_time', 'status', 'created_at')
-    list_filter = ('status', 'created_at')
-    search_fields = ('trip__id', 'driver__user__username', 'driver__user__email')
+    list_filter = ('status',)
+    list_select_related = ('trip', 'driver__user')
+    search_fields = ('=trip__id', 'driver__user__username', 'driver__user__email')
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('trip', 'driver')
     readonly_fields = ('created_at', 'updated_at')
 
 
 @admin.register(Rating)
-class RatingAdmin(admin.ModelAdmin):
+class RatingAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'trip', 'rater', 'rated_driver', 'stars', 'created_at')
-    list_filter = ('stars', 'created_at')
-    search_fields = ('trip__id', 'rater__username', 'rated_driver__user__username')
+    list_filter = ('stars',)
+    list_select_related = ('trip', 'rater', 'rated_driver__user')
+    search_fields = ('=trip__id', 'rater__username', 'rated_driver__user__username')
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('trip', 'rater', 'rated_driver')
     readonly_fields = ('created_at',)
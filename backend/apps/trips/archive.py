@@ -0,0 +1,81 @@
+"""
+Archivado por lotes de viajes cerrados (COMPLETED / CANCELLED / EXPIRED).
+
+Cada lote mueve, en una transacción, los viajes junto con sus ofertas, tarifa,
+calificación y mensajes a las tablas Archived*, conservando los ids, y luego
+los borra de las tablas calientes. Así Trip solo conserva lo que recorren el
+feed geoespacial y AvailableTripsView.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Trip, TripOffer, Rating, ArchivedTrip, ArchivedTripOffer, ArchivedRating
+
+CLOSED_STATUSES = (Trip.Status.COMPLETED, Trip.Status.CANCELLED, Trip.Status.EXPIRED)
+
+
+def _copy_rows(source_queryset, archive_model):
+    """
+    Copia las filas a la tabla de archivo con un solo INSERT, campo por campo
+    (ids y timestamps incluidos).
+    """
+    attnames = [f.attname for f in archive_model._meta.concrete_fields if f.attname != 'archived_at']
+    rows = [archive_model(**values) for values in source_queryset.values(*attnames)]
+    archive_model.objects.bulk_create(rows)
+    return len(rows)
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Archiva hasta `batch_size` viajes cerrados antes de `cutoff`.
+    Devuelve la cantidad de viajes archivados (0 cuando no queda nada).
+    """
+    from apps.chat.models import Message, ArchivedMessage
+    from apps.fares.models import Fare, ArchivedFare
+
+    with transaction.atomic():
+        # skip_locked: varios workers pueden archivar en paralelo sin pisarse
+        trip_ids = list(
+            Trip.objects.filter(status__in=CLOSED_STATUSES, updated_at__lt=cutoff)
+            .order_by('id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not trip_ids:
+            return 0
+
+        _copy_rows(Trip.objects.filter(id__in=trip_ids), ArchivedTrip)
+        _copy_rows(TripOffer.objects.filter(trip_id__in=trip_ids), ArchivedTripOffer)
+        _copy_rows(Rating.objects.filter(trip_id__in=trip_ids), ArchivedRating)
+        _copy_rows(Fare.objects.filter(trip_id__in=trip_ids), ArchivedFare)
+        _copy_rows(Message.objects.filter(trip_id__in=trip_ids), ArchivedMessage)
+
+        # Las ofertas, tarifa, calificación y mensajes se borran en cascada
+        Trip.objects.filter(id__in=trip_ids).delete()
+
+    return len(trip_ids)
+
+
+def archive_closed_trips(older_than_days=None, batch_size=None, max_batches=None):
+    """
+    Archiva por lotes los viajes cerrados hace más de `older_than_days` días.
+    Devuelve el total de viajes archivados.
+    """
+    if older_than_days is None:
+        older_than_days = settings.TRIP_ARCHIVE_AFTER_DAYS
+    if batch_size is None:
+        batch_size = settings.TRIP_ARCHIVE_BATCH_SIZE
+
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        archived = archive_batch(cutoff, batch_size)
+        if not archived:
+            break
+        total += archived
+        batches += 1
+    return total
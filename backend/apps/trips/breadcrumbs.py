@@ -0,0 +1,191 @@
+"""
+Recorrido GPS de los viajes (disputas, distancia real para la tarifa final).
+
+Cada posición del conductor con viaje en seguimiento (ver apps.trips.eta) se
+agrega a un buffer en caché por viaje y fase. Al juntar BREADCRUMB_CHUNK_POINTS
+puntos, o cuando el viaje cambia de fase o termina, el buffer se guarda como un
+BreadcrumbChunk: un INSERT por trozo y no por punto.
+
+Codificación de un trozo: por cada punto, deltas respecto del anterior de
+latitud y longitud (1e-5 grados ≈ 1.1 m) y del timestamp (segundos), en varints
+zigzag. El primer punto va contra cero, así cada trozo se decodifica solo.
+
+Con Redis (REDIS_URL) agregar es un RPUSH y vaciar un LRANGE + DEL en una
+transacción; con otra caché se usa un lock por proceso.
+"""
+import math
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+
+from .models import BreadcrumbChunk
+from .services import haversine_m
+
+COORD_SCALE = 100000
+PHASES = [phase for phase, _ in BreadcrumbChunk.Phase.choices]
+
+_local_lock = threading.Lock()
+
+
+def _write_varint(out, value):
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_points(points):
+    """[(lat, lng, ts), ...] -> bytes"""
+    out = bytearray()
+    prev = (0, 0, 0)
+    for lat, lng, ts in points:
+        current = (round(lat * COORD_SCALE), round(lng * COORD_SCALE), int(ts))
+        for value, last in zip(current, prev):
+            _write_varint(out, value - last)
+        prev = current
+    return bytes(out)
+
+
+def decode_points(data):
+    """bytes -> [(lat, lng, ts), ...]"""
+    points = []
+    values = []
+    prev = [0, 0, 0]
+    value = shift = 0
+    for byte in bytes(data):
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if byte & 0x80:
+            continue
+        values.append(value >> 1 if not value & 1 else -(value >> 1) - 1)
+        value = shift = 0
+        if len(values) == 3:
+            prev = [p + d for p, d in zip(prev, values)]
+            points.append((prev[0] / COORD_SCALE, prev[1] / COORD_SCALE, prev[2]))
+            values = []
+    return points
+
+
+def _buffer_key(trip_id, phase):
+    return f'crumbs:{trip_id}:{phase}'
+
+
+def _uses_redis():
+    return isinstance(caches['default'], RedisCache)
+
+
+def _redis(key):
+    # RedisCache no expone listas: se usa su cliente (mismo pool de conexiones)
+    return cache._cache.get_client(key, write=True), cache.make_key(key)
+
+
+def _push(key, point):
+    """Agrega un punto al buffer; devuelve el largo del buffer"""
+    if _uses_redis():
+        client, redis_key = _redis(key)
+        pipe = client.pipeline()
+        pipe.rpush(redis_key, '%.6f,%.6f,%d' % point)
+        pipe.expire(redis_key, settings.BREADCRUMB_BUFFER_TTL)
+        return pipe.execute()[0]
+    with _local_lock:
+        buffer = cache.get(key) or []
+        buffer.append(point)
+        cache.set(key, buffer, settings.BREADCRUMB_BUFFER_TTL)
+        return len(buffer)
+
+
+def _take(key):
+    """Vacía el buffer y devuelve sus puntos"""
+    if _uses_redis():
+        client, redis_key = _redis(key)
+        pipe = client.pipeline(transaction=True)
+        pipe.lrange(redis_key, 0, -1)
+        pipe.delete(redis_key)
+        raw = pipe.execute()[0]
+        return [(float(lat), float(lng), int(ts)) for lat, lng, ts in (item.decode().split(',') for item in raw)]
+    with _local_lock:
+        buffer = cache.get(key) or []
+        cache.delete(key)
+        return buffer
+
+
+def _peek(key):
+    if _uses_redis():
+        client, redis_key = _redis(key)
+        return [(float(lat), float(lng), int(ts)) for lat, lng, ts in
+                (item.decode().split(',') for item in client.lrange(redis_key, 0, -1))]
+    return cache.get(key) or []
+
+
+def _to_datetime(ts):
+    return datetime.fromtimestamp(ts, tz=dt_timezone.utc)
+
+
+def _is_valid(point):
+    latitude, longitude, ts = point
+    return (math.isfinite(latitude) and math.isfinite(longitude) and math.isfinite(ts)
+            and abs(latitude) <= 90 and abs(longitude) <= 180)
+
+
+def _save_chunk(trip_id, phase, points):
+    # Un punto inválido que haya llegado al buffer se descarta: no debe impedir
+    # guardar el resto ni hacer fallar el cambio de estado del viaje
+    points = [point for point in points if _is_valid(point)]
+    if not points:
+        return None
+    return BreadcrumbChunk.objects.create(
+        trip_id=trip_id,
+        phase=phase,
+        started_at=_to_datetime(points[0][2]),
+        ended_at=_to_datetime(points[-1][2]),
+        point_count=len(points),
+        data=encode_points(points),
+    )
+
+
+def record_breadcrumb(trip_id, phase, latitude, longitude, ts):
+    """Agrega una posición al recorrido; guarda un trozo si el buffer se llenó"""
+    key = _buffer_key(trip_id, phase)
+    if _push(key, (latitude, longitude, int(ts))) >= settings.BREADCRUMB_CHUNK_POINTS:
+        _save_chunk(trip_id, phase, _take(key))
+
+
+def flush_breadcrumbs(trip_id):
+    """Guarda lo que quede en los buffers del viaje (al cambiar de fase o terminar)"""
+    for phase in PHASES:
+        _save_chunk(trip_id, phase, _take(_buffer_key(trip_id, phase)))
+
+
+def iter_breadcrumbs(trip_id, phase=None, include_buffered=True):
+    """
+    Recorrido del viaje en orden, trozo por trozo (sin cargar todo en memoria).
+    Genera dicts {'phase', 'lat', 'lng', 'ts'}; con include_buffered también
+    los puntos aún no guardados (viaje en curso).
+    """
+    chunks = BreadcrumbChunk.objects.filter(trip_id=trip_id).order_by('id')
+    if phase is not None:
+        chunks = chunks.filter(phase=phase)
+    for chunk_phase, data in chunks.values_list('phase', 'data').iterator(chunk_size=50):
+        for lat, lng, ts in decode_points(data):
+            yield {'phase': chunk_phase, 'lat': lat, 'lng': lng, 'ts': ts}
+    if include_buffered:
+        for buffer_phase in ([phase] if phase else PHASES):
+            for lat, lng, ts in _peek(_buffer_key(trip_id, buffer_phase)):
+                yield {'phase': buffer_phase, 'lat': lat, 'lng': lng, 'ts': ts}
+
+
+def driven_distance_m(trip_id, phase=BreadcrumbChunk.Phase.DESTINATION):
+    """Distancia recorrida en la fase (por defecto, con el pasajero/pedido a bordo)"""
+    total = 0.0
+    previous = None
+    for point in iter_breadcrumbs(trip_id, phase):
+        current = (point['lng'], point['lat'])
+        if previous is not None:
+            total += haversine_m(previous, current)
+        previous = current
+    return total
+
@@ -0,0 +1,150 @@
+"""
+Creación masiva de domicilios (ServiceType.DELIVERY) para comercios.
+
+Las filas llegan como arreglo JSON, NDJSON (un objeto por línea) o CSV con
+encabezado; los dos últimos se leen del stream línea a línea. Cada fila se
+valida con las mismas reglas de TripSerializer y los errores se reportan por
+índice de fila. Los viajes y sus tarifas se insertan con dos bulk_create en
+una sola transacción, en lugar de dos INSERT por domicilio.
+"""
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from .models import Trip
+from .serializers import TripSerializer, pop_points
+
+BULK_BATCH_SIZE = 500
+
+
+def _iter_lines(stream, parser_context):
+    encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+    return codecs.iterdecode(stream, encoding)
+
+
+class NDJSONParser(BaseParser):
+    """
+    Un objeto JSON por línea. Devuelve un generador: las filas se validan a
+    medida que se leen, sin cargar el cuerpo completo en memoria.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return []
+        return self._rows(_iter_lines(stream, parser_context))
+
+    def _rows(self, lines):
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise ParseError(f'NDJSON inválido en la línea {number}: {exc}')
+
+
+class CSVParser(BaseParser):
+    """
+    CSV con encabezado (los nombres de columna son los campos del domicilio).
+    Las celdas vacías se omiten para que apliquen los valores por defecto.
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return []
+        return self._rows(_iter_lines(stream, parser_context))
+
+    def _rows(self, lines):
+        try:
+            for row in csv.DictReader(lines):
+                yield {key: value for key, value in row.items() if key and value not in ('', None)}
+        except csv.Error as exc:
+            raise ParseError(f'CSV inválido: {exc}')
+
+
+class DeliveryRowSerializer(TripSerializer):
+    """
+    Una fila del alta masiva: mismos campos y validaciones que TripSerializer,
+    pero siempre como domicilio nuevo (sin conductor, estado REQUESTED).
+    """
+    service_type = serializers.CharField(required=False, default=Trip.ServiceType.DELIVERY)
+
+    class Meta(TripSerializer.Meta):
+        read_only_fields = TripSerializer.Meta.read_only_fields + (
+            'driver', 'status', 'origin_location', 'destination_location',
+        )
+
+    def validate_service_type(self, value):
+        value = super().validate_service_type(value)
+        if value != Trip.ServiceType.DELIVERY:
+            raise serializers.ValidationError('El alta masiva solo acepta domicilios (DOMICILIO/DELIVERY)')
+        return value
+
+
+def build_trip(client, data):
+    """Arma el Trip (sin guardarlo) con los puntos ya asignados"""
+    data = dict(data)
+    origin, destination = pop_points(data)
+    return Trip(client=client, origin_location=origin, destination_location=destination, **data)
+
+
+def validate_rows(rows, max_rows=None):
+    """
+    Valida las filas con una sola instancia del serializer (como hace
+    ListSerializer con su child). Devuelve ([(índice, datos)], [errores]).
+    """
+    max_rows = max_rows or settings.TRIP_BULK_MAX_ROWS
+    serializer = DeliveryRowSerializer()
+    valid, errors = [], []
+
+    for index, row in enumerate(rows):
+        if index >= max_rows:
+            errors.append({'row': index, 'errors': {'non_field_errors': [
+                f'Se superó el máximo de {max_rows} domicilios por solicitud'
+            ]}})
+            break
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'errors': {'non_field_errors': ['Cada fila debe ser un objeto']}})
+            continue
+        try:
+            valid.append((index, serializer.run_validation(row)))
+        except serializers.ValidationError as exc:
+            errors.append({'row': index, 'errors': exc.detail})
+
+    return valid, errors
+
+
+def create_deliveries(client, rows, partial=False):
+    """
+    Valida y crea los domicilios de `client` junto con su Fare inicial.
+
+    Sin `partial`, cualquier fila inválida cancela todo el lote (no se crea
+    nada). Con `partial`, se crean las filas válidas y se reportan las demás.
+    Devuelve ([(índice, trip)], [errores]).
+    """
+    from apps.fares.models import Fare
+
+    valid, errors = validate_rows(rows)
+    if not valid or (errors and not partial):
+        return [], errors
+
+    trips = [build_trip(client, data) for _, data in valid]
+    with transaction.atomic():
+        # En PostgreSQL bulk_create devuelve los ids (RETURNING), necesarios para las tarifas
+        Trip.objects.bulk_create(trips, batch_size=BULK_BATCH_SIZE)
+
+        # Misma tarifa inicial que TripSerializer.create: el precio propuesto como base
+        fares = [Fare(trip=trip, base_fare=trip.estimated_price) for trip in trips]
+        for fare in fares:
+            fare.calculate_amount()
+        Fare.objects.bulk_create(fares, batch_size=BULK_BATCH_SIZE)
+
+    return [(index, trip) for (index, _), trip in zip(valid, trips)], errors
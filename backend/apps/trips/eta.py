@@ -0,0 +1,186 @@
+"""
+ETA en vivo de viajes ACCEPTED (conductor hacia el origen) e IN_PROGRESS (hacia
+el destino) sin pedir una ruta por cada consulta.
+
+La ruta actual del viaje (polilínea con distancias acumuladas) queda en caché.
+Cada posición del conductor (POST /drivers/location/) se proyecta sobre ella:
+el segmento más cercano da lo recorrido, y lo que falta sale de la distancia y
+duración que dio el proveedor para esa ruta. Solo se vuelve a pedir la ruta si
+el conductor se aleja más de ETA_OFF_ROUTE_M de ella (como mucho una vez cada
+ETA_REROUTE_INTERVAL s) o si cambia la fase del viaje.
+
+El cliente lee el último resultado con GET /trips/{id}/eta/.
+"""
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Trip
+from .services import RouteService, haversine_m
+
+# Metros por grado de latitud (y de longitud en el ecuador)
+M_PER_DEG = 111320
+# Segmentos que se revisan desde la última proyección antes de recorrer toda la ruta
+SEARCH_SEGMENTS = 40
+
+PHASES = {
+    Trip.Status.ACCEPTED: 'pickup',
+    Trip.Status.IN_PROGRESS: 'destination',
+}
+
+
+def _driver_key(driver_id):
+    return f'eta:driver:{driver_id}'
+
+
+def _track_key(trip_id):
+    return f'eta:track:{trip_id}'
+
+
+def _state_key(trip_id):
+    return f'eta:state:{trip_id}'
+
+
+def sync_tracking(trip, previous_driver_id=None):
+    """
+    Activa, cambia de fase o detiene el seguimiento según el estado del viaje.
+    Llamar después de guardar un cambio de estado o de conductor.
+    """
+    phase = PHASES.get(trip.status)
+    target = trip.origin_location if phase == 'pickup' else trip.destination_location
+    if previous_driver_id and previous_driver_id != trip.driver_id:
+        cache.delete(_driver_key(previous_driver_id))
+
+    if phase is None or trip.driver_id is None or target is None:
+        if trip.driver_id is not None:
+            cache.delete(_driver_key(trip.driver_id))
+        cache.delete_many([_track_key(trip.id), _state_key(trip.id)])
+        return
+
+    active = cache.get(_driver_key(trip.driver_id))
+    if active and active['trip_id'] == trip.id and active['phase'] == phase:
+        return
+    cache.set(_driver_key(trip.driver_id), {
+        'trip_id': trip.id, 'phase': phase, 'target': (target.x, target.y),
+    }, settings.ETA_TRACK_TTL)
+    # La ruta de la fase anterior ya no sirve: la próxima posición pide la nueva
+    cache.delete_many([_track_key(trip.id), _state_key(trip.id)])
+
+
+def build_track(phase, route):
+    """Ruta del proveedor lista para proyectar: puntos (lat, lng) y metros acumulados"""
+    points = list(route['route'])
+    if len(points) < 2:
+        points = (points or [(0.0, 0.0)]) * 2
+    cumulative = [0.0]
+    for (lat1, lng1), (lat2, lng2) in zip(points, points[1:]):
+        cumulative.append(cumulative[-1] + haversine_m((lng1, lat1), (lng2, lat2)))
+    return {
+        'phase': phase,
+        'points': points,
+        'cumulative': cumulative,
+        'distance': route['distance'],
+        'duration': route['duration'],
+        'estimated': route.get('estimated', False),
+        'routed_at': time.time(),
+    }
+
+
+def project(track, latitude, longitude, start=0, end=None):
+    """
+    Proyecta la posición sobre los segmentos [start, end) de la ruta.
+    Devuelve (segmento, metros recorridos sobre la ruta, metros a la ruta).
+    """
+    points, cumulative = track['points'], track['cumulative']
+    end = len(points) - 1 if end is None else min(end, len(points) - 1)
+    # Plano local (equirectangular) centrado en la posición: exacto a escala urbana
+    kx = M_PER_DEG * math.cos(math.radians(latitude))
+    best = None
+    for i in range(max(start, 0), end):
+        (alat, alng), (blat, blng) = points[i], points[i + 1]
+        ax, ay = (alng - longitude) * kx, (alat - latitude) * M_PER_DEG
+        dx, dy = (blng - alng) * kx, (blat - alat) * M_PER_DEG
+        length2 = dx * dx + dy * dy
+        t = 0.0 if length2 == 0 else min(1.0, max(0.0, -(ax * dx + ay * dy) / length2))
+        px, py = ax + t * dx, ay + t * dy
+        offset2 = px * px + py * py
+        if best is None or offset2 < best[0]:
+            best = (offset2, i, t)
+    offset2, i, t = best
+    along = cumulative[i] + t * (cumulative[i + 1] - cumulative[i])
+    return i, along, math.sqrt(offset2)
+
+
+def _route(active, latitude, longitude):
+    route = RouteService.get_route((longitude, latitude), tuple(active['target']))
+    return build_track(active['phase'], route)
+
+
+def active_trip(driver_id):
+    """Viaje en seguimiento del conductor: {'trip_id', 'phase', 'target'} o None"""
+    return cache.get(_driver_key(driver_id))
+
+
+def update_position(driver_id, latitude, longitude, active=None):
+    """
+    Actualiza el ETA del viaje activo del conductor con su posición.
+    Devuelve el ETA o None si el conductor no tiene viaje en seguimiento.
+    """
+    active = active or active_trip(driver_id)
+    if active is None:
+        return None
+    trip_id = active['trip_id']
+    values = cache.get_many([_track_key(trip_id), _state_key(trip_id)])
+    track, state = values.get(_track_key(trip_id)), values.get(_state_key(trip_id))
+    now = time.time()
+
+    if track is not None and track['phase'] == active['phase']:
+        # La última proyección acota la búsqueda; si no aparece cerca, toda la ruta
+        hint = state['segment'] if state and state['routed_at'] == track['routed_at'] else 0
+        segment, along, offset = project(track, latitude, longitude, hint - 2, hint + SEARCH_SEGMENTS)
+        if offset > settings.ETA_OFF_ROUTE_M:
+            segment, along, offset = project(track, latitude, longitude)
+        reroute = offset > settings.ETA_OFF_ROUTE_M and now - track['routed_at'] >= settings.ETA_REROUTE_INTERVAL
+    else:
+        track, reroute = None, True
+
+    if reroute:
+        try:
+            track = _route(active, latitude, longitude)
+        except Exception:
+            # Sin ruta nueva se sigue con la anterior (si la hay)
+            if track is None:
+                return None
+        else:
+            cache.set(_track_key(trip_id), track, settings.ETA_TRACK_TTL)
+            segment, along, offset = project(track, latitude, longitude)
+
+    length = track['cumulative'][-1]
+    remaining = 1.0 - min(along / length, 1.0) if length else 0.0
+    remaining_duration = track['duration'] * remaining
+    state = {
+        'trip_id': trip_id,
+        'phase': track['phase'],
+        'remaining_distance_m': round(track['distance'] * remaining),
+        'remaining_duration_s': round(remaining_duration),
+        'eta': (timezone.now() + timedelta(seconds=remaining_duration)).isoformat(),
+        'off_route': offset > settings.ETA_OFF_ROUTE_M,
+        'estimated': track['estimated'],
+        'updated_at': timezone.now().isoformat(),
+        'segment': segment,
+        'routed_at': track['routed_at'],
+    }
+    cache.set(_state_key(trip_id), state, settings.ETA_TRACK_TTL)
+    return state
+
+
+def get_eta(trip_id):
+    """Último ETA calculado para el viaje (None si el conductor aún no reportó posición)"""
+    state = cache.get(_state_key(trip_id))
+    if state is None:
+        return None
+    return {k: v for k, v in state.items() if k not in ('segment', 'routed_at')}
@@ -0,0 +1,116 @@
+"""
+Vencimiento por lotes de viajes abiertos y ofertas pendientes.
+
+- Un viaje REQUESTED sin conductor pasa a EXPIRED a los TRIP_REQUEST_TTL_MINUTES
+  de creado, junto con sus ofertas PENDING. Se eligen por el índice parcial del
+  feed (trip_open_feed_idx), así que el costo depende de los viajes abiertos y
+  no del tamaño de la tabla.
+- Una oferta PENDING pasa a EXPIRED a los TRIP_OFFER_TTL_MINUTES, por el índice
+  parcial tripoffer_pending_created_idx.
+
+Cada lote bloquea sus filas con skip_locked (una aceptación en curso gana y el
+lote la salta) y hace un UPDATE por tabla. Al confirmarse envía trips_expired /
+offers_expired (apps.trips.signals). Los viajes vencidos se archivan luego como
+los cerrados.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Trip, TripOffer
+from .signals import offers_expired, trips_expired
+
+
+def _send_on_commit(signal, sender, **kwargs):
+    transaction.on_commit(lambda: signal.send(sender=sender, **kwargs))
+
+
+def expire_trips_batch(cutoff, batch_size):
+    """
+    Vence hasta `batch_size` viajes abiertos creados antes de `cutoff` y sus
+    ofertas pendientes. Devuelve (viajes, ofertas) vencidos.
+    """
+    with transaction.atomic():
+        trip_ids = list(
+            Trip.objects.filter(status=Trip.Status.REQUESTED, driver__isnull=True, created_at__lt=cutoff)
+            .order_by('created_at')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not trip_ids:
+            return 0, 0
+
+        now = timezone.now()
+        Trip.objects.filter(id__in=trip_ids).update(status=Trip.Status.EXPIRED, updated_at=now)
+        offers = list(
+            TripOffer.objects.filter(trip_id__in=trip_ids, status=TripOffer.OfferStatus.PENDING)
+            .values_list('id', 'trip_id')
+        )
+        if offers:
+            TripOffer.objects.filter(id__in=[offer_id for offer_id, _ in offers]).update(
+                status=TripOffer.OfferStatus.EXPIRED, updated_at=now
+            )
+
+        _send_on_commit(trips_expired, Trip, trip_ids=trip_ids)
+        if offers:
+            _send_on_commit(offers_expired, TripOffer, offer_ids=[o for o, _ in offers],
+                            trip_ids=sorted({t for _, t in offers}))
+    return len(trip_ids), len(offers)
+
+
+def expire_offers_batch(cutoff, batch_size):
+    """Vence hasta `batch_size` ofertas pendientes creadas antes de `cutoff`"""
+    with transaction.atomic():
+        offers = list(
+            TripOffer.objects.filter(status=TripOffer.OfferStatus.PENDING, created_at__lt=cutoff)
+            .order_by('created_at')
+            .select_for_update(skip_locked=True)
+            .values_list('id', 'trip_id')[:batch_size]
+        )
+        if not offers:
+            return 0
+
+        TripOffer.objects.filter(id__in=[offer_id for offer_id, _ in offers]).update(
+            status=TripOffer.OfferStatus.EXPIRED, updated_at=timezone.now()
+        )
+        _send_on_commit(offers_expired, TripOffer, offer_ids=[o for o, _ in offers],
+                        trip_ids=sorted({t for _, t in offers}))
+    return len(offers)
+
+
+def expire_stale(trip_ttl_minutes=None, offer_ttl_minutes=None, batch_size=None, max_batches=None):
+    """
+    Vence por lotes los viajes y ofertas cuyo TTL ya pasó.
+    Devuelve (viajes, ofertas) vencidos en total.
+    """
+    if trip_ttl_minutes is None:
+        trip_ttl_minutes = settings.TRIP_REQUEST_TTL_MINUTES
+    if offer_ttl_minutes is None:
+        offer_ttl_minutes = settings.TRIP_OFFER_TTL_MINUTES
+    if batch_size is None:
+        batch_size = settings.TRIP_EXPIRY_BATCH_SIZE
+
+    now = timezone.now()
+    trip_cutoff = now - timedelta(minutes=trip_ttl_minutes)
+    offer_cutoff = now - timedelta(minutes=offer_ttl_minutes)
+
+    trips = offers = batches = 0
+    # Primero los viajes: sus ofertas vencen con ellos en el mismo lote
+    while max_batches is None or batches < max_batches:
+        expired_trips, expired_offers = expire_trips_batch(trip_cutoff, batch_size)
+        if not expired_trips:
+            break
+        trips += expired_trips
+        offers += expired_offers
+        batches += 1
+
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        expired_offers = expire_offers_batch(offer_cutoff, batch_size)
+        if not expired_offers:
+            break
+        offers += expired_offers
+        batches += 1
+    return trips, offers
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.trips.archive import archive_closed_trips
+
+
+class Command(BaseCommand):
+    help = 'Mueve los viajes COMPLETED/CANCELLED/EXPIRED antiguos (con ofertas, tarifa, calificación y mensajes) a las tablas de archivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TRIP_ARCHIVE_AFTER_DAYS,
+                            help='Archivar viajes cerrados hace más de N días')
+        parser.add_argument('--batch-size', type=int, default=settings.TRIP_ARCHIVE_BATCH_SIZE,
+                            help='Viajes por transacción')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Detenerse después de N lotes (por defecto, hasta terminar)')
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        total = archive_closed_trips(
+            older_than_days=options['days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+        )
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} viajes archivados en {elapsed:.1f}s"
+        ))
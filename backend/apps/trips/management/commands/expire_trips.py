@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.trips.expiry import expire_stale
+
+
+class Command(BaseCommand):
+    help = 'Vence los viajes REQUESTED sin oferta aceptada y las ofertas PENDING cuyo TTL ya pasó'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trip-ttl', type=int, default=settings.TRIP_REQUEST_TTL_MINUTES,
+                            help='Minutos que un viaje puede esperar una oferta aceptada')
+        parser.add_argument('--offer-ttl', type=int, default=settings.TRIP_OFFER_TTL_MINUTES,
+                            help='Minutos que una oferta puede quedar pendiente')
+        parser.add_argument('--batch-size', type=int, default=settings.TRIP_EXPIRY_BATCH_SIZE,
+                            help='Filas por transacción')
+        parser.add_argument('--loop', action='store_true',
+                            help='Revisar indefinidamente cada --interval segundos')
+        parser.add_argument('--interval', type=int, default=settings.TRIP_EXPIRY_INTERVAL,
+                            help='Segundos entre revisiones (con --loop)')
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            trips, offers = expire_stale(
+                trip_ttl_minutes=options['trip_ttl'],
+                offer_ttl_minutes=options['offer_ttl'],
+                batch_size=options['batch_size'],
+            )
+            elapsed = time.monotonic() - start
+            self.stdout.write(self.style.SUCCESS(
+                f"{trips} viajes y {offers} ofertas vencidos en {elapsed:.1f}s"
+            ))
+            if not options['loop']:
+                break
+            # Respeta CONN_MAX_AGE/health checks como lo haría un request
+            close_old_connections()
+            time.sleep(max(options['interval'] - elapsed, 0))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:18
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drivers', '0001_initial'),
+        ('trips', '0008_alter_trip_estimated_price'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTrip',
+            fields=[
+                ('pickup_address', models.CharField(max_length=255)),
+                ('destination_address', models.CharField(max_length=255)),
+                ('service_type', models.CharField(choices=[('TRIP', 'Viaje'), ('DELIVERY', 'Domicilio')], default='TRIP', max_length=20)),
+                ('origin_location', django.contrib.gis.db.models.fields.PointField(blank=True, geography=True, null=True, srid=4326)),
+                ('destination_location', django.contrib.gis.db.models.fields.PointField(blank=True, geography=True, null=True, srid=4326)),
+                ('vehicle_type', models.CharField(choices=[('CAR', 'Car'), ('MOTORCYCLE', 'Motorcycle')], default='CAR', max_length=20)),
+                ('status', models.CharField(choices=[('REQUESTED', 'Requested'), ('ACCEPTED', 'Accepted'), ('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], default='REQUESTED', max_length=20)),
+                ('estimated_price', models.DecimalField(decimal_places=2, default=0, help_text='Precio estimado ofrecido por el cliente', max_digits=12)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_trips_as_client', to=settings.AUTH_USER_MODEL)),
+                ('driver', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_trips_as_driver', to='drivers.driverprofile')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedRating',
+            fields=[
+                ('stars', models.IntegerField(default=5, help_text='Calificación de 0 a 5 estrellas')),
+                ('comment', models.TextField(blank=True, null=True)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('rated_driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_ratings_received', to='drivers.driverprofile')),
+                ('rater', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_ratings_given', to=settings.AUTH_USER_MODEL)),
+                ('trip', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating', to='trips.archivedtrip')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTripOffer',
+            fields=[
+                ('offered_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('estimated_arrival_time', models.IntegerField(help_text='Tiempo estimado de llegada en minutos')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('REJECTED', 'Rejected')], default='PENDING', max_length=20)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_trip_offers', to='drivers.driverprofile')),
+                ('trip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='trips.archivedtrip')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'abstract': False,
+                'unique_together': {('trip', 'driver')},
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:20
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices sobre tablas grandes: se crean sin bloquear escrituras (CONCURRENTLY),
+    # antes de quitar los índices simples de las FK que reemplazan
+    atomic = False
+
+    dependencies = [
+        ('drivers', '0001_initial'),
+        ('trips', '0009_archived_trips'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='trip',
+            index=models.Index(condition=models.Q(('driver__isnull', True), ('status', 'REQUESTED')), fields=['-created_at'], name='trip_open_feed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trip',
+            index=django.contrib.postgres.indexes.GistIndex(condition=models.Q(('status', 'REQUESTED')), fields=['origin_location'], name='trip_open_origin_gist'),
+        ),
+        AddIndexConcurrently(
+            model_name='trip',
+            index=models.Index(fields=['client', '-created_at'], name='trip_client_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trip',
+            index=models.Index(fields=['driver', '-created_at'], name='trip_driver_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trip',
+            index=models.Index(condition=models.Q(('status__in', ['COMPLETED', 'CANCELLED'])), fields=['updated_at'], name='trip_closed_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tripoffer',
+            index=models.Index(fields=['trip', 'status'], name='tripoffer_trip_status_idx'),
+        ),
+        migrations.AlterField(
+            model_name='archivedtrip',
+            name='origin_location',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, geography=True, null=True, spatial_index=False, srid=4326),
+        ),
+        migrations.AlterField(
+            model_name='trip',
+            name='client',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='trips_as_client', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='trip',
+            name='driver',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips_as_driver', to='drivers.driverprofile'),
+        ),
+        migrations.AlterField(
+            model_name='trip',
+            name='origin_location',
+            field=django.contrib.gis.db.models.fields.PointField(blank=True, geography=True, null=True, spatial_index=False, srid=4326),
+        ),
+        migrations.AlterField(
+            model_name='tripoffer',
+            name='trip',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='trips.trip'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:28
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Igual que 0010: sin bloquear escrituras sobre trips_trip
+    atomic = False
+
+    dependencies = [
+        ('drivers', '0002_driver_last_location'),
+        ('trips', '0010_trip_access_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='trip',
+            index=models.Index(fields=['created_at'], name='trip_created_idx'),
+        ),
+    ]
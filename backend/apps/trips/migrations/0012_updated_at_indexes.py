@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:31
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Sin bloquear escrituras; el índice completo se crea antes de quitar el parcial
+    atomic = False
+
+    dependencies = [
+        ('drivers', '0002_driver_last_location'),
+        ('trips', '0011_trip_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='trip',
+            index=models.Index(fields=['updated_at'], name='trip_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tripoffer',
+            index=models.Index(fields=['updated_at'], name='tripoffer_updated_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='trip',
+            name='trip_closed_updated_idx',
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:34
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Igual que 0010: sin bloquear escrituras; gin_trgm_ops necesita pg_trgm
+    atomic = False
+
+    dependencies = [
+        ('drivers', '0002_driver_last_location'),
+        ('trips', '0012_updated_at_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='rating',
+            index=models.Index(fields=['created_at'], name='rating_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trip',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('pickup_address'), name='gin_trgm_ops'), name='trip_pickup_trgm_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trip',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('destination_address'), name='gin_trgm_ops'), name='trip_destination_trgm_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='tripoffer',
+            index=models.Index(fields=['-created_at'], name='tripoffer_created_idx'),
+        ),
+    ]
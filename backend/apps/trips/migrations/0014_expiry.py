@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:48
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Los choices no cambian el esquema; el índice parcial se crea sin bloquear escrituras
+    atomic = False
+
+    dependencies = [
+        ('drivers', '0002_driver_last_location'),
+        ('trips', '0013_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedtrip',
+            name='status',
+            field=models.CharField(choices=[('REQUESTED', 'Requested'), ('ACCEPTED', 'Accepted'), ('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled'), ('EXPIRED', 'Expired')], default='REQUESTED', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='archivedtripoffer',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('REJECTED', 'Rejected'), ('EXPIRED', 'Expired')], default='PENDING', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='trip',
+            name='status',
+            field=models.CharField(choices=[('REQUESTED', 'Requested'), ('ACCEPTED', 'Accepted'), ('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled'), ('EXPIRED', 'Expired')], default='REQUESTED', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='tripoffer',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('REJECTED', 'Rejected'), ('EXPIRED', 'Expired')], default='PENDING', max_length=20),
+        ),
+        AddIndexConcurrently(
+            model_name='tripoffer',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['created_at'], name='tripoffer_pending_created_idx'),
+        ),
+    ]
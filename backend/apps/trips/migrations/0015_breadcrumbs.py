@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0014_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BreadcrumbChunk',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('trip_id', models.BigIntegerField()),
+                ('phase', models.CharField(choices=[('pickup', 'Hacia el origen'), ('destination', 'Hacia el destino')], max_length=20)),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField()),
+                ('point_count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trip_id', 'id'], name='breadcrumb_trip_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:03
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Igual que 0010: el archivo crece sin parar, así que sin bloquear escrituras
+    atomic = False
+
+    dependencies = [
+        ('drivers', '0002_driver_last_location'),
+        ('trips', '0015_breadcrumbs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='archivedtrip',
+            index=models.Index(fields=['client', '-created_at'], name='archivedtrip_client_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='archivedtrip',
+            index=models.Index(fields=['driver', '-created_at'], name='archivedtrip_driver_idx'),
+        ),
+    ]
@@ -1,15 +1,24 @@
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
 from django.conf import settings
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
 from apps.drivers.models import DriverProfile
 
-class Trip(models.Model):
+class AbstractTrip(models.Model):
+    """
+    Campos comunes de Trip (tabla caliente) y ArchivedTrip (viajes cerrados archivados).
+    Las FK se definen en cada modelo concreto por sus related_name.
+    """
     class Status(models.TextChoices):
         REQUESTED = 'REQUESTED', 'Requested'
         ACCEPTED = 'ACCEPTED', 'Accepted'
         IN_PROGRESS = 'IN_PROGRESS', 'In Progress'
         COMPLETED = 'COMPLETED', 'Completed'
         CANCELLED = 'CANCELLED', 'Cancelled'
+        # Nadie aceptó una oferta dentro de TRIP_REQUEST_TTL_MINUTES (apps.trips.expiry)
+        EXPIRED = 'EXPIRED', 'Expired'
     
     class VehicleType(models.TextChoices):
         CAR = 'CAR', 'Car'
@@ -19,15 +28,13 @@ class Trip(models.Model):
         TRIP = 'TRIP', 'Viaje'
         DELIVERY = 'DELIVERY', 'Domicilio'
 
-    client = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='trips_as_client')
-    driver = models.ForeignKey(DriverProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='trips_as_driver')
-    
     pickup_address = models.CharField(max_length=255)
     destination_address = models.CharField(max_length=255)
     service_type = models.CharField(max_length=20, choices=ServiceType.choices, default=ServiceType.TRIP)
     
     # PostGIS fields for geolocation (SRID 4326 = WGS84, used by GPS)
-    origin_location = gis_models.PointField(geography=True, srid=4326, null=True, blank=True)
+    # Sin índice espacial completo: el feed solo busca viajes abiertos (ver índice parcial en Trip)
+    origin_location = gis_models.PointField(geography=True, srid=4326, null=True, blank=True, spatial_index=False)
     destination_location = gis_models.PointField(geography=True, srid=4326, null=True, blank=True)
     
     vehicle_type = models.CharField(max_length=20, choices=VehicleType.choices, default=VehicleType.CAR)
@@ -38,11 +45,46 @@ class Trip(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        abstract = True
+    
     def __str__(self):
         return f"Trip {self.id} - {self.status}"
 
 
-class TripOffer(models.Model):
+class Trip(AbstractTrip):
+    # Sin índice propio: los cubren los índices compuestos (client/driver, -created_at)
+    client = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='trips_as_client', db_index=False)
+    driver = models.ForeignKey(DriverProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='trips_as_driver', db_index=False)
+
+    class Meta:
+        # Ver benchmarks/bench_trip_indexes.py para el EXPLAIN de cada uno
+        indexes = [
+            # Feed de viajes abiertos (AvailableTripsView): REQUESTED y sin conductor.
+            # También lo recorre el vencimiento de viajes (apps.trips.expiry)
+            models.Index(
+                fields=['-created_at'], name='trip_open_feed_idx',
+                condition=Q(status=AbstractTrip.Status.REQUESTED, driver__isnull=True),
+            ),
+            # Búsqueda por radio de los conductores: solo viajes REQUESTED
+            GistIndex(
+                fields=['origin_location'], name='trip_open_origin_gist',
+                condition=Q(status=AbstractTrip.Status.REQUESTED),
+            ),
+            # Historial del cliente y viajes del conductor, del más reciente al más antiguo
+            models.Index(fields=['client', '-created_at'], name='trip_client_created_idx'),
+            models.Index(fields=['driver', '-created_at'], name='trip_driver_created_idx'),
+            # Rollups por ventana de tiempo (heatmap de demanda en administration)
+            models.Index(fields=['created_at'], name='trip_created_idx'),
+            # Cambios recientes (rollup de KPIs) y selección de lotes del archivado
+            models.Index(fields=['updated_at'], name='trip_updated_idx'),
+            # Búsqueda del admin (icontains compara UPPER(campo) LIKE UPPER('%...%'))
+            GinIndex(OpClass(Upper('pickup_address'), name='gin_trgm_ops'), name='trip_pickup_trgm_idx'),
+            GinIndex(OpClass(Upper('destination_address'), name='gin_trgm_ops'), name='trip_destination_trgm_idx'),
+        ]
+
+
+class AbstractTripOffer(models.Model):
     """
     Modelo para manejar las ofertas/subastas de los conductores para un viaje
     """
@@ -50,9 +92,8 @@ class TripOffer(models.Model):
         PENDING = 'PENDING', 'Pending'
         ACCEPTED = 'ACCEPTED', 'Accepted'
         REJECTED = 'REJECTED', 'Rejected'
-    
-    trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='offers')
-    driver = models.ForeignKey(DriverProfile, on_delete=models.CASCADE, related_name='trip_offers')
+        # Pendiente por más de TRIP_OFFER_TTL_MINUTES o su viaje venció (apps.trips.expiry)
+        EXPIRED = 'EXPIRED', 'Expired'
     
     offered_price = models.DecimalField(max_digits=10, decimal_places=2)
     estimated_arrival_time = models.IntegerField(help_text="Tiempo estimado de llegada en minutos")
@@ -63,6 +104,7 @@ class TripOffer(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
+        abstract = True
         # Un conductor solo puede hacer una oferta por viaje
         unique_together = ('trip', 'driver')
         ordering = ['-created_at']
@@ -71,18 +113,127 @@ class TripOffer(models.Model):
         return f"Offer by {self.driver.user.email} for Trip {self.trip.id} - ${self.offered_price}"
 
 
-class Rating(models.Model):
+class TripOffer(AbstractTripOffer):
+    # Sin índice propio: unique_together (trip, driver) y (trip, status) empiezan por trip
+    trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='offers', db_index=False)
+    driver = models.ForeignKey(DriverProfile, on_delete=models.CASCADE, related_name='trip_offers')
+
+    class Meta(AbstractTripOffer.Meta):
+        indexes = [
+            # Ofertas pendientes de un viaje (listado, aceptación, rechazo del resto)
+            models.Index(fields=['trip', 'status'], name='tripoffer_trip_status_idx'),
+            # Cambios recientes (rollup de KPIs)
+            models.Index(fields=['updated_at'], name='tripoffer_updated_idx'),
+            # Orden por defecto y date_hierarchy del admin
+            models.Index(fields=['-created_at'], name='tripoffer_created_idx'),
+            # Vencimiento de ofertas pendientes (apps.trips.expiry), de la más antigua a la más nueva
+            models.Index(
+                fields=['created_at'], name='tripoffer_pending_created_idx',
+                condition=Q(status=AbstractTripOffer.OfferStatus.PENDING),
+            ),
+        ]
+
+
+class AbstractRating(models.Model):
     """
     Sistema de calificaciones al finalizar un viaje
     """
-    trip = models.OneToOneField(Trip, on_delete=models.CASCADE, related_name='rating')
-    rater = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ratings_given')
-    rated_driver = models.ForeignKey(DriverProfile, on_delete=models.CASCADE, related_name='ratings_received')
-    
     stars = models.IntegerField(default=5, help_text="Calificación de 0 a 5 estrellas")
     comment = models.TextField(blank=True, null=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        abstract = True
+    
     def __str__(self):
         return f"Rating for {self.rated_driver.user.email}: {self.stars} stars"
+
+
+class Rating(AbstractRating):
+    trip = models.OneToOneField(Trip, on_delete=models.CASCADE, related_name='rating')
+    rater = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ratings_given')
+    rated_driver = models.ForeignKey(DriverProfile, on_delete=models.CASCADE, related_name='ratings_received')
+
+    class Meta:
+        indexes = [
+            # date_hierarchy del admin
+            models.Index(fields=['created_at'], name='rating_created_idx'),
+        ]
+
+
+# ==============================================================================
+# ARCHIVO (viajes cerrados)
+# ==============================================================================
+# Los viajes COMPLETED/CANCELLED se mueven por lotes a estas tablas (ver
+# apps.trips.archive) para que Trip solo tenga el conjunto caliente que recorren
+# el feed geoespacial y AvailableTripsView. Conservan el id original, así que
+# el historial sigue respondiendo con los mismos ids.
+
+class ArchivedTrip(AbstractTrip):
+    id = models.BigIntegerField(primary_key=True)
+    client = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_trips_as_client')
+    driver = models.ForeignKey(DriverProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_trips_as_driver')
+    
+    # Los timestamps se copian tal cual desde Trip
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Historial paginado por cursor (TripViewSet.history)
+            models.Index(fields=['client', '-created_at'], name='archivedtrip_client_idx'),
+            models.Index(fields=['driver', '-created_at'], name='archivedtrip_driver_idx'),
+        ]
+
+
+class ArchivedTripOffer(AbstractTripOffer):
+    id = models.BigIntegerField(primary_key=True)
+    trip = models.ForeignKey(ArchivedTrip, on_delete=models.CASCADE, related_name='offers')
+    driver = models.ForeignKey(DriverProfile, on_delete=models.CASCADE, related_name='archived_trip_offers')
+    
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta(AbstractTripOffer.Meta):
+        pass
+
+
+class ArchivedRating(AbstractRating):
+    id = models.BigIntegerField(primary_key=True)
+    trip = models.OneToOneField(ArchivedTrip, on_delete=models.CASCADE, related_name='rating')
+    rater = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_ratings_given')
+    rated_driver = models.ForeignKey(DriverProfile, on_delete=models.CASCADE, related_name='archived_ratings_received')
+    
+    created_at = models.DateTimeField()
+
+
+class BreadcrumbChunk(models.Model):
+    """
+    Trozo del recorrido GPS de un viaje (apps.trips.breadcrumbs): hasta
+    BREADCRUMB_CHUNK_POINTS posiciones codificadas como deltas en varints
+    (~3 bytes por punto con posiciones cada pocos segundos) en lugar de una
+    fila por punto.
+    trip_id sin FK: el recorrido se conserva cuando el viaje se archiva.
+    """
+    class Phase(models.TextChoices):
+        PICKUP = 'pickup', 'Hacia el origen'
+        DESTINATION = 'destination', 'Hacia el destino'
+
+    id = models.BigAutoField(primary_key=True)
+    trip_id = models.BigIntegerField()
+    phase = models.CharField(max_length=20, choices=Phase.choices)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    point_count = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            # Lectura en orden de un viaje (reproducción, exportación, distancia recorrida)
+            models.Index(fields=['trip_id', 'id'], name='breadcrumb_trip_idx'),
+        ]
+
+    def __str__(self):
+        return f"Trip {self.trip_id} {self.phase}: {self.point_count} puntos"
@@ -1,5 +1,26 @@
+from django.contrib.gis.geos import Point
+from django.db import transaction
 from rest_framework import serializers
-from .models import Trip, TripOffer, Rating
+from .models import Trip, TripOffer, Rating, ArchivedTrip
+
+
+def pop_points(validated_data):
+    """
+    Saca las coordenadas lat/lng de validated_data y devuelve
+    (origin_location, destination_location) como Points (None si faltan).
+    """
+    pickup_lat = validated_data.pop('pickup_latitude', None)
+    pickup_lng = validated_data.pop('pickup_longitude', None)
+    dest_lat = validated_data.pop('destination_latitude', None)
+    dest_lng = validated_data.pop('destination_longitude', None)
+    
+    origin = destination = None
+    if pickup_lat is not None and pickup_lng is not None:
+        origin = Point(pickup_lng, pickup_lat, srid=4326)
+    if dest_lat is not None and dest_lng is not None:
+        destination = Point(dest_lng, dest_lat, srid=4326)
+    return origin, destination
+
 
 class TripSerializer(serializers.ModelSerializer):
     # Campos de solo lectura para mostrar información del cliente y conductor
@@ -73,51 +94,31 @@ class TripSerializer(serializers.ModelSerializer):
         return mapping[value_upper]
     
     def create(self, validated_data):
-        from django.contrib.gis.geos import Point
         from apps.fares.models import Fare
         
-        # Extraer coordenadas si existen
-        pickup_lat = validated_data.pop('pickup_latitude', None)
-        pickup_lng = validated_data.pop('pickup_longitude', None)
-        dest_lat = validated_data.pop('destination_latitude', None)
-        dest_lng = validated_data.pop('destination_longitude', None)
-        
-        # Crear el trip
-        trip = Trip.objects.create(**validated_data)
-        
-        # Asignar puntos de geolocalización si se proporcionaron
-        if pickup_lat and pickup_lng:
-            trip.origin_location = Point(pickup_lng, pickup_lat, srid=4326)
-        if dest_lat and dest_lng:
-            trip.destination_location = Point(dest_lng, dest_lat, srid=4326)
-        
-        trip.save()
+        # El viaje se inserta ya con sus puntos: un solo INSERT, sin save() posterior
+        origin, destination = pop_points(validated_data)
+        trip = Trip(origin_location=origin, destination_location=destination, **validated_data)
         
         # Crear automáticamente la tarifa inicial para el viaje
-        # Usamos el estimated_price propuesto por el cliente como base
-        Fare.objects.create(
-            trip=trip, 
-            amount=trip.estimated_price,
-            base_fare=trip.estimated_price
-        )
+        # Usamos el estimated_price propuesto por el cliente como base.
+        # La tarifa se calcula en memoria con el trip ya cargado (sin re-leerlo)
+        fare = Fare(trip=trip, base_fare=trip.estimated_price)
+        
+        with transaction.atomic():
+            trip.save(force_insert=True)
+            fare.save(force_insert=True)
         
         return trip
 
 
     def update(self, instance, validated_data):
-        from django.contrib.gis.geos import Point
-        
-        # Extraer coordenadas si existen
-        pickup_lat = validated_data.pop('pickup_latitude', None)
-        pickup_lng = validated_data.pop('pickup_longitude', None)
-        dest_lat = validated_data.pop('destination_latitude', None)
-        dest_lng = validated_data.pop('destination_longitude', None)
-        
         # Actualizar puntos de geolocalización
-        if pickup_lat is not None and pickup_lng is not None:
-            instance.origin_location = Point(pickup_lng, pickup_lat, srid=4326)
-        if dest_lat is not None and dest_lng is not None:
-            instance.destination_location = Point(dest_lng, dest_lat, srid=4326)
+        origin, destination = pop_points(validated_data)
+        if origin is not None:
+            instance.origin_location = origin
+        if destination is not None:
+            instance.destination_location = destination
             
         # Actualizar el resto de campos
         for attr, value in validated_data.items():
@@ -133,6 +134,16 @@ class TripSerializer(serializers.ModelSerializer):
         
         return instance
 
+class ArchivedTripSerializer(TripSerializer):
+    """
+    Viaje archivado (solo lectura) con la misma forma que TripSerializer,
+    para que el historial mezcle ambos sin que el cliente note la diferencia.
+    """
+    class Meta(TripSerializer.Meta):
+        model = ArchivedTrip
+        read_only_fields = [f.name for f in ArchivedTrip._meta.fields]
+
+
 class TripOfferSerializer(serializers.ModelSerializer):
     driver_name = serializers.CharField(source='driver.user.get_full_name', read_only=True)
     driver_email = serializers.EmailField(source='driver.user.email', read_only=True)
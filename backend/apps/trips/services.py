@@ -1,19 +1,63 @@
 """
 Servicio para obtener rutas usando Mapbox Directions API
 Protege la API Key en el backend
+
+Las coordenadas se redondean a ROUTE_COORD_PRECISION decimales (4 ≈ 11 m) y
+las consultas idénticas y simultáneas (p. ej. al terminar un evento) esperan
+una sola llamada a Mapbox y comparten el resultado (ver backend/singleflight.py),
+que queda en caché ROUTE_CACHE_TTL segundos.
+
+Las llamadas pasan por un circuit breaker (ver backend/circuit_breaker.py): si
+Mapbox falla o responde lento de forma sostenida se deja de llamarlo un tiempo
+y, mientras tanto, se devuelve una estimación local ('estimated': True) en vez
+de hacer esperar a cada request hasta su timeout. Solo cuentan como fallos los
+5xx, 429, timeouts y errores de conexión; un 4xx o "sin ruta" es un problema de
+la consulta (RouteClientError) y no abre el circuito.
 """
+import math
 import os
 import requests
 import polyline
 from typing import Dict, List, Tuple
 
+from django.conf import settings
+
+from backend.circuit_breaker import CLOSED, CircuitBreaker, ClientError
+from backend.singleflight import single_flight
+
+# Mayor que el timeout de la llamada a Mapbox: es la vida del lock del líder
+ROUTE_COALESCE_TIMEOUT = settings.ROUTE_PROVIDER_TIMEOUT + 5
+
+EARTH_RADIUS_M = 6371000
+
+
+class RouteClientError(ClientError):
+    """Mapbox rechazó la consulta (4xx) o no encontró ruta entre los puntos"""
+
+
+route_breaker = CircuitBreaker(
+    'mapbox',
+    failure_rate=settings.ROUTE_BREAKER_FAILURE_RATE,
+    min_calls=settings.ROUTE_BREAKER_MIN_CALLS,
+    window=settings.ROUTE_BREAKER_WINDOW,
+    open_seconds=settings.ROUTE_BREAKER_OPEN_SECONDS,
+    slow_call_seconds=settings.ROUTE_SLOW_CALL_SECONDS,
+)
+
+
+def haversine_m(origin: Tuple[float, float], destination: Tuple[float, float]) -> float:
+    """Distancia en línea recta (metros) entre dos puntos (longitude, latitude)"""
+    lng1, lat1, lng2, lat2 = map(math.radians, (*origin, *destination))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
 
 class RouteService:
     """
     Servicio para obtener rutas entre dos puntos usando Mapbox
     """
     MAPBOX_API_KEY = os.getenv('MAPBOX_API_KEY', '')
-    MAPBOX_DIRECTIONS_URL = 'https://api.mapbox.com/directions/v5/mapbox/driving'
+    MAPBOX_DIRECTIONS_URL = f'{settings.ROUTE_PROVIDER_URL}/directions/v5/mapbox/driving'
     
     @classmethod
     def get_route(cls, origin: Tuple[float, float], destination: Tuple[float, float]) -> Dict:
@@ -30,12 +74,51 @@ class RouteService:
                 'route': List[Tuple[float, float]],  # Lista de puntos (lat, lng)
                 'distance': float,  # Distancia en metros
                 'duration': float,  # Duración en segundos
-                'encoded_polyline': str  # Polyline codificado
+                'encoded_polyline': str,  # Polyline codificado
+                'estimated': bool  # True si es la estimación local (Mapbox no disponible)
             }
+
+        Raises:
+            CircuitOpenError: circuito abierto y ROUTE_FALLBACK_ENABLED apagado
+            RouteClientError: consulta rechazada o sin ruta (no usa la estimación)
         """
         if not cls.MAPBOX_API_KEY:
             raise ValueError("MAPBOX_API_KEY no está configurada en las variables de entorno")
-        
+
+        precision = settings.ROUTE_COORD_PRECISION
+        origin = (round(origin[0], precision), round(origin[1], precision))
+        destination = (round(destination[0], precision), round(destination[1], precision))
+        key = f"route:{origin[0]},{origin[1]};{destination[0]},{destination[1]}"
+        try:
+            return single_flight(
+                key, lambda: route_breaker.call(lambda: cls._fetch_route(origin, destination)),
+                ttl=settings.ROUTE_CACHE_TTL, timeout=ROUTE_COALESCE_TIMEOUT,
+            )
+        except RouteClientError:
+            raise
+        except Exception:
+            # Con el circuito cerrado es un fallo puntual: se propaga como antes
+            if not settings.ROUTE_FALLBACK_ENABLED or route_breaker.state() == CLOSED:
+                raise
+            route_breaker.count('fallbacks')
+            return cls.estimate_route(origin, destination)
+
+    @classmethod
+    def estimate_route(cls, origin: Tuple[float, float], destination: Tuple[float, float]) -> Dict:
+        """Estimación sin Mapbox: línea recta por ROUTE_FALLBACK_DETOUR a ROUTE_FALLBACK_SPEED_KMH"""
+        distance = haversine_m(origin, destination) * settings.ROUTE_FALLBACK_DETOUR
+        route = [(origin[1], origin[0]), (destination[1], destination[0])]
+        return {
+            'route': route,
+            'distance': distance,
+            'duration': distance / (settings.ROUTE_FALLBACK_SPEED_KMH / 3.6),
+            'encoded_polyline': polyline.encode(route),
+            'estimated': True,
+        }
+
+    @classmethod
+    def _fetch_route(cls, origin: Tuple[float, float], destination: Tuple[float, float]) -> Dict:
+        """Llamada a Mapbox Directions (una por grupo de consultas idénticas)"""
         # Construir la URL con las coordenadas
         # Mapbox espera: longitude,latitude;longitude,latitude
         coordinates = f"{origin[0]},{origin[1]};{destination[0]},{destination[1]}"
@@ -48,12 +131,15 @@ class RouteService:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = requests.get(url, params=params, timeout=settings.ROUTE_PROVIDER_TIMEOUT)
+            # 429 es Mapbox limitándonos: cuenta como fallo igual que un 5xx
+            if 400 <= response.status_code < 500 and response.status_code != 429:
+                raise RouteClientError(f"Mapbox rechazó la consulta ({response.status_code})")
             response.raise_for_status()
             data = response.json()
             
             if not data.get('routes'):
-                raise ValueError("No se encontró ninguna ruta")
+                raise RouteClientError("No se encontró ninguna ruta")
             
             route_data = data['routes'][0]
             encoded_polyline = route_data['geometry']
@@ -66,6 +152,7 @@ class RouteService:
                 'distance': route_data['distance'],  # metros
                 'duration': route_data['duration'],  # segundos
                 'encoded_polyline': encoded_polyline,
+                'estimated': False,
             }
         
         except requests.RequestException as e:
@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+# Enviadas por apps.trips.expiry después del commit de cada lote, para que
+# cachés, feeds y notificaciones suelten los viajes y ofertas vencidos.
+#   trips_expired: sender=Trip, trip_ids=[...]
+#   offers_expired: sender=TripOffer, offer_ids=[...], trip_ids=[...] (viajes de esas ofertas)
+trips_expired = Signal()
+offers_expired = Signal()
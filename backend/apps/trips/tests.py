@@ -1,3 +1,367 @@
-from django.test import TestCase
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from backend.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, ClientError
+from backend.singleflight import _across_processes, single_flight
+from backend.throttling import IPTokenBucketThrottle, _take_token_local, parse_rate
+from benchmarks.mapbox_standin import StandinServer
+
+from apps.drivers.models import DriverProfile
+
+from .breadcrumbs import decode_points, encode_points, flush_breadcrumbs, record_breadcrumb
+from .eta import build_track, project
+from .expiry import expire_stale
+from .models import Trip, TripOffer
+from .services import RouteClientError, RouteService, route_breaker
+
+User = get_user_model()
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_calls_share_one_execution(self):
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'distance': 1200}
+
+        threads = [
+            threading.Thread(target=lambda: results.append(single_flight('sf:test', compute, 60, 5)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'distance': 1200}] * 8)
+        # El resultado queda en caché para los que lleguen después
+        self.assertEqual(single_flight('sf:test', compute, 60, 5), {'distance': 1200})
+        self.assertEqual(len(calls), 1)
+
+    def test_follower_in_other_process_gets_circuit_open_error(self):
+        def compute():
+            time.sleep(0.2)
+            raise CircuitOpenError('mapbox', 7)
+
+        # _across_processes directo: el seguidor no ve el _Call del líder, como en otro proceso
+        leader = threading.Thread(target=lambda: self.assertRaises(
+            CircuitOpenError, _across_processes, 'sf:open', compute, 60, 5,
+        ))
+        leader.start()
+        time.sleep(0.05)
+        with self.assertRaises(CircuitOpenError) as raised:
+            _across_processes('sf:open', lambda: {'distance': 1}, 60, 5)
+        leader.join()
+
+        self.assertEqual(raised.exception.retry_after, 7)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+        patcher = mock.patch('backend.throttling.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('20/min'), (20, 60))
+        self.assertEqual(parse_rate('5/s'), (5, 1))
+
+    def test_burst_up_to_capacity_then_deny(self):
+        results = [_take_token_local('bucket', 3, 0.5) for _ in range(4)]
+
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        # Falta una ficha entera a 0.5 fichas/s
+        self.assertAlmostEqual(results[-1][1], 2.0)
+
+    def test_refill_at_rate_and_cap_at_capacity(self):
+        for _ in range(3):
+            _take_token_local('bucket', 3, 0.5)
+
+        self.now += 1.0
+        allowed, wait = _take_token_local('bucket', 3, 0.5)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 1.0)
+
+        self.now += 1.0
+        self.assertTrue(_take_token_local('bucket', 3, 0.5)[0])
+
+        # Mucho tiempo después el balde vuelve lleno, no más
+        self.now += 3600
+        results = [_take_token_local('bucket', 3, 0.5)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    @override_settings(REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': {'route.ip': '2/min'}})
+    def test_throttle_uses_scope_rate(self):
+        view = mock.Mock(throttle_scope='route')
+        request = RequestFactory().get('/api/trips/route/', REMOTE_ADDR='10.0.0.1')
+        throttle = IPTokenBucketThrottle()
+
+        self.assertEqual([throttle.allow_request(request, view) for _ in range(3)], [True, True, False])
+        self.assertAlmostEqual(throttle.wait(), 30.0)
+        # Otra IP tiene su propio balde; un scope sin tasa no se limita
+        other = RequestFactory().get('/api/trips/route/', REMOTE_ADDR='10.0.0.2')
+        self.assertTrue(throttle.allow_request(other, view))
+        self.assertTrue(throttle.allow_request(request, mock.Mock(throttle_scope='other')))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.breaker = CircuitBreaker('test', failure_rate=0.5, min_calls=4, window=60,
+                                      open_seconds=0.2, slow_call_seconds=1)
+
+    def fail(self, error=RuntimeError):
+        def fn():
+            raise error('falla')
+        with self.assertRaises(error):
+            self.breaker.call(fn)
+
+    def test_opens_after_failure_rate_and_rejects_without_calling(self):
+        for _ in range(4):
+            self.fail()
+        self.assertEqual(self.breaker.state(), OPEN)
+
+        called = []
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.call(lambda: called.append(1))
+        self.assertEqual(called, [])
+        self.assertGreater(raised.exception.retry_after, 0)
+        self.assertEqual(self.breaker.snapshot()['rejected_total'], 1)
+
+    def test_half_open_probe_closes_on_success(self):
+        for _ in range(4):
+            self.fail()
+        time.sleep(0.25)
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.assertEqual(self.breaker.snapshot()['window_calls'], 0)
+
+    def test_half_open_probe_reopens_on_failure(self):
+        for _ in range(4):
+            self.fail()
+        time.sleep(0.25)
+
+        self.fail()
+        self.assertEqual(self.breaker.state(), OPEN)
+        self.assertEqual(self.breaker.snapshot()['opened_total'], 2)
+
+    def test_client_errors_do_not_open(self):
+        for _ in range(10):
+            self.fail(ClientError)
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.assertEqual(self.breaker.snapshot()['window_failures'], 0)
+
+
+@override_settings(ROUTE_FALLBACK_ENABLED=True)
+class RouteProviderErrorTests(SimpleTestCase):
+    """RouteService contra el stand-in local de Mapbox (benchmarks/mapbox_standin.py)"""
+
+    def setUp(self):
+        cache.clear()
+
+    def serve(self, **options):
+        server = StandinServer(('127.0.0.1', 0), **options).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'{server.url}/directions/v5/mapbox/driving'
+        for name, value in (('MAPBOX_API_KEY', 'local'), ('MAPBOX_DIRECTIONS_URL', url)):
+            patcher = mock.patch.object(RouteService, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return server
+
+    def route(self, i):
+        return RouteService.get_route((-74.0 - i / 1000, 4.6), (-74.05, 4.65))
+
+    def test_client_errors_do_not_trip_breaker(self):
+        self.serve(error_rate=1.0, error_status=404)
+        for i in range(route_breaker.min_calls * 2):
+            with self.assertRaises(RouteClientError):
+                self.route(i)
+        self.assertEqual(route_breaker.state(), CLOSED)
+
+    def test_server_errors_trip_breaker_and_fall_back(self):
+        self.serve(error_rate=1.0, error_status=503)
+        for i in range(route_breaker.min_calls - 1):
+            with self.assertRaises(Exception):
+                self.route(i)
+
+        # La llamada que abre el circuito ya responde con la estimación local
+        self.assertTrue(self.route(99)['estimated'])
+        self.assertEqual(route_breaker.state(), OPEN)
+
+
+class BreadcrumbCodecTests(SimpleTestCase):
+    def track(self, count):
+        """Recorrido urbano: una posición cada 4 s a ~10 m/s, con giros"""
+        points, lat, lng, ts = [], 4.60971, -74.08175, 1760000000
+        for i in range(count):
+            points.append((round(lat, 5), round(lng, 5), ts))
+            if (i // 30) % 2:
+                lat += 0.00036
+            else:
+                lng -= 0.00036
+            ts += 4
+        return points
+
+    def test_round_trip(self):
+        points = self.track(120) + [(4.5, -74.2, 1760000900), (4.7, -74.0, 1760000901)]
+        decoded = decode_points(encode_points(points))
+
+        self.assertEqual(len(decoded), len(points))
+        for (lat, lng, ts), (dlat, dlng, dts) in zip(points, decoded):
+            self.assertAlmostEqual(lat, dlat, places=5)
+            self.assertAlmostEqual(lng, dlng, places=5)
+            self.assertEqual(ts, dts)
+
+    def test_empty(self):
+        self.assertEqual(encode_points([]), b'')
+        self.assertEqual(decode_points(b''), [])
+
+    def test_flush_drops_invalid_points(self):
+        cache.clear()
+        record_breadcrumb(7, 'destination', 4.6, -74.08, 1760000000)
+        record_breadcrumb(7, 'destination', float('nan'), -74.08, 1760000004)
+        record_breadcrumb(7, 'destination', 4.6, float('inf'), 1760000008)
+        record_breadcrumb(7, 'destination', 4.6001, -74.08, 1760000012)
+
+        with mock.patch('apps.trips.breadcrumbs.BreadcrumbChunk.objects.create') as create:
+            flush_breadcrumbs(7)
+
+        create.assert_called_once()
+        saved = create.call_args.kwargs
+        self.assertEqual(saved['point_count'], 2)
+        self.assertEqual([ts for _, _, ts in decode_points(saved['data'])], [1760000000, 1760000012])
+
+    def test_size_per_point(self):
+        points = self.track(120)
+        # El primer punto (contra cero) ocupa ~13 bytes; los demás, ~3
+        self.assertLessEqual(len(encode_points(points)), 13 + 3 * (len(points) - 1))
+
+
+class EtaProjectionTests(SimpleTestCase):
+    def setUp(self):
+        # "L" de ~1.1 km hacia el este y luego ~1.1 km hacia el norte, un punto cada ~111 m
+        east = [(4.6, -74.1 + i * 0.001) for i in range(11)]
+        north = [(4.6 + i * 0.001, -74.09) for i in range(1, 11)]
+        self.track = build_track('destination', {
+            'route': east + north, 'distance': 2250, 'duration': 300,
+        })
+
+    def test_cumulative_distance(self):
+        cumulative = self.track['cumulative']
+        self.assertEqual(cumulative[0], 0.0)
+        self.assertAlmostEqual(cumulative[10], 1109, delta=5)
+        self.assertAlmostEqual(cumulative[-1], 2221, delta=10)
+
+    def test_point_on_route(self):
+        segment, along, offset = project(self.track, 4.6, -74.0955)
+
+        self.assertEqual(segment, 4)
+        self.assertAlmostEqual(along, 0.45 * self.track['cumulative'][10], delta=2)
+        self.assertLess(offset, 1)
+
+    def test_point_beside_route(self):
+        # 50 m al norte del primer tramo, a mitad de camino del segundo segmento
+        segment, along, offset = project(self.track, 4.6 + 50 / 111320, -74.0985)
+
+        self.assertEqual(segment, 1)
+        self.assertAlmostEqual(offset, 50, delta=1)
+        self.assertAlmostEqual(along, 1.5 * self.track['cumulative'][1], delta=2)
+
+    def test_window_limits_search(self):
+        # En el tramo norte; buscando solo en los primeros segmentos queda lejos
+        point = (4.6055, -74.09)
+        segment, _, offset = project(self.track, *point)
+        self.assertEqual(segment, 15)
+        self.assertLess(offset, 1)
+
+        segment, _, offset = project(self.track, *point, start=0, end=5)
+        self.assertEqual(segment, 4)
+        self.assertGreater(offset, 500)
+
+    def test_before_start_and_after_end_clamp(self):
+        self.assertEqual(project(self.track, 4.6, -74.2)[:2], (0, 0.0))
+        segment, along, _ = project(self.track, 4.7, -74.09)
+        self.assertEqual(segment, len(self.track['points']) - 2)
+        self.assertAlmostEqual(along, self.track['cumulative'][-1])
+
+
+class ExpiryRaceTests(TransactionTestCase):
+    """Vencimiento (apps.trips.expiry) contra una aceptación de oferta en curso"""
+
+    def setUp(self):
+        cache.clear()
+        self.client_user = User.objects.create_user(username='cliente', email='c@test.co', password='x')
+        driver_user = User.objects.create_user(username='conductor', email='d@test.co', password='x', role='DRIVER')
+        driver = DriverProfile.objects.create(user=driver_user, license_number='ABC123')
+        self.trip = Trip.objects.create(client=self.client_user, pickup_address='Calle 1', destination_address='Calle 2')
+        self.offer = TripOffer.objects.create(trip=self.trip, driver=driver, offered_price=9000, estimated_arrival_time=5)
+
+    def test_sweeper_skips_trip_locked_by_acceptance(self):
+        locked, release = threading.Event(), threading.Event()
+        responses = []
+        save = TripOffer.save
+
+        def blocking_save(offer, *args, **kwargs):
+            # Dentro de la transacción de TripOfferViewSet.accept, con sus bloqueos ya tomados
+            locked.set()
+            release.wait(5)
+            return save(offer, *args, **kwargs)
+
+        def accept():
+            try:
+                api = APIClient()
+                api.force_authenticate(self.client_user)
+                responses.append(api.post(reverse('tripoffer-accept', args=[self.offer.pk])))
+            finally:
+                connection.close()
+
+        with mock.patch.object(TripOffer, 'save', blocking_save):
+            acceptance = threading.Thread(target=accept)
+            acceptance.start()
+            self.assertTrue(locked.wait(5))
+            try:
+                self.assertEqual(expire_stale(trip_ttl_minutes=0, offer_ttl_minutes=0), (0, 0))
+            finally:
+                release.set()
+                acceptance.join()
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.trip.refresh_from_db()
+        self.offer.refresh_from_db()
+        self.assertEqual(self.trip.status, Trip.Status.ACCEPTED)
+        self.assertEqual(self.offer.status, TripOffer.OfferStatus.ACCEPTED)
+        # Ya aceptado, el viaje no vuelve a ser candidato
+        self.assertEqual(expire_stale(trip_ttl_minutes=0, offer_ttl_minutes=0), (0, 0))
+
+    def test_expired_offer_cannot_be_accepted(self):
+        self.assertEqual(expire_stale(trip_ttl_minutes=0, offer_ttl_minutes=0), (1, 1))
+
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        response = api.post(reverse('tripoffer-accept', args=[self.offer.pk]))
+
+        self.assertEqual(response.status_code, 400)
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.status, Trip.Status.EXPIRED)
+        self.assertIsNone(self.trip.driver_id)
@@ -1,31 +1,64 @@
+import json
+import math
+
 from rest_framework import viewsets, permissions, status, generics, serializers
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from django.contrib.gis.geos import Point
 from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.measure import D
 
-from .models import Trip, TripOffer
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+
+from .models import Trip, TripOffer, ArchivedTrip
 from .serializers import (
     TripSerializer, TripOfferSerializer, TripOfferCreateSerializer,
-    TripAvailableSerializer
+    TripAvailableSerializer, ArchivedTripSerializer
 )
-from .services import RouteService
+from .services import RouteClientError, RouteService
+from .eta import get_eta, sync_tracking
+from .breadcrumbs import PHASES as BREADCRUMB_PHASES, flush_breadcrumbs, iter_breadcrumbs
+from .bulk import CSVParser, NDJSONParser, create_deliveries
+from apps.drivers.presence import record_driver_location
+from apps.payments.ledger import record_trip_payment
 from apps.accounts.permissions import IsOwnerOrAdmin, IsClient, IsDriver, IsAdmin
+from backend.circuit_breaker import CircuitOpenError
+from backend.db_routers import ReplicaReadMixin
+from backend.throttling import ROUTING_THROTTLES
 
 
-class AvailableTripsView(generics.ListAPIView):
+class AvailableTripsView(ReplicaReadMixin, generics.ListAPIView):
     """
     Vista para que los conductores vean viajes disponibles (REQUESTED y sin conductor)
     """
-    queryset = Trip.objects.filter(status='REQUESTED', driver__isnull=True)
+    replica_actions = None  # Solo lectura: todo el feed sale de réplicas
+    # Más recientes primero: recorre el índice parcial trip_open_feed_idx
+    queryset = Trip.objects.filter(status='REQUESTED', driver__isnull=True).order_by('-created_at')
     serializer_class = TripAvailableSerializer
     permission_classes = [permissions.IsAuthenticated, (IsDriver | IsAdmin)]
 
 
-class TripViewSet(viewsets.ModelViewSet):
+class ArchivedTripPagination(CursorPagination):
+    """
+    Historial por cursor (created_at del último viaje de la página): cada página
+    recorre el índice (client|driver, -created_at) sin OFFSET.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = settings.ARCHIVED_TRIPS_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class TripViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Trip.objects.all()
     serializer_class = TripSerializer
+    throttle_scope = None
+    replica_actions = ('list', 'retrieve', 'history')
     
     def get_permissions(self):
         if self.action == 'create':
@@ -35,6 +68,23 @@ class TripViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(client=self.request.user)
 
+    def perform_update(self, serializer):
+        was_completed = serializer.instance.status == Trip.Status.COMPLETED
+        previous_driver_id = serializer.instance.driver_id
+        previous_status = serializer.instance.status
+        trip = serializer.save()
+        # Al completarse, el pago queda en el libro mayor (idempotente por viaje;
+        # record_trip_payments asienta los que se completen por otras vías)
+        if trip.status == Trip.Status.COMPLETED and not was_completed:
+            record_trip_payment(trip)
+        # Seguimiento y recorrido viven en caché: si fallan, el cambio ya guardado
+        # no responde 500 (robust: Django registra el error y sigue)
+        # ETA en vivo: hacia el origen (ACCEPTED), al destino (IN_PROGRESS) o fin del seguimiento
+        transaction.on_commit(lambda: sync_tracking(trip, previous_driver_id), robust=True)
+        if trip.status != previous_status:
+            # El recorrido de la fase que terminó queda guardado completo
+            transaction.on_commit(lambda: flush_breadcrumbs(trip.id), robust=True)
+
     def get_queryset(self):
         user = self.request.user
         queryset = Trip.objects.all()
@@ -49,6 +99,11 @@ class TripViewSet(viewsets.ModelViewSet):
                 try:
                     driver_location = Point(float(driver_lng), float(driver_lat), srid=4326)
                     
+                    # El feed también sirve de ping de disponibilidad del conductor (surge)
+                    driver_profile = getattr(user, 'driver_profile', None)
+                    if driver_profile is not None:
+                        record_driver_location(driver_profile.pk, driver_location.y, driver_location.x)
+                    
                     # Filtrar viajes REQUESTED dentro de 5km usando DWithin
                     queryset = Trip.objects.filter(
                         status='REQUESTED',
@@ -71,6 +126,44 @@ class TripViewSet(viewsets.ModelViewSet):
         
         return queryset.distinct()
     
+    def get_archived_queryset(self):
+        """
+        Viajes cerrados ya archivados del usuario (historial), con el mismo
+        criterio de dueño que get_queryset.
+        """
+        user = self.request.user
+        if hasattr(user, 'role') and user.role in ['DRIVER', 'ADMIN']:
+            return ArchivedTrip.objects.filter(driver__user=user)
+        return ArchivedTrip.objects.filter(client=user)
+    
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # El detalle y las ofertas de un viaje archivado se leen del archivo
+            if self.action not in ['retrieve', 'offers', 'breadcrumbs']:
+                raise
+        trip = get_object_or_404(self.get_archived_queryset(), pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, trip)
+        return trip
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """
+        Historial de viajes archivados del usuario, del más reciente al más antiguo
+        GET /trips/history/?page_size=20 (seguir el enlace `next` para la página siguiente)
+        """
+        paginator = ArchivedTripPagination()
+        archived = self.get_archived_queryset().select_related('client', 'driver__user')
+        page = paginator.paginate_queryset(archived, request, view=self)
+        return paginator.get_paginated_response(ArchivedTripSerializer(page, many=True).data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        trip = self.get_object()
+        if isinstance(trip, ArchivedTrip):
+            return Response(ArchivedTripSerializer(trip).data)
+        return Response(self.get_serializer(trip).data)
+    
     @action(detail=True, methods=['post'], permission_classes=[(IsDriver | IsAdmin)])
     def offer(self, request, pk=None):
         """
@@ -101,11 +194,14 @@ class TripViewSet(viewsets.ModelViewSet):
         
         # Verificar si ya existe una oferta de este conductor para este viaje
         existing_offer = TripOffer.objects.filter(trip=trip, driver=driver_profile).first()
-        if existing_offer:
+        if existing_offer and existing_offer.status != TripOffer.OfferStatus.EXPIRED:
             return Response(
                 {'error': 'Ya has hecho una oferta para este viaje'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if existing_offer:
+            # La oferta anterior venció: se reemplaza por la nueva
+            existing_offer.delete()
         
         # Crear la oferta
         serializer = TripOfferCreateSerializer(data=request.data)
@@ -124,17 +220,82 @@ class TripViewSet(viewsets.ModelViewSet):
         trip = self.get_object()
         
         # Verificar que el cliente sea el dueño del viaje
-        if trip.client != request.user:
+        if trip.client_id != request.user.id:
             return Response(
                 {'error': 'No tienes permiso para ver las ofertas de este viaje'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        offers = trip.offers.all()
+        offers = trip.offers.select_related('driver__user')
         serializer = TripOfferSerializer(offers, many=True)
         return Response(serializer.data)
     
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], permission_classes=[IsClient],
+            parser_classes=[JSONParser, NDJSONParser, CSVParser])
+    def bulk_deliveries(self, request):
+        """
+        Alta masiva de domicilios para comercios, en una sola transacción
+        POST /trips/bulk_deliveries/[?partial=true]
+        Body: arreglo JSON, NDJSON (application/x-ndjson) o CSV con encabezado (text/csv)
+        con los mismos campos de un viaje; service_type es DELIVERY por defecto.
+
+        Sin partial, una fila inválida cancela todo el lote. Los errores
+        se reportan por índice de fila (desde 0).
+        """
+        rows = request.data
+        if isinstance(rows, dict) or not hasattr(rows, '__iter__'):
+            return Response(
+                {'error': 'Se espera una lista de domicilios'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        partial = request.query_params.get('partial', '').lower() in ('1', 'true', 'yes')
+        created, errors = create_deliveries(request.user, rows, partial=partial)
+
+        body = {
+            'created': len(created),
+            'trips': [{'row': index, 'id': trip.id} for index, trip in created],
+            'errors': errors,
+        }
+        if not created:
+            return Response(body, status=status.HTTP_400_BAD_REQUEST)
+        return Response(body, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def eta(self, request, pk=None):
+        """
+        ETA del conductor hacia el origen (ACCEPTED) o el destino (IN_PROGRESS),
+        calculado con sus posiciones sobre la ruta guardada (ver apps.trips.eta)
+        GET /trips/{id}/eta/
+        """
+        trip = self.get_object()
+        eta = get_eta(trip.id)
+        if eta is None:
+            return Response(
+                {'error': 'Aún no hay posición del conductor para este viaje'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(eta)
+    
+    @action(detail=True, methods=['get'])
+    def breadcrumbs(self, request, pk=None):
+        """
+        Recorrido GPS del viaje en orden, como NDJSON (una posición por línea),
+        enviado a medida que se decodifica: sirve para reproducirlo o exportarlo
+        GET /trips/{id}/breadcrumbs/?phase=pickup|destination
+        """
+        trip = self.get_object()
+        phase = request.query_params.get('phase')
+        if phase is not None and phase not in BREADCRUMB_PHASES:
+            return Response(
+                {'error': f"phase debe ser uno de: {', '.join(BREADCRUMB_PHASES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        lines = (json.dumps(point) + '\n' for point in iter_breadcrumbs(trip.id, phase))
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+    
+    # Cada ruta consume una llamada a Mapbox: token bucket por usuario e IP
+    @action(detail=False, methods=['post'], throttle_classes=ROUTING_THROTTLES, throttle_scope='route')
     def get_route(self, request):
         """
         Endpoint para obtener la ruta entre origen y destino
@@ -163,6 +324,17 @@ class TripViewSet(viewsets.ModelViewSet):
                 float(dest_lat), float(dest_lng)
             )
             return Response(route_data)
+        except RouteClientError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except CircuitOpenError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(math.ceil(e.retry_after))}
+            )
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -174,7 +346,9 @@ class TripOfferViewSet(viewsets.ModelViewSet):
     """
     ViewSet para manejar las ofertas
     """
-    queryset = TripOffer.objects.all()
+    # El viaje y el usuario del conductor se resuelven en el mismo SELECT
+    # para que accept, el serializer y los chequeos de dueño no hagan queries extra
+    queryset = TripOffer.objects.select_related('trip', 'driver__user')
     serializer_class = TripOfferSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -182,18 +356,23 @@ class TripOfferViewSet(viewsets.ModelViewSet):
         # Al crear una oferta, asociamos automáticamente al conductor actual
         user = self.request.user
         if hasattr(user, 'driver_profile'):
-            serializer.save(driver=user.driver_profile)
+            driver = user.driver_profile
         elif user.role == 'ADMIN':
             # Si es admin pero no tiene perfil, quizás deberíamos crearlo o error
             # Por consistencia con la DB, necesita un DriverProfile
             from apps.drivers.models import DriverProfile
-            profile, _ = DriverProfile.objects.get_or_create(
+            driver, _ = DriverProfile.objects.get_or_create(
                 user=user,
                 defaults={'license_number': 'ADMIN', 'is_verified': True}
             )
-            serializer.save(driver=profile)
         else:
             raise serializers.ValidationError({"error": "El usuario no tiene un perfil de conductor"})
+
+        # Una oferta vencida no impide volver a ofertar en el mismo viaje (único por viaje y conductor)
+        TripOffer.objects.filter(
+            trip=serializer.validated_data['trip'], driver=driver, status=TripOffer.OfferStatus.EXPIRED
+        ).delete()
+        serializer.save(driver=driver)
     
     @action(detail=True, methods=['post'], permission_classes=[IsClient])
     def accept(self, request, pk=None):
@@ -202,42 +381,51 @@ class TripOfferViewSet(viewsets.ModelViewSet):
         POST /offers/{id}/accept/
         """
         offer = self.get_object()
-        trip = offer.trip
-        
-        # Verificar que el cliente sea el dueño del viaje
-        if trip.client != request.user:
-            return Response(
-                {'error': 'No tienes permiso para aceptar ofertas de este viaje'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Verificar que el viaje esté en estado REQUESTED
-        if trip.status != Trip.Status.REQUESTED:
-            return Response(
-                {'error': 'Solo se pueden aceptar ofertas en viajes con estado REQUESTED'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Verificar que la oferta esté en estado PENDING
-        if offer.status != TripOffer.OfferStatus.PENDING:
-            return Response(
-                {'error': 'Esta oferta ya ha sido procesada'},
-                status=status.HTTP_400_BAD_REQUEST
+
+        # Viaje y oferta bloqueados (en ese orden, como el vencimiento en
+        # apps.trips.expiry): los estados se verifican ya sin carreras
+        with transaction.atomic():
+            trip = Trip.objects.select_for_update().get(pk=offer.trip_id)
+            offer = TripOffer.objects.select_for_update().get(pk=offer.pk)
+            offer.trip = trip
+
+            # Verificar que el cliente sea el dueño del viaje
+            if trip.client_id != request.user.id:
+                return Response(
+                    {'error': 'No tienes permiso para aceptar ofertas de este viaje'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            # Verificar que el viaje esté en estado REQUESTED
+            if trip.status != Trip.Status.REQUESTED:
+                return Response(
+                    {'error': 'Solo se pueden aceptar ofertas en viajes con estado REQUESTED'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Verificar que la oferta esté en estado PENDING
+            if offer.status != TripOffer.OfferStatus.PENDING:
+                return Response(
+                    {'error': 'Esta oferta ya ha sido procesada'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Aceptar la oferta
+            offer.status = TripOffer.OfferStatus.ACCEPTED
+            offer.save()
+
+            # Actualizar el viaje
+            trip.driver = offer.driver
+            trip.status = Trip.Status.ACCEPTED
+            trip.save()
+
+            # Rechazar todas las demás ofertas
+            TripOffer.objects.filter(trip=trip).exclude(id=offer.id).update(
+                status=TripOffer.OfferStatus.REJECTED
             )
-        
-        # Aceptar la oferta
-        offer.status = TripOffer.OfferStatus.ACCEPTED
-        offer.save()
-        
-        # Actualizar el viaje
-        trip.driver = offer.driver
-        trip.status = Trip.Status.ACCEPTED
-        trip.save()
-        
-        # Rechazar todas las demás ofertas
-        TripOffer.objects.filter(trip=trip).exclude(id=offer.id).update(
-            status=TripOffer.OfferStatus.REJECTED
-        )
+
+        # Desde ahora las posiciones del conductor actualizan el ETA del viaje
+        sync_tracking(trip)
         
         return Response({
             'message': 'Oferta aceptada exitosamente',
@@ -1,13 +1,18 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 from .models import Vehicle
 from .serializers import VehicleSerializer
 
 from rest_framework import permissions
-from apps.accounts.permissions import IsOwnerOrAdmin, IsAdmin, IsDriver
+from apps.accounts.permissions import IsOwnerOrAdmin, IsAdmin, IsDriver, has_related_user
+from backend.db_routers import ReplicaReadMixin
 
-class VehicleViewSet(viewsets.ModelViewSet):
+User = get_user_model()
+
+class VehicleViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
 
@@ -21,10 +26,13 @@ class VehicleViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        # Precargar solo los ids de los conductores: los usa el serializer y
+        # el chequeo de dueño (IsOwnerOrAdmin) sin queries por objeto
+        drivers = Prefetch('drivers', queryset=User.objects.only('id'))
         if user.is_staff or (hasattr(user, 'role') and user.role == 'ADMIN'):
-            return Vehicle.objects.all()
+            return Vehicle.objects.prefetch_related(drivers)
         # Filtrar vehículos donde el usuario actual sea uno de los conductores
-        return Vehicle.objects.filter(drivers=user)
+        return Vehicle.objects.filter(drivers=user).prefetch_related(drivers)
 
     @action(detail=True, methods=['post', 'patch'], url_path='set-active')
     def set_active(self, request, pk=None):
@@ -36,7 +44,7 @@ class VehicleViewSet(viewsets.ModelViewSet):
         user = request.user
         
         # Verificar que el usuario sea uno de los conductores del vehículo
-        if not vehicle.drivers.filter(id=user.id).exists():
+        if not has_related_user(vehicle, 'drivers', user):
             return Response(
                 {"error": "No tienes permiso para activar este vehículo"},
                 status=status.HTTP_403_FORBIDDEN
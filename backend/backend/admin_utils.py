@@ -0,0 +1,155 @@
+"""
+Piezas del admin para tablas grandes (viajes, ofertas, calificaciones).
+
+- EstimatedCountPaginator: el total de filas sale de las estadísticas de
+  PostgreSQL (pg_class.reltuples sin filtros, el EXPLAIN con filtros) y solo
+  se cuenta exacto cuando la estimación es menor que ADMIN_EXACT_COUNT_LIMIT.
+- IndexedSearchMixin: cada campo de search_fields se busca en su propia
+  subconsulta y se unen con UNION, así cada una usa su índice (trigram sobre
+  UPPER(campo) para icontains, el índice del id para '=campo') en lugar del OR
+  entre JOINs que obliga a recorrer toda la tabla.
+- BucketDatesQuerySet: la navegación de date_hierarchy pregunta por cada año,
+  mes o día si existe alguna fila (un rango sobre el índice de la fecha) en
+  lugar del SELECT DISTINCT date_trunc(...) sobre la tabla completa.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.text import smart_split, unescape_string_literal
+
+RELTUPLES_SQL = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+
+
+def estimate_count(queryset):
+    """Filas estimadas por el planner para el queryset (None si no hay estadísticas)"""
+    with connections[queryset.db].cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(RELTUPLES_SQL, [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+            # -1 (o 0) mientras la tabla no se ha analizado nunca
+            return row[0] if row and row[0] > 0 else None
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator que no hace COUNT(*) sobre tablas grandes (ver estimate_count)"""
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < settings.ADMIN_EXACT_COUNT_LIMIT:
+            return super().count
+        return estimate
+
+
+class BucketDatesQuerySet(QuerySet):
+    """
+    QuerySet del changelist: datetimes() (lo que usa date_hierarchy) recorre
+    los buckets entre la primera y la última fecha con un EXISTS por bucket.
+    """
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None, **kwargs):
+        if kind not in ('year', 'month', 'day'):
+            return super().datetimes(field_name, kind, order, tzinfo, **kwargs)
+
+        bounds = self.aggregate(first=Min(field_name), last=Max(field_name))
+        if bounds['first'] is None:
+            return []
+
+        buckets = []
+        start = truncate(timezone.localtime(bounds['first'], tzinfo), kind)
+        last = timezone.localtime(bounds['last'], tzinfo)
+        while start <= last:
+            end = next_bucket(start, kind)
+            if self.filter(**{f'{field_name}__gte': start, f'{field_name}__lt': end}).exists():
+                buckets.append(start)
+            start = end
+        return buckets if order == 'ASC' else buckets[::-1]
+
+
+def truncate(moment, kind):
+    moment = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if kind in ('year', 'month'):
+        moment = moment.replace(day=1)
+    if kind == 'year':
+        moment = moment.replace(month=1)
+    return moment
+
+
+def next_bucket(start, kind):
+    """Inicio del bucket siguiente (en hora local, respetando cambios de horario)"""
+    if kind == 'day':
+        naive = timezone.make_naive(start, start.tzinfo) + timedelta(days=1)
+    elif kind == 'month':
+        naive = timezone.make_naive(start, start.tzinfo).replace(day=28) + timedelta(days=4)
+        naive = naive.replace(day=1)
+    else:
+        naive = timezone.make_naive(start, start.tzinfo).replace(year=start.year + 1)
+    return timezone.make_aware(naive, start.tzinfo)
+
+
+class BucketDatesChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        bucketed = BucketDatesQuerySet(model=queryset.model, query=queryset.query, using=queryset._db)
+        bucketed._prefetch_related_lookups = queryset._prefetch_related_lookups
+        return bucketed
+
+
+class IndexedSearchMixin:
+    """
+    Mixin para ModelAdmin de tablas grandes: búsqueda por UNION de subconsultas
+    indexadas, conteo estimado y date_hierarchy sin recorrer la tabla.
+    En search_fields, '=campo' busca exacto (ids); el resto, icontains.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Los facets cuentan cada opción de cada filtro sobre la tabla completa
+    show_facets = admin.ShowFacets.NEVER
+
+    def get_changelist(self, request, **kwargs):
+        return BucketDatesChangeList
+
+    def search_arm(self, field, term):
+        """Subconsulta de pks para un campo de search_fields (None si el término no aplica)"""
+        exact = field.startswith('=')
+        path = field.lstrip('=')
+        if exact:
+            try:
+                term = get_fields_from_path(self.model, path)[-1].to_python(term)
+            except ValidationError:
+                return None
+        lookup = f'{path}__exact' if exact else f'{path}__icontains'
+        return self.model._default_manager.filter(**{lookup: term}).order_by().values('pk')
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        if not search_term or not search_fields:
+            return queryset, False
+
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            arms = [arm for arm in (self.search_arm(field, bit) for field in search_fields) if arm is not None]
+            if not arms:
+                return queryset.none(), False
+            queryset = queryset.filter(pk__in=arms[0].union(*arms[1:]))
+        # pk__in no multiplica filas: no hace falta el DISTINCT
+        return queryset, False
@@ -0,0 +1,135 @@
+"""
+Circuit breaker compartido entre procesos (estado en la caché).
+
+- closed: las llamadas pasan. Se cuentan llamadas y fallos por ventanas fijas
+  de `window` segundos; una llamada cuenta como fallo si lanza una excepción o
+  tarda más de `slow_call_seconds`. Con al menos `min_calls` llamadas y una
+  tasa de fallos >= `failure_rate`, el circuito se abre.
+- open: durante `open_seconds` toda llamada falla de inmediato con
+  CircuitOpenError, sin tocar al proveedor.
+- half_open: pasado ese tiempo, una sola llamada de prueba a la vez (entre
+  todos los procesos) llega al proveedor: si sale bien el circuito se cierra,
+  si no, vuelve a abrirse.
+
+snapshot() resume estado, ventana actual y contadores (aperturas, rechazos,
+fallbacks) para el health check de administración.
+"""
+import time
+
+from django.core.cache import cache
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+COUNTERS = ('opened', 'rejected', 'fallbacks')
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name, retry_after):
+        super().__init__(f"Proveedor {name} no disponible (circuito abierto)")
+        self.name = name
+        self.retry_after = retry_after
+
+    def __reduce__(self):
+        # Se comparte entre procesos por la caché (ver backend.singleflight)
+        return self.__class__, (self.name, self.retry_after)
+
+
+class ClientError(Exception):
+    """
+    El proveedor respondió, pero la solicitud no sirve (p. ej. 4xx o sin
+    resultado): call() la cuenta como llamada exitosa y la propaga.
+    """
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_rate, min_calls, window, open_seconds, slow_call_seconds):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+
+    def _key(self, suffix):
+        return f"breaker:{self.name}:{suffix}"
+
+    def _window_keys(self):
+        bucket = int(time.time() // self.window)
+        return self._key(f"calls:{bucket}"), self._key(f"failures:{bucket}")
+
+    def _incr(self, key, timeout):
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Venció entre add e incr
+            cache.set(key, 1, timeout)
+            return 1
+
+    def count(self, counter):
+        """Suma 1 a un contador acumulado (opened, rejected, fallbacks)"""
+        self._incr(self._key(counter), None)
+
+    def state(self):
+        opened_at = cache.get(self._key('opened_at'))
+        if opened_at is None:
+            return CLOSED
+        return OPEN if time.time() < opened_at + self.open_seconds else HALF_OPEN
+
+    def retry_after(self):
+        opened_at = cache.get(self._key('opened_at'))
+        return max(0.0, opened_at + self.open_seconds - time.time()) if opened_at else 0.0
+
+    def call(self, fn):
+        """Ejecuta fn() a través del circuito; lanza CircuitOpenError si está abierto"""
+        probe = False
+        state = self.state()
+        if state == HALF_OPEN:
+            # Solo una prueba en vuelo; el lock vence si el proceso muere a mitad
+            probe = cache.add(self._key('probe'), 1, self.open_seconds)
+        if state == OPEN or (state == HALF_OPEN and not probe):
+            self.count('rejected')
+            raise CircuitOpenError(self.name, self.retry_after())
+
+        start = time.monotonic()
+        try:
+            result = fn()
+        except ClientError:
+            # El proveedor está sano: un error del cliente no abre el circuito
+            self._record(time.monotonic() - start <= self.slow_call_seconds, probe)
+            raise
+        except Exception:
+            self._record(False, probe)
+            raise
+        self._record(time.monotonic() - start <= self.slow_call_seconds, probe)
+        return result
+
+    def _record(self, ok, probe):
+        calls_key, failures_key = self._window_keys()
+        if probe:
+            cache.delete(self._key('probe'))
+            if ok:
+                # Cerrado: la ventana arranca limpia para no reabrir por fallos viejos
+                cache.delete_many([self._key('opened_at'), calls_key, failures_key])
+            else:
+                self._open()
+            return
+
+        calls = self._incr(calls_key, self.window * 2)
+        failures = cache.get(failures_key, 0) if ok else self._incr(failures_key, self.window * 2)
+        if calls >= self.min_calls and failures / calls >= self.failure_rate and self.state() == CLOSED:
+            self._open()
+
+    def _open(self):
+        cache.set(self._key('opened_at'), time.time(), None)
+        self.count('opened')
+
+    def snapshot(self):
+        calls_key, failures_key = self._window_keys()
+        values = cache.get_many([calls_key, failures_key] + [self._key(name) for name in COUNTERS])
+        return {
+            'state': self.state(),
+            'retry_after': round(self.retry_after(), 1),
+            'window_calls': values.get(calls_key, 0),
+            'window_failures': values.get(failures_key, 0),
+            **{f'{name}_total': values.get(self._key(name), 0) for name in COUNTERS},
+        }
@@ -0,0 +1,130 @@
+"""
+Enrutamiento de lecturas a réplicas.
+
+Solo se leen de réplicas las acciones seguras que una vista marca explícitamente
+(ReplicaReadMixin: list y retrieve de viajes, chat, vehículos y conductores).
+Todo lo demás, y cualquier escritura, va a 'default'.
+
+- Read-your-writes: si un usuario escribió en el request anterior (crear viaje,
+  ofertar, aceptar, enviar mensaje...), sus lecturas quedan fijadas a 'default'
+  durante REPLICA_PIN_SECONDS (ver ReplicaPinningMiddleware).
+- Lag: cada réplica reporta su retraso de replicación; las que superan
+  REPLICA_MAX_LAG o no responden se saltan hasta la siguiente verificación.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'db:pin:{user_id}'
+
+# Estado por request (se reinicia en ReplicaPinningMiddleware)
+_replica_reads = ContextVar('replica_reads', default=False)
+_wrote = ContextVar('db_wrote', default=False)
+
+# alias -> (verificado_en, lag en segundos o None si no responde)
+_replica_lag = {}
+
+LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def replicas_enabled():
+    return bool(replica_aliases())
+
+
+def replica_lag(alias):
+    """
+    Retraso de replicación de la réplica en segundos (None si no responde),
+    verificado como máximo cada REPLICA_LAG_CHECK_INTERVAL segundos por proceso.
+    """
+    now = time.monotonic()
+    checked = _replica_lag.get(alias)
+    if checked and now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return checked[1]
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            value = cursor.fetchone()[0]
+        lag = float(value) if value is not None else 0.0
+    except DatabaseError:
+        lag = None
+    _replica_lag[alias] = (now, lag)
+    return lag
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(PIN_KEY.format(user_id=user.pk)))
+
+
+def pin_to_primary(user):
+    cache.set(PIN_KEY.format(user_id=user.pk), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def start_request():
+    return _replica_reads.set(False), _wrote.set(False)
+
+
+def end_request(tokens):
+    _replica_reads.reset(tokens[0])
+    _wrote.reset(tokens[1])
+
+
+def request_wrote():
+    return _wrote.get()
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = replica_aliases()
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or not _replica_reads.get():
+            return None
+        healthy = [
+            alias for alias in self.replicas
+            if (lag := replica_lag(alias)) is not None and lag <= settings.REPLICA_MAX_LAG
+        ]
+        return random.choice(healthy) if healthy else 'default'
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas y primaria tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in self.replicas:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Mixin para vistas de DRF: las acciones de `replica_actions` con método seguro
+    leen de una réplica, salvo que el usuario acabe de escribir.
+    `replica_actions = None` aplica a todos los métodos seguros (vistas genéricas).
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS or not replicas_enabled():
+            return
+        if self.replica_actions is not None and getattr(self, 'action', None) not in self.replica_actions:
+            return
+        if not is_pinned(request.user):
+            _replica_reads.set(True)
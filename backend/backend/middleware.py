@@ -0,0 +1,79 @@
+"""
+Middleware del proyecto.
+
+La API (/api/v1/) se autentica con JWT y no usa sesiones, CSRF ni mensajes.
+Estas subclases de los middleware de Django se saltan para las rutas de la API
+y siguen activas para el admin, las rutas web de allauth (accounts/) y las rutas
+de la API que sí inician sesión de Django (login social, ver API_SESSION_PATHS).
+"""
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import csrf
+from rest_framework.permissions import SAFE_METHODS
+
+from . import db_routers
+
+
+def is_lean_api_path(path):
+    """
+    True si la ruta pertenece a la API y no necesita la pila web.
+    """
+    return (
+        path.startswith(settings.API_PATH_PREFIX)
+        and not path.startswith(tuple(settings.API_SESSION_PATHS))
+    )
+
+
+class WebOnlyMixin:
+    """
+    Ejecuta el middleware solo fuera de la API; en la API pasa directo al siguiente.
+    """
+    def __call__(self, request):
+        if is_lean_api_path(request.path_info):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(WebOnlyMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(WebOnlyMixin, csrf.CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # Django registra process_view aparte de __call__
+        if is_lean_api_path(request.path_info):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(WebOnlyMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(WebOnlyMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class ReplicaPinningMiddleware:
+    """
+    Reinicia el estado de enrutamiento por request y, si el request escribió en la
+    base de datos, fija las lecturas del usuario a la primaria por unos segundos
+    (read-your-writes frente al lag de las réplicas).
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = db_routers.start_request()
+        try:
+            response = self.get_response(request)
+            # DRF deja el usuario autenticado (JWT) también en el HttpRequest
+            user = getattr(request, 'user', None)
+            wrote = request.method not in SAFE_METHODS and db_routers.request_wrote()
+            if wrote and user and user.is_authenticated and db_routers.replicas_enabled():
+                db_routers.pin_to_primary(user)
+            return response
+        finally:
+            db_routers.end_request(tokens)
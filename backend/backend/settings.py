@@ -63,6 +63,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django.contrib.sites',
     'django.contrib.gis',  # PostGIS support
+    'django.contrib.postgres',  # pg_trgm (búsqueda difusa del gazetteer)
     
     # Third-Party Apps - CORS
     'corsheaders',
@@ -85,6 +86,7 @@ INSTALLED_APPS = [
     'apps.clients',
     'apps.drivers',
     'apps.fares',
+    'apps.geocoding',
     'apps.notifications',
     'apps.payments',
     'apps.ratings',
@@ -99,13 +101,25 @@ SITE_ID = 1
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be at the top
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Sesión, CSRF, auth de Django y mensajes se saltan en /api/v1/ (JWT);
+    # ver backend/middleware.py y API_SESSION_PATHS
+    'backend.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'backend.middleware.CsrfViewMiddleware',
+    'backend.middleware.AuthenticationMiddleware',
+    'backend.middleware.MessageMiddleware',
+    # allauth exige esta ruta exacta en MIDDLEWARE; su costo por request es mínimo
     'allauth.account.middleware.AccountMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Read-your-writes para las réplicas de lectura (ver backend/db_routers.py)
+    'backend.middleware.ReplicaPinningMiddleware',
+]
+
+API_PATH_PREFIX = '/api/v1/'
+
+# Rutas de la API que sí inician sesión de Django (login social de allauth/dj-rest-auth)
+API_SESSION_PATHS = [
+    '/api/v1/accounts/google/',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -139,9 +153,67 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', '12345'),
         'HOST': os.getenv('DB_HOST', '127.0.0.1'),
         'PORT': os.getenv('DB_PORT', '5433'),
+        # Conexiones persistentes: evita abrir una conexión (y repetir las
+        # consultas de tipos de PostGIS) en cada request. 0 = cerrar al terminar
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        # Verifica la conexión reutilizada antes de cada request
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Pool de conexiones nativo de Django (requiere psycopg 3: pip install "psycopg[binary,pool]").
+# Con pool, cada worker mantiene entre DB_POOL_MIN_SIZE y DB_POOL_MAX_SIZE conexiones.
+if os.getenv('DB_POOL', 'False') == 'True':
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # Django no permite pool + conexiones persistentes
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),  # segundos esperando una conexión libre
+        },
+    }
+
+# Réplicas de lectura (opcional): DB_REPLICA_HOSTS=host1:5433,host2
+# Heredan credenciales y opciones de 'default'; el router solo les envía las
+# lecturas de las vistas con ReplicaReadMixin.
+for index, replica in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['backend.db_routers.ReplicaRouter']
+
+REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', '2'))  # segundos
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', '5'))  # segundos
+# Tiempo que las lecturas de un usuario van a la primaria después de escribir
+REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', '10'))
+
+# ==============================================================================
+# CACHE
+# ==============================================================================
+
+# Marcas de claims vencidos, pins a la primaria, surge y geocoding necesitan una
+# caché compartida entre procesos: REDIS_URL=redis://host:6379/0 (requiere redis).
+# Sin REDIS_URL se usa memoria local (válido solo con un proceso, p. ej. en desarrollo)
+# y la autenticación JWT vuelve a cargar el usuario en cada request
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # ==============================================================================
 # CORS CONFIGURATION (for mobile app integration)
 # ==============================================================================
@@ -212,15 +284,30 @@ AUTHENTICATION_BACKENDS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # request.user se construye desde los claims del token, sin SELECT por request
+        'apps.accounts.authentication.ClaimsJWTAuthentication',
     ),
+    # Token bucket por endpoint (backend/throttling.py): '<scope>.user' y '<scope>.ip';
+    # la cifra es también la ráfaga máxima
+    'DEFAULT_THROTTLE_RATES': {
+        'route.user': os.getenv('THROTTLE_ROUTE_USER', '20/min'),
+        'route.ip': os.getenv('THROTTLE_ROUTE_IP', '60/min'),
+        'fare_estimate.user': os.getenv('THROTTLE_FARE_ESTIMATE_USER', '30/min'),
+        'fare_estimate.ip': os.getenv('THROTTLE_FARE_ESTIMATE_IP', '90/min'),
+    },
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.accounts.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.authentication.ClaimsTokenRefreshSerializer',
 }
 
+# Caché por proceso del usuario completo cuando una vista necesita más que los claims
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', '30'))  # segundos
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', '10000'))
+
 # ==============================================================================
 # SOCIAL AUTHENTICATION (GOOGLE OAUTH)
 # ==============================================================================
@@ -240,6 +327,139 @@ SOCIALACCOUNT_PROVIDERS = {
 REST_USE_JWT = True
 JWT_AUTH_COOKIE = 'auth-token'
 
+# ==============================================================================
+# TRIPS
+# ==============================================================================
+
+# Archivado de viajes cerrados (python manage.py archive_trips, programado p. ej. cada noche)
+TRIP_ARCHIVE_AFTER_DAYS = int(os.getenv('TRIP_ARCHIVE_AFTER_DAYS', '30'))
+TRIP_ARCHIVE_BATCH_SIZE = int(os.getenv('TRIP_ARCHIVE_BATCH_SIZE', '500'))
+# Viajes archivados por página en GET /trips/history/
+ARCHIVED_TRIPS_PAGE_SIZE = int(os.getenv('ARCHIVED_TRIPS_PAGE_SIZE', '20'))
+
+# Máximo de domicilios por solicitud en POST /trips/bulk_deliveries/
+TRIP_BULK_MAX_ROWS = int(os.getenv('TRIP_BULK_MAX_ROWS', '1000'))
+
+# Vencimiento de viajes sin oferta aceptada y de ofertas pendientes
+# (python manage.py expire_trips --loop revisa cada TRIP_EXPIRY_INTERVAL s)
+TRIP_REQUEST_TTL_MINUTES = int(os.getenv('TRIP_REQUEST_TTL_MINUTES', '30'))
+TRIP_OFFER_TTL_MINUTES = int(os.getenv('TRIP_OFFER_TTL_MINUTES', '10'))
+TRIP_EXPIRY_BATCH_SIZE = int(os.getenv('TRIP_EXPIRY_BATCH_SIZE', '500'))
+TRIP_EXPIRY_INTERVAL = int(os.getenv('TRIP_EXPIRY_INTERVAL', '30'))
+
+# Rutas de Mapbox (apps.trips.services.RouteService): decimales a los que se
+# redondean las coordenadas para agrupar consultas idénticas y segundos en caché.
+# ROUTE_PROVIDER_URL puede apuntar al stand-in local (benchmarks/mapbox_standin.py)
+# para pruebas y benchmarks sin red
+ROUTE_PROVIDER_URL = os.getenv('ROUTE_PROVIDER_URL', 'https://api.mapbox.com')
+ROUTE_COORD_PRECISION = int(os.getenv('ROUTE_COORD_PRECISION', '4'))
+ROUTE_CACHE_TTL = int(os.getenv('ROUTE_CACHE_TTL', '120'))
+
+# Circuit breaker del proveedor de rutas: timeout por llamada, una llamada más
+# lenta que ROUTE_SLOW_CALL_SECONDS cuenta como fallo; con ROUTE_BREAKER_MIN_CALLS
+# llamadas y una tasa de fallos >= ROUTE_BREAKER_FAILURE_RATE en la ventana de
+# ROUTE_BREAKER_WINDOW s, se deja de llamar durante ROUTE_BREAKER_OPEN_SECONDS
+ROUTE_PROVIDER_TIMEOUT = float(os.getenv('ROUTE_PROVIDER_TIMEOUT', '4'))
+ROUTE_SLOW_CALL_SECONDS = float(os.getenv('ROUTE_SLOW_CALL_SECONDS', '2.5'))
+ROUTE_BREAKER_FAILURE_RATE = float(os.getenv('ROUTE_BREAKER_FAILURE_RATE', '0.5'))
+ROUTE_BREAKER_MIN_CALLS = int(os.getenv('ROUTE_BREAKER_MIN_CALLS', '5'))
+ROUTE_BREAKER_WINDOW = int(os.getenv('ROUTE_BREAKER_WINDOW', '30'))
+ROUTE_BREAKER_OPEN_SECONDS = int(os.getenv('ROUTE_BREAKER_OPEN_SECONDS', '30'))
+
+# Mientras el circuito no está cerrado, estimación local: línea recta por un
+# factor de desvío a una velocidad urbana media
+ROUTE_FALLBACK_ENABLED = os.getenv('ROUTE_FALLBACK_ENABLED', 'True') == 'True'
+ROUTE_FALLBACK_DETOUR = float(os.getenv('ROUTE_FALLBACK_DETOUR', '1.3'))
+ROUTE_FALLBACK_SPEED_KMH = float(os.getenv('ROUTE_FALLBACK_SPEED_KMH', '25'))
+
+# ETA en vivo (apps.trips.eta): a cuántos metros de la ruta se considera que el
+# conductor se desvió, segundos mínimos entre recálculos de ruta por desvío y
+# vida en caché de la ruta y el ETA de cada viaje
+ETA_OFF_ROUTE_M = int(os.getenv('ETA_OFF_ROUTE_M', '75'))
+ETA_REROUTE_INTERVAL = int(os.getenv('ETA_REROUTE_INTERVAL', '20'))
+ETA_TRACK_TTL = int(os.getenv('ETA_TRACK_TTL', '14400'))
+
+# Recorrido GPS (apps.trips.breadcrumbs): puntos por trozo guardado y vida del
+# buffer en caché si el viaje nunca se cierra
+BREADCRUMB_CHUNK_POINTS = int(os.getenv('BREADCRUMB_CHUNK_POINTS', '120'))
+BREADCRUMB_BUFFER_TTL = int(os.getenv('BREADCRUMB_BUFFER_TTL', '86400'))
+
+# ==============================================================================
+# FARES / SURGE
+# ==============================================================================
+
+# Grilla de ~1.1 km (0.01°); python manage.py update_surge --loop recalcula cada SURGE_INTERVAL s
+SURGE_CELL_SIZE_DEG = float(os.getenv('SURGE_CELL_SIZE_DEG', '0.01'))
+SURGE_INTERVAL = int(os.getenv('SURGE_INTERVAL', '60'))
+# Demanda: viajes REQUESTED creados en los últimos N minutos
+SURGE_DEMAND_WINDOW_MINUTES = int(os.getenv('SURGE_DEMAND_WINDOW_MINUTES', '15'))
+# Oferta: conductores sin viaje en curso que reportaron posición en los últimos N segundos
+SURGE_DRIVER_TTL = int(os.getenv('SURGE_DRIVER_TTL', '120'))
+SURGE_SENSITIVITY = float(os.getenv('SURGE_SENSITIVITY', '0.5'))
+SURGE_MAX_MULTIPLIER = float(os.getenv('SURGE_MAX_MULTIPLIER', '2.5'))
+
+# Mínimo de segundos entre escrituras de la posición de un mismo conductor
+DRIVER_LOCATION_WRITE_INTERVAL = int(os.getenv('DRIVER_LOCATION_WRITE_INTERVAL', '30'))
+
+# ==============================================================================
+# ADMINISTRATION (HEATMAP, TILES Y KPIs)
+# ==============================================================================
+
+# Resoluciones del heatmap en grados (zoom <= 11, <= 14, mayor), agregadas por
+# python manage.py rollup_demand (programar cada ~5 minutos)
+HEATMAP_CELL_SIZES = [0.05, 0.01, 0.002]
+HEATMAP_ROLLUP_HOURS = int(os.getenv('HEATMAP_ROLLUP_HOURS', '2'))
+HEATMAP_CACHE_TTL = int(os.getenv('HEATMAP_CACHE_TTL', '60'))
+
+# KPIs (TripMetrics): python manage.py rollup_metrics cada minuto.
+# Primera corrida sin checkpoint: procesa los cambios de los últimos N días
+METRICS_INITIAL_DAYS = int(os.getenv('METRICS_INITIAL_DAYS', '7'))
+# Margen hacia atrás del checkpoint para transacciones que confirman tarde
+METRICS_ROLLUP_OVERLAP = int(os.getenv('METRICS_ROLLUP_OVERLAP', '120'))
+
+# Vector tiles (/administration/tiles/{z}/{x}/{y}.mvt): TTL de caché por tipo de tile
+TILE_MAX_ZOOM = 20
+TILE_CACHE_TTL_LIVE = int(os.getenv('TILE_CACHE_TTL_LIVE', '15'))
+TILE_CACHE_TTL_TODAY = int(os.getenv('TILE_CACHE_TTL_TODAY', '60'))
+TILE_CACHE_TTL_PAST = int(os.getenv('TILE_CACHE_TTL_PAST', '86400'))
+
+# Admin de tablas grandes (backend/admin_utils.py): por debajo de este número
+# de filas estimadas se hace el COUNT(*) exacto
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv('ADMIN_EXACT_COUNT_LIMIT', '10000'))
+
+# ==============================================================================
+# PAYMENTS (LIBRO MAYOR)
+# ==============================================================================
+
+# Fracción del monto de cada viaje que queda como comisión de la plataforma
+PAYMENTS_COMMISSION_RATE = os.getenv('PAYMENTS_COMMISSION_RATE', '0.15')
+
+# Liquidación semanal (python manage.py settle_drivers): las cuentas de conductor
+# se reparten en N particiones que liquida un pool de procesos
+SETTLEMENT_PARTITIONS = int(os.getenv('SETTLEMENT_PARTITIONS', '16'))
+SETTLEMENT_WORKERS = int(os.getenv('SETTLEMENT_WORKERS', '4'))
+
+# ==============================================================================
+# SUPPORT
+# ==============================================================================
+
+# Ventana por defecto de la búsqueda en mensajes de chat (apps.support.search)
+SUPPORT_SEARCH_DAYS = int(os.getenv('SUPPORT_SEARCH_DAYS', '180'))
+
+# ==============================================================================
+# GEOCODING
+# ==============================================================================
+
+# Gazetteer local (apps.geocoding.Place) primero; el proveedor externo es opcional
+# ('mapbox' o vacío para no salir nunca a la red)
+GEOCODING_PROVIDER = os.getenv('GEOCODING_PROVIDER', '')
+MAPBOX_API_KEY = os.getenv('MAPBOX_API_KEY', '')
+GEOCODING_COUNTRY = os.getenv('GEOCODING_COUNTRY', 'co')
+GEOCODING_PROVIDER_TIMEOUT = float(os.getenv('GEOCODING_PROVIDER_TIMEOUT', '3'))
+GEOCODING_CACHE_TTL = int(os.getenv('GEOCODING_CACHE_TTL', '3600'))
+# Radio máximo para asociar unas coordenadas a un lugar conocido
+GEOCODING_REVERSE_RADIUS_M = int(os.getenv('GEOCODING_REVERSE_RADIUS_M', '150'))
+
 # ==============================================================================
 # INTERNATIONALIZATION
 # ==============================================================================
@@ -0,0 +1,116 @@
+"""
+Single-flight: llamadas idénticas y concurrentes esperan una sola ejecución y
+comparten su resultado.
+
+- Dentro del proceso, el primer hilo con una llave es el líder; los demás
+  esperan su threading.Event.
+- Entre procesos, el líder es quien gana cache.add(llave:lock). Los demás
+  consultan la caché hasta que aparece el resultado (que queda guardado `ttl`
+  segundos para los que lleguen después) o el error del líder, que se
+  comparte unos segundos para que los seguidores también fallen rápido. El
+  error se comparte con su tipo (p. ej. CircuitOpenError) si se puede
+  serializar; si no, los seguidores reciben SingleFlightError con el mensaje.
+
+Si el líder muere sin publicar nada, el lock vence y otro toma el relevo.
+"""
+import pickle
+import threading
+import time
+
+from django.core.cache import cache
+
+POLL_INTERVAL = 0.05
+ERROR_TTL = 5
+
+
+class SingleFlightError(Exception):
+    """El líder falló (o no respondió a tiempo) mientras se esperaba su resultado"""
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_calls = {}
+_calls_lock = threading.Lock()
+
+
+def single_flight(key, compute, ttl, timeout):
+    """
+    Resultado de compute() para `key`, ejecutado una sola vez entre todos los
+    que lo piden a la vez. `timeout` es la espera máxima de un seguidor y la
+    vida del lock (debe superar la duración máxima de compute()).
+    El resultado no puede ser None.
+    """
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+
+    if not leader:
+        if not call.event.wait(timeout):
+            raise SingleFlightError('Tiempo de espera agotado')
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _across_processes(key, compute, ttl, timeout)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call.event.set()
+
+
+def _shareable(error):
+    """El error tal cual si sobrevive al pickle de la caché; si no, su mensaje"""
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        return str(error) or error.__class__.__name__
+    return error
+
+
+def _across_processes(key, compute, ttl, timeout):
+    lock_key, error_key = f'{key}:lock', f'{key}:error'
+    deadline = time.monotonic() + timeout
+    while True:
+        if cache.add(lock_key, 1, timeout):
+            try:
+                # Otro líder pudo terminar entre nuestro get y el add
+                result = cache.get(key)
+                if result is None:
+                    cache.delete(error_key)
+                    try:
+                        result = compute()
+                    except Exception as e:
+                        cache.set(error_key, _shareable(e), ERROR_TTL)
+                        raise
+                    cache.set(key, result, ttl)
+                return result
+            finally:
+                cache.delete(lock_key)
+
+        time.sleep(POLL_INTERVAL)
+        result = cache.get(key)
+        if result is not None:
+            return result
+        error = cache.get(error_key)
+        if isinstance(error, Exception):
+            raise error
+        if error is not None:
+            raise SingleFlightError(error)
+        if time.monotonic() > deadline:
+            raise SingleFlightError('Tiempo de espera agotado')
@@ -0,0 +1,135 @@
+"""
+Rate limiting por token bucket para endpoints caros (rutas de Mapbox, estimaciones).
+
+Cada identidad (usuario o IP) tiene un balde de `capacity` fichas que se
+rellena a `capacity / período` fichas por segundo; cada request gasta una. Así
+se permiten ráfagas cortas sin dejar que un cliente sostenga más que la tasa.
+
+Las tasas se configuran por endpoint en REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+con la llave '<throttle_scope>.user' o '<throttle_scope>.ip' y el formato de
+DRF ('20/min'); un scope sin tasa no se limita.
+
+Con Redis (REDIS_URL) leer, rellenar y descontar es un único script Lua:
+atómico entre procesos y un solo viaje a Redis por request, con el reloj de
+Redis para que los servidores no dependan del suyo. Con otra caché (memoria
+local, un solo proceso) se usa un lock por proceso.
+"""
+import threading
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# KEYS[1] = balde; ARGV = capacidad, fichas por segundo. Devuelve {permitido, espera}
+TAKE_TOKEN_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+_script = None
+_local_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    """'20/min' -> (20, 60): capacidad y período en segundos (mismo formato que DRF)"""
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+def take_token(key, capacity, rate):
+    """Gasta una ficha del balde `key`. Devuelve (permitido, segundos hasta la próxima ficha)."""
+    if isinstance(caches['default'], RedisCache):
+        return _take_token_redis(key, capacity, rate)
+    return _take_token_local(key, capacity, rate)
+
+
+def _take_token_redis(key, capacity, rate):
+    global _script
+    # RedisCache no expone scripts: se usa su cliente (mismo pool de conexiones)
+    client = cache._cache.get_client(key, write=True)
+    if _script is None:
+        _script = client.register_script(TAKE_TOKEN_LUA)
+    allowed, wait = _script(keys=[cache.make_key(key)], args=[capacity, rate], client=client)
+    return bool(allowed), float(wait)
+
+
+def _take_token_local(key, capacity, rate):
+    with _local_lock:
+        now = time.monotonic()
+        tokens, ts = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+        allowed = tokens >= 1
+        wait = 0.0
+        if allowed:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        cache.set(key, (tokens, now), int(capacity / rate) + 1)
+    return allowed, wait
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle de DRF por token bucket. El scope sale de `throttle_scope` de la
+    vista (o de la acción: @action(..., throttle_scope='route')).
+    """
+    kind = None
+
+    def get_identity(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}.{self.kind}') if scope else None
+        identity = self.get_identity(request) if rate else None
+        if identity is None:
+            return True
+
+        capacity, period = parse_rate(rate)
+        allowed, wait = take_token(f'throttle:{scope}:{self.kind}:{identity}', capacity, capacity / period)
+        if not allowed:
+            self.wait_seconds = wait
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Un balde por usuario autenticado"""
+    kind = 'user'
+
+    def get_identity(self, request):
+        return request.user.pk if request.user and request.user.is_authenticated else None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Un balde por IP (respeta NUM_PROXIES de DRF para X-Forwarded-For)"""
+    kind = 'ip'
+
+    def get_identity(self, request):
+        return self.get_ident(request)
+
+
+# Para las acciones que llaman al proveedor de rutas
+ROUTING_THROTTLES = [UserTokenBucketThrottle, IPTokenBucketThrottle]
@@ -22,22 +22,31 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    
+# Todas las rutas de la API cuelgan de un único prefijo (settings.API_PATH_PREFIX),
+# que es el que recorre la pila liviana de middleware
+api_v1_patterns = [
     # Auth & Tokens
-    path('api/v1/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/v1/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('api/v1/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
-    path('accounts/', include('allauth.urls')),
+    path('auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
     # Apps
-    path('api/v1/accounts/', include('apps.accounts.urls')),
-    path('api/v1/drivers/', include('apps.drivers.urls')),
-    path('api/v1/vehicles/', include('apps.vehicles.urls')),
-    path('api/v1/trips/', include('apps.trips.urls')),
-    path('api/v1/fares/', include('apps.fares.urls')),
-    path('api/v1/chat/', include('apps.chat.urls')),
+    path('accounts/', include('apps.accounts.urls')),
+    path('drivers/', include('apps.drivers.urls')),
+    path('vehicles/', include('apps.vehicles.urls')),
+    path('trips/', include('apps.trips.urls')),
+    path('fares/', include('apps.fares.urls')),
+    path('payments/', include('apps.payments.urls')),
+    path('geocoding/', include('apps.geocoding.urls')),
+    path('administration/', include('apps.administration.urls')),
+    path('chat/', include('apps.chat.urls')),
+    path('support/', include('apps.support.urls')),
+]
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('accounts/', include('allauth.urls')),
+    path('api/v1/', include(api_v1_patterns)),
 ]
 
 from django.conf import settings
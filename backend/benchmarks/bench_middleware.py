@@ -0,0 +1,96 @@
+"""
+Benchmark de latencia por request de la pila de middleware.
+
+Compara la pila anterior (sesión, CSRF, auth y mensajes en todas las rutas) con
+la actual, donde /api/v1/ se salta la pila web. Usa el endpoint de prueba de
+conexión, que no toca la base de datos, para medir solo middleware + vista.
+
+Ejecutar desde la raíz del proyecto backend:
+python benchmarks/bench_middleware.py [requests]
+"""
+import os
+import sys
+import statistics
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment
+
+LEGACY_MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'allauth.account.middleware.AccountMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+URL = '/api/v1/accounts/test/'
+WARMUP = 500
+ROUNDS = 5
+
+
+def make_client():
+    """Crea un cliente y carga su cadena de middleware con los settings actuales"""
+    client = Client()
+    for _ in range(WARMUP):
+        client.get(URL)
+    return client
+
+
+def measure(client, requests_count):
+    """Devuelve la latencia de cada request en microsegundos"""
+    samples = []
+    for _ in range(requests_count):
+        start = time.perf_counter()
+        response = client.get(URL)
+        samples.append((time.perf_counter() - start) * 1e6)
+        assert response.status_code == 200, response.status_code
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<10} media={statistics.mean(samples):8.1f}µs  "
+          f"p50={statistics.median(samples):8.1f}µs  p95={p95:8.1f}µs")
+    return statistics.mean(samples)
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    setup_test_environment()
+
+    print("=" * 60)
+    print(f"  Middleware: {requests_count} requests a {URL}")
+    print("=" * 60)
+
+    with override_settings(MIDDLEWARE=LEGACY_MIDDLEWARE):
+        legacy_client = make_client()
+    lean_client = make_client()
+
+    # Rondas intercaladas para que el calentamiento no favorezca a ninguna pila
+    legacy_samples, lean_samples = [], []
+    per_round = max(requests_count // ROUNDS, 1)
+    for _ in range(ROUNDS):
+        legacy_samples += measure(legacy_client, per_round)
+        lean_samples += measure(lean_client, per_round)
+
+    before = report('antes', legacy_samples)
+    after = report('después', lean_samples)
+
+    print(f"\nMejora: {(1 - after / before) * 100:.1f}% por request")
+
+
+if __name__ == '__main__':
+    main()
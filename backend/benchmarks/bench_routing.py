@@ -0,0 +1,135 @@
+"""
+Benchmark de los endpoints que llaman al proveedor de rutas, sin red.
+
+Levanta el stand-in de Mapbox (benchmarks/mapbox_standin.py) en un hilo, apunta
+RouteService a él y dispara POST /fares/estimate/ y POST /trips/get_route/
+desde N hilos concurrentes sobre un conjunto de pares origen/destino (los
+repetidos ejercitan la caché y el single-flight). Corre tres escenarios:
+
+- sano: 80 ± 30 ms por respuesta
+- errores: 60% de respuestas 503 (el circuit breaker abre y se sirve la estimación local)
+- lento: 30% de respuestas de 6 s (más que ROUTE_PROVIDER_TIMEOUT)
+
+Por escenario reporta requests/s, latencias, códigos HTTP, respuestas
+estimadas localmente y llamadas que llegaron al proveedor.
+
+Las vistas se llaman con un usuario en memoria y sin token bucket (todo sale de
+la misma IP), así que no hace falta base de datos.
+
+Ejecutar desde la raíz del proyecto backend:
+python benchmarks/bench_routing.py [requests] [concurrencia] [pares]
+"""
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from mapbox_standin import StandinServer
+
+standin = StandinServer(('127.0.0.1', 0), seed=1).start()
+os.environ['ROUTE_PROVIDER_URL'] = standin.url
+os.environ.setdefault('MAPBOX_API_KEY', 'local')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import User
+from apps.fares.views import FareViewSet
+from apps.trips.views import TripViewSet
+
+SCENARIOS = [
+    ('sano', {'latency_ms': 80, 'jitter_ms': 30}),
+    ('errores', {'latency_ms': 80, 'jitter_ms': 30, 'error_rate': 0.6}),
+    ('lento', {'latency_ms': 80, 'jitter_ms': 30, 'slow_rate': 0.3, 'slow_ms': 6000}),
+]
+ENDPOINTS = [
+    ('estimate', FareViewSet.as_view({'post': 'estimate'}), '/api/v1/fares/estimate/'),
+    ('get_route', TripViewSet.as_view({'post': 'get_route'}), '/api/v1/trips/get_route/'),
+]
+# Riohacha: pares deterministas en una grilla de ~5 x 5 km
+ORIGIN = (11.5444, -72.9072)
+
+factory = APIRequestFactory()
+user = User(id=None, username='bench', role='CLIENT')
+
+
+def trip_pairs(count):
+    return [
+        {
+            'origin_lat': ORIGIN[0] + (i % 7) * 0.005,
+            'origin_lng': ORIGIN[1] + (i % 11) * 0.004,
+            'dest_lat': ORIGIN[0] + (i % 13) * 0.003 + 0.02,
+            'dest_lng': ORIGIN[1] - (i % 5) * 0.006 - 0.01,
+        }
+        for i in range(count)
+    ]
+
+
+def call(view, path, payload):
+    request = factory.post(path, payload, format='json')
+    force_authenticate(request, user=user)
+    start = time.perf_counter()
+    response = view(request)
+    elapsed = (time.perf_counter() - start) * 1000
+    estimated = response.data.get('estimated', response.data.get('route_estimated')) if response.status_code == 200 else None
+    return elapsed, response.status_code, estimated
+
+
+def run(view, path, pairs, requests_count, concurrency):
+    payloads = [pairs[i % len(pairs)] for i in range(requests_count)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda payload: call(view, path, payload), payloads))
+    return results, time.perf_counter() - start
+
+
+def report(name, results, elapsed, upstream):
+    samples = sorted(r[0] for r in results)
+    codes = Counter(r[1] for r in results)
+    estimated = sum(1 for r in results if r[2])
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"  {name:<10} {len(results) / elapsed:7.1f} req/s  p50={statistics.median(samples):7.1f}ms  "
+          f"p95={p95:7.1f}ms  p99={p99:7.1f}ms")
+    print(f"  {'':<10} HTTP {dict(sorted(codes.items()))}  estimadas={estimated}  llamadas a Mapbox={upstream}")
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    pairs = trip_pairs(int(sys.argv[3]) if len(sys.argv) > 3 else 500)
+
+    print("=" * 72)
+    print(f"  Rutas: {requests_count} requests, {concurrency} hilos, {len(pairs)} pares, stand-in {standin.url}")
+    print(f"  timeout={settings.ROUTE_PROVIDER_TIMEOUT}s  breaker: {settings.ROUTE_BREAKER_FAILURE_RATE:.0%} "
+          f"de fallos en {settings.ROUTE_BREAKER_WINDOW}s -> abierto {settings.ROUTE_BREAKER_OPEN_SECONDS}s")
+    print("=" * 72)
+
+    rest_framework = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+    with override_settings(REST_FRAMEWORK=rest_framework):
+        for scenario, faults in SCENARIOS:
+            print(f"\n{scenario}:")
+            for name, view, path in ENDPOINTS:
+                # Cada corrida parte sin rutas en caché y con el circuito cerrado
+                cache.clear()
+                vars(standin).update({'error_rate': 0.0, 'slow_rate': 0.0, **faults})
+                before = standin.requests
+                results, elapsed = run(view, path, pairs, requests_count, concurrency)
+                report(name, results, elapsed, standin.requests - before)
+
+    standin.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark de creación de viajes: statements y latencia por viaje.
+
+Compara la creación anterior (INSERT del viaje, UPDATE con los puntos e INSERT
+de la tarifa, cada uno en autocommit) con TripSerializer.create actual (viaje
+insertado ya completo y tarifa calculada en memoria, en una transacción).
+
+Todo corre dentro de una transacción externa que se revierte al final, por lo
+que ambos caminos se miden sin costo de commit; en producción el camino
+anterior además pagaba un commit por statement.
+
+Ejecutar desde la raíz del proyecto backend:
+python benchmarks/bench_trip_create.py [viajes]
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.contrib.gis.geos import Point
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import User
+from apps.fares.models import Fare
+from apps.trips.models import Trip
+from apps.trips.serializers import TripSerializer
+
+PAYLOAD = {
+    'pickup_address': 'Calle 15 #5-20',
+    'destination_address': 'Av. La Marina #10-30',
+    'pickup_latitude': 11.544,
+    'pickup_longitude': -72.907,
+    'destination_latitude': 11.550,
+    'destination_longitude': -72.910,
+    'service_type': 'VIAJE',
+    'vehicle_type': 'MOTORCYCLE',
+    'estimated_price': 15000,
+}
+ROUNDS = 5
+
+
+def legacy_create(validated_data):
+    """Copia del TripSerializer.create anterior"""
+    pickup_lat = validated_data.pop('pickup_latitude', None)
+    pickup_lng = validated_data.pop('pickup_longitude', None)
+    dest_lat = validated_data.pop('destination_latitude', None)
+    dest_lng = validated_data.pop('destination_longitude', None)
+
+    trip = Trip.objects.create(**validated_data)
+    if pickup_lat and pickup_lng:
+        trip.origin_location = Point(pickup_lng, pickup_lat, srid=4326)
+    if dest_lat and dest_lng:
+        trip.destination_location = Point(dest_lng, dest_lat, srid=4326)
+    trip.save()
+
+    Fare.objects.create(trip=trip, amount=trip.estimated_price, base_fare=trip.estimated_price)
+    return trip
+
+
+def current_create(validated_data):
+    return TripSerializer().create(validated_data)
+
+
+def validated_payload(client):
+    serializer = TripSerializer(data=PAYLOAD)
+    serializer.is_valid(raise_exception=True)
+    return dict(serializer.validated_data, client=client)
+
+
+def measure(create, client, trips):
+    """Devuelve (latencias en microsegundos, statements por viaje)"""
+    samples = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(trips):
+            data = validated_payload(client)
+            start = time.perf_counter()
+            create(data)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return samples, len(queries) / trips
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+def main():
+    trips = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    results = {'antes': [], 'después': []}
+    statements = {}
+
+    with transaction.atomic():
+        client = User.objects.create(username='bench_trip_create', role='CLIENT')
+        # Calentar ambos caminos (caché de conexión, tipos PostGIS)
+        measure(legacy_create, client, 50)
+        measure(current_create, client, 50)
+
+        # Rondas intercaladas para no favorecer a ninguno de los dos
+        for _ in range(ROUNDS):
+            for name, create in (('antes', legacy_create), ('después', current_create)):
+                samples, per_trip = measure(create, client, trips // ROUNDS)
+                results[name].extend(samples)
+                statements[name] = per_trip
+        transaction.set_rollback(True)
+
+    print("\n" + "=" * 72)
+    print(f"  {'camino':<10}{'statements':>12}{'media (µs)':>14}{'p50 (µs)':>12}{'p95 (µs)':>12}")
+    print("=" * 72)
+    for name, samples in results.items():
+        mean, p50, p95 = summary(samples)
+        print(f"  {name:<10}{statements[name]:>12.1f}{mean:>14.0f}{p50:>12.0f}{p95:>12.0f}")
+
+    before, after = summary(results['antes'])[0], summary(results['después'])[0]
+    print(f"\n  Mejora en la media: {(1 - after / before) * 100:.1f}%")
+    print("  Datos revertidos (ROLLBACK).")
+
+
+if __name__ == '__main__':
+    main()
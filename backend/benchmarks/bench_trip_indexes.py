@@ -0,0 +1,193 @@
+"""
+Benchmark de los índices de Trip y TripOffer sobre un dataset sembrado.
+
+Siembra usuarios, conductores, viajes y ofertas con generate_series (semilla
+fija, reproducible), y mide con EXPLAIN ANALYZE las consultas reales de la API
+en dos esquemas:
+
+- después: los índices de Trip.Meta.indexes / TripOffer.Meta.indexes
+- antes:   el esquema anterior (índices simples de las FK y GiST completo
+           sobre origin_location)
+
+Todo corre dentro de una transacción que se revierte al final: no deja datos
+ni cambia índices. Aun así, correrlo contra una base de pruebas, no producción.
+
+Ejecutar desde la raíz del proyecto backend:
+python benchmarks/bench_trip_indexes.py --trips 2000000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.db import connection, transaction
+
+from apps.trips.models import Trip, TripOffer
+
+# Índices del esquema anterior (los que Django creaba para las FK y el PointField)
+LEGACY_INDEXES = [
+    'CREATE INDEX bench_trip_client_id ON trips_trip (client_id)',
+    'CREATE INDEX bench_trip_driver_id ON trips_trip (driver_id)',
+    'CREATE INDEX bench_trip_origin_gist ON trips_trip USING GIST (origin_location)',
+    'CREATE INDEX bench_tripoffer_trip_id ON trips_tripoffer (trip_id)',
+]
+
+# Centro de Riohacha
+LNG, LAT = -72.9072, 11.5444
+
+
+def seed(cursor, trips, clients, drivers, offers_per_trip):
+    print(f"Sembrando {clients} clientes, {drivers} conductores, {trips} viajes, "
+          f"{trips * offers_per_trip} ofertas...")
+    cursor.execute('SELECT setseed(0.42)')
+    cursor.execute(f"""
+        INSERT INTO accounts_user (password, is_superuser, username, first_name, last_name,
+                                   email, is_staff, is_active, date_joined, role)
+        SELECT '!', false, 'bench_' || g, '', '', 'bench_' || g || '@bench.local',
+               false, true, now(), CASE WHEN g <= {drivers} THEN 'DRIVER' ELSE 'CLIENT' END
+        FROM generate_series(1, {drivers + clients}) g
+    """)
+    cursor.execute("""
+        INSERT INTO drivers_driverprofile (user_id, license_number, is_verified)
+        SELECT id, 'BENCH', true FROM accounts_user
+        WHERE username LIKE 'bench\\_%%' AND role = 'DRIVER' ORDER BY id
+    """)
+    cursor.execute("SELECT min(id) FROM accounts_user WHERE username LIKE 'bench\\_%%' AND role = 'CLIENT'")
+    first_client = cursor.fetchone()[0]
+    cursor.execute("SELECT min(d.id) FROM drivers_driverprofile d JOIN accounts_user u ON u.id = d.user_id "
+                   "WHERE u.username LIKE 'bench\\_%%'")
+    first_driver = cursor.fetchone()[0]
+
+    # Distribución de estados por g % 100: 2% abiertos, 2% en curso, el resto cerrados
+    cursor.execute(f"""
+        INSERT INTO trips_trip (client_id, driver_id, pickup_address, destination_address, service_type,
+                                origin_location, destination_location, vehicle_type, status,
+                                estimated_price, created_at, updated_at)
+        SELECT {first_client} + (g % {clients}),
+               CASE WHEN g % 100 < 2 THEN NULL ELSE {first_driver} + (g % {drivers}) END,
+               'Calle ' || g, 'Carrera ' || g, 'TRIP',
+               ST_SetSRID(ST_MakePoint({LNG} + (random() - 0.5) * 0.3, {LAT} + (random() - 0.5) * 0.3), 4326)::geography,
+               ST_SetSRID(ST_MakePoint({LNG} + (random() - 0.5) * 0.3, {LAT} + (random() - 0.5) * 0.3), 4326)::geography,
+               'CAR',
+               CASE WHEN g % 100 < 2 THEN 'REQUESTED'
+                    WHEN g % 100 = 2 THEN 'ACCEPTED'
+                    WHEN g % 100 = 3 THEN 'IN_PROGRESS'
+                    WHEN g % 100 < 90 THEN 'COMPLETED'
+                    ELSE 'CANCELLED' END,
+               10000,
+               now() - (({trips} - g)::float / {trips}) * interval '365 days',
+               now() - (({trips} - g)::float / {trips}) * interval '365 days' + interval '30 minutes'
+        FROM generate_series(1, {trips}) g
+    """)
+    cursor.execute(f"""
+        INSERT INTO trips_tripoffer (trip_id, driver_id, offered_price, estimated_arrival_time,
+                                     status, created_at, updated_at)
+        SELECT t.id, {first_driver} + ((t.id + k) % {drivers}), 12000, 5,
+               CASE WHEN t.status = 'REQUESTED' THEN 'PENDING'
+                    WHEN k = 0 THEN 'ACCEPTED' ELSE 'REJECTED' END,
+               t.created_at, t.created_at
+        FROM trips_trip t CROSS JOIN generate_series(0, {offers_per_trip - 1}) k
+        WHERE t.client_id >= {first_client}
+    """)
+    cursor.execute('ANALYZE accounts_user, drivers_driverprofile, trips_trip, trips_tripoffer')
+
+    cursor.execute(f"SELECT id FROM trips_trip WHERE status = 'REQUESTED' AND client_id >= {first_client} LIMIT 1")
+    open_trip = cursor.fetchone()[0]
+    cursor.execute(f'SELECT user_id FROM drivers_driverprofile WHERE id = {first_driver + 3}')
+    driver_user = cursor.fetchone()[0]
+    return {'client': first_client + 7, 'driver_user': driver_user, 'open_trip': open_trip}
+
+
+def queries(params):
+    """Consultas equivalentes a las que genera la API"""
+    point = f"ST_SetSRID(ST_MakePoint({LNG}, {LAT}), 4326)::geography"
+    return [
+        ('feed abierto (AvailableTripsView)',
+         "SELECT * FROM trips_trip WHERE status = 'REQUESTED' AND driver_id IS NULL "
+         "ORDER BY created_at DESC LIMIT 50"),
+        ('radio 5km (TripViewSet conductor)',
+         f"SELECT *, ST_Distance(origin_location, {point}) AS distance FROM trips_trip "
+         f"WHERE status = 'REQUESTED' AND ST_DWithin(origin_location, {point}, 5000) "
+         f"ORDER BY distance LIMIT 50"),
+        ('historial del cliente',
+         f"SELECT * FROM trips_trip WHERE client_id = {params['client']} ORDER BY created_at DESC LIMIT 50"),
+        ('viajes del conductor',
+         f"SELECT t.* FROM trips_trip t JOIN drivers_driverprofile d ON d.id = t.driver_id "
+         f"WHERE d.user_id = {params['driver_user']} ORDER BY t.created_at DESC LIMIT 50"),
+        ('ofertas pendientes del viaje',
+         f"SELECT * FROM trips_tripoffer WHERE trip_id = {params['open_trip']} AND status = 'PENDING'"),
+        ('lote de archivado',
+         "SELECT id FROM trips_trip WHERE status IN ('COMPLETED', 'CANCELLED') "
+         "AND updated_at < now() - interval '30 days' ORDER BY id LIMIT 500"),
+    ]
+
+
+def plan_indexes(plan):
+    """Índices usados en el plan (recursivo)"""
+    found = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', []):
+        found |= plan_indexes(child)
+    return found
+
+
+def measure(cursor, sql, runs):
+    cursor.execute(sql)  # calentar caché
+    times = []
+    for _ in range(runs):
+        cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}')
+        result = cursor.fetchone()[0]
+        result = result[0] if isinstance(result, list) else json.loads(result)[0]
+        times.append(result['Execution Time'])
+    return statistics.median(times), plan_indexes(result['Plan'])
+
+
+def use_legacy_schema(cursor):
+    for model in (Trip, TripOffer):
+        for index in model._meta.indexes:
+            cursor.execute(f'DROP INDEX {index.name}')
+    for sql in LEGACY_INDEXES:
+        cursor.execute(sql)
+    cursor.execute('ANALYZE trips_trip, trips_tripoffer')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trips', type=int, default=2_000_000)
+    parser.add_argument('--clients', type=int, default=50_000)
+    parser.add_argument('--drivers', type=int, default=5_000)
+    parser.add_argument('--offers-per-trip', type=int, default=2)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            params = seed(cursor, args.trips, args.clients, args.drivers, args.offers_per_trip)
+            for name, sql in queries(params):
+                results[name] = {'después': measure(cursor, sql, args.runs)}
+            use_legacy_schema(cursor)
+            for name, sql in queries(params):
+                results[name]['antes'] = measure(cursor, sql, args.runs)
+        transaction.set_rollback(True)
+
+    print("\n" + "=" * 96)
+    print(f"  {'consulta':<36}{'antes (ms)':>12}{'después (ms)':>14}{'x':>8}  índice usado")
+    print("=" * 96)
+    for name, result in results.items():
+        before, _ = result['antes']
+        after, indexes = result['después']
+        speedup = before / after if after else float('inf')
+        print(f"  {name:<36}{before:>12.2f}{after:>14.2f}{speedup:>8.1f}  {', '.join(sorted(indexes)) or 'seq scan'}")
+    print("\nDatos revertidos (ROLLBACK).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+Stand-in local de Mapbox (Directions y Matrix) para pruebas y benchmarks sin red.
+
+Responde con el mismo formato que la API real y siempre la misma geometría
+para las mismas coordenadas: la ruta va en "L" (primero en longitud, luego en
+latitud) con un punto cada ~100 m, la distancia es la suma de los tramos y la
+duración sale de una velocidad fija por perfil. Acepta cualquier access_token
+(pero exige que venga).
+
+Puede simular un proveedor degradado: latencia base con jitter, una fracción
+de respuestas con error (--error-rate, --error-status) y una fracción de
+respuestas lentas (--slow-rate, --slow-ms) para ejercitar el timeout y el
+circuit breaker de RouteService. Con --seed las fallas son reproducibles.
+
+Rutas soportadas:
+    GET /directions/v5/mapbox/{perfil}/{lng,lat;lng,lat;...}
+        geometries=polyline|polyline6|geojson, overview=full|simplified|false
+    GET /directions-matrix/v1/mapbox/{perfil}/{lng,lat;...}
+        sources, destinations (índices separados por ';' o 'all'),
+        annotations=duration,distance
+
+Ejecutar desde la raíz del proyecto backend:
+python benchmarks/mapbox_standin.py --port 8089 --latency-ms 80 --error-rate 0.05
+
+y apuntar el backend a él:
+ROUTE_PROVIDER_URL=http://127.0.0.1:8089 MAPBOX_API_KEY=local python test_ofertas.py
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import polyline
+
+EARTH_RADIUS_M = 6371000
+STEP_DEG = 0.001
+PROFILE_SPEED_KMH = {'driving': 30, 'driving-traffic': 22, 'cycling': 15, 'walking': 5}
+
+
+def haversine_m(a, b):
+    """Distancia en metros entre dos puntos (lng, lat)"""
+    lng1, lat1, lng2, lat2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def leg_path(a, b):
+    """Puntos (lng, lat) del tramo de a a b: en L, uno cada STEP_DEG"""
+    corner = (b[0], a[1])
+    path = [a]
+    for start, end in ((a, corner), (corner, b)):
+        steps = max(1, math.ceil(max(abs(end[0] - start[0]), abs(end[1] - start[1])) / STEP_DEG))
+        for i in range(1, steps + 1):
+            path.append((start[0] + (end[0] - start[0]) * i / steps, start[1] + (end[1] - start[1]) * i / steps))
+    return path
+
+
+def path_distance(path):
+    return sum(haversine_m(p, q) for p, q in zip(path, path[1:]))
+
+
+def encode_geometry(path, geometries):
+    if geometries == 'geojson':
+        return {'type': 'LineString', 'coordinates': [[round(lng, 6), round(lat, 6)] for lng, lat in path]}
+    precision = 6 if geometries == 'polyline6' else 5
+    return polyline.encode([(lat, lng) for lng, lat in path], precision)
+
+
+def waypoint(point):
+    return {'name': '', 'location': [round(point[0], 6), round(point[1], 6)], 'distance': 0.0}
+
+
+def directions(points, profile, params):
+    speed = PROFILE_SPEED_KMH[profile] / 3.6
+    path, legs = [points[0]], []
+    for a, b in zip(points, points[1:]):
+        leg = leg_path(a, b)
+        distance = path_distance(leg)
+        legs.append({'summary': '', 'steps': [], 'distance': distance, 'duration': distance / speed,
+                     'weight': distance / speed})
+        path.extend(leg[1:])
+
+    overview = params.get('overview', 'simplified')
+    if overview == 'simplified' and len(path) > 50:
+        path = path[:-1:len(path) // 50] + [path[-1]]
+    distance = sum(leg['distance'] for leg in legs)
+    route = {
+        'distance': distance,
+        'duration': distance / speed,
+        'weight': distance / speed,
+        'weight_name': 'routability',
+        'legs': legs,
+    }
+    if overview != 'false':
+        route['geometry'] = encode_geometry(path, params.get('geometries', 'polyline'))
+    return {'code': 'Ok', 'routes': [route], 'waypoints': [waypoint(p) for p in points]}
+
+
+def parse_indexes(value, count):
+    if value in (None, 'all'):
+        return list(range(count))
+    indexes = [int(i) for i in value.split(';')]
+    if any(i < 0 or i >= count for i in indexes):
+        raise ValueError('índice fuera de rango')
+    return indexes
+
+
+def matrix(points, profile, params):
+    speed = PROFILE_SPEED_KMH[profile] / 3.6
+    sources = parse_indexes(params.get('sources'), len(points))
+    destinations = parse_indexes(params.get('destinations'), len(points))
+    annotations = params.get('annotations', 'duration').split(',')
+    distances = [[path_distance(leg_path(points[s], points[d])) for d in destinations] for s in sources]
+
+    body = {
+        'code': 'Ok',
+        'sources': [waypoint(points[s]) for s in sources],
+        'destinations': [waypoint(points[d]) for d in destinations],
+    }
+    if 'duration' in annotations:
+        body['durations'] = [[round(m / speed, 1) for m in row] for row in distances]
+    if 'distance' in annotations:
+        body['distances'] = [[round(m, 1) for m in row] for row in distances]
+    return body
+
+
+API = {
+    ('directions', 'v5'): directions,
+    ('directions-matrix', 'v1'): matrix,
+}
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip('/').split('/')
+        self.server.count_request()
+
+        if len(parts) != 5 or (parts[0], parts[1]) not in API or parts[2] != 'mapbox':
+            return self.reply(404, {'message': 'Not Found'})
+        if not params.get('access_token'):
+            return self.reply(401, {'message': 'Not Authorized - No Token'})
+        profile = parts[3]
+        if profile not in PROFILE_SPEED_KMH:
+            return self.reply(422, {'code': 'ProfileNotFound', 'message': 'Profile not found'})
+        try:
+            points = [tuple(float(c) for c in pair.split(',')) for pair in parts[4].split(';')]
+            if len(points) < 2 or any(len(p) != 2 or abs(p[0]) > 180 or abs(p[1]) > 90 for p in points):
+                raise ValueError('coordenadas inválidas')
+        except ValueError as e:
+            return self.reply(422, {'code': 'InvalidInput', 'message': str(e)})
+
+        delay, fail = self.server.plan_request()
+        time.sleep(delay)
+        if fail:
+            return self.reply(self.server.error_status, {'message': 'Injected error'})
+        try:
+            body = API[(parts[0], parts[1])](points, profile, params)
+        except ValueError as e:
+            return self.reply(422, {'code': 'InvalidInput', 'message': str(e)})
+        self.reply(200, body)
+
+    def reply(self, code, body):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente se cansó de esperar (timeout de RouteService)
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503,
+                 slow_rate=0.0, slow_ms=0, seed=None, verbose=False):
+        super().__init__(address, StandinHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.verbose = verbose
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def plan_request(self):
+        """(segundos de espera, si falla) para la request actual"""
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            if self._random.random() < self.slow_rate:
+                delay = self.slow_ms
+            fail = self._random.random() < self.error_rate
+        return max(0.0, delay) / 1000, fail
+
+    def start(self):
+        """Atiende en un hilo de fondo (para usarlo desde un benchmark)"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in local de Mapbox Directions y Matrix')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latencia base por respuesta')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Variación uniforme ± sobre la latencia')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de respuestas con error')
+    parser.add_argument('--error-status', type=int, default=503, help='Código HTTP de los errores inyectados')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='Fracción de respuestas lentas')
+    parser.add_argument('--slow-ms', type=float, default=10000, help='Latencia de las respuestas lentas')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla para fallas reproducibles')
+    parser.add_argument('--verbose', action='store_true', help='Registrar cada request')
+    args = parser.parse_args()
+
+    server = StandinServer(
+        (args.host, args.port), latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status, slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms, seed=args.seed, verbose=args.verbose,
+    )
+    print(f"Stand-in de Mapbox en {server.url} (Ctrl+C para salir)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()